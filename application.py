@@ -1,7 +1,12 @@
+import hmac
+import os
 import time
-from flask import Flask, request, render_template, jsonify
+from flask import Flask, Response, request, render_template, jsonify
 
-from src.pipeline.predict_pipeline import CustomData, PredictPipeline
+from src.logger import logging, serving_logger
+from src.metrics import CONTENT_TYPE, ERRORS, PHASE_SECONDS, REGISTRY, REQUEST_SECONDS, error_type
+from src.pipeline.explain_pipeline import ExplainPipeline
+from src.pipeline.predict_pipeline import SMOKE_RECORD, CustomData, PredictPipeline
 
 # ============================================================
 # Elastic Beanstalk WSGI entrypoint
@@ -25,8 +30,25 @@ def get_pipeline():
     return _predict_pipeline
 
 
+def warm_up():
+    """
+    Ready this process for traffic (called by gunicorn.conf.py): load and
+    exercise the model, compile the templates and run the form parser once,
+    so no user request pays for them. Returns the seconds taken.
+    """
+    start = time.perf_counter()
+    PredictPipeline.warm_up()
+    ExplainPipeline.warm_up()
+    for template in ("index.html", "home.html"):
+        app.jinja_env.get_template(template)
+    with app.test_request_context("/predictdata", method="POST", data=SMOKE_RECORD):
+        CustomData.from_record(request.form)
+    return time.perf_counter() - start
+
+
 # ============================================================
-# Request timing (optional logging)
+# Request timing (exported on /metrics; LOG_SERVING_LEVEL=INFO also
+# logs it, sampled by LOG_SERVING_SAMPLE_RATE, see src/logger.py)
 # ============================================================
 @app.before_request
 def _start_timer():
@@ -36,11 +58,17 @@ def _start_timer():
 @app.after_request
 def _log_request_time(response):
     try:
-        elapsed_ms = (time.perf_counter() - request._start_time) * 1000
-        print(
-            f"{request.method} {request.path} "
-            f"-> {response.status_code} in {elapsed_ms:.2f} ms"
-        )
+        elapsed = time.perf_counter() - request._start_time
+        # The rule, not the raw path, so unknown URLs cannot blow up label cardinality
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        REQUEST_SECONDS.observe(elapsed, route, request.method, str(response.status_code))
+        REGISTRY.start_flusher()
+        if serving_logger.isEnabledFor(logging.INFO):
+            serving_logger.info(
+                f"{request.method} {request.path} "
+                f"-> {response.status_code} in {elapsed * 1000:.2f} ms",
+                extra={"route": route, "status": response.status_code, "duration_ms": elapsed * 1000},
+            )
     except Exception:
         pass
     return response
@@ -48,6 +76,14 @@ def _log_request_time(response):
 # ============================================================
 # Routes
 # ============================================================
+# Upper bound on records per JSON batch request
+MAX_BATCH_RECORDS = 10_000
+
+
+def _clamp_score(value):
+    return max(0.0, min(100.0, float(value)))
+
+
 @app.route("/")
 def index():
     return render_template("index.html")
@@ -59,49 +95,138 @@ def predict_datapoint():
         return render_template("home.html", results=None, error=None)
 
     try:
-        required_fields = [
-            "gender",
-            "ethnicity",
-            "parental_level_of_education",
-            "lunch",
-            "test_preparation_course",
-            "reading_score",
-            "writing_score",
-        ]
-
-        missing = [f for f in required_fields if not request.form.get(f)]
-        if missing:
-            raise ValueError(f"Missing required fields: {', '.join(missing)}")
-
-        reading_score = float(request.form.get("reading_score"))
-        writing_score = float(request.form.get("writing_score"))
-
-        if not (0 <= reading_score <= 100):
-            raise ValueError("Reading score must be between 0 and 100.")
-        if not (0 <= writing_score <= 100):
-            raise ValueError("Writing score must be between 0 and 100.")
-
-        data = CustomData(
-            gender=request.form.get("gender"),
-            race_ethnicity=request.form.get("ethnicity"),
-            parental_level_of_education=request.form.get("parental_level_of_education"),
-            lunch=request.form.get("lunch"),
-            test_preparation_course=request.form.get("test_preparation_course"),
-            reading_score=reading_score,
-            writing_score=writing_score,
+        with PHASE_SECONDS.time("record", "validation"):
+            data = CustomData.from_record(request.form)
+
+        result = _clamp_score(get_pipeline().predict_record(data))
+
+        return render_template("home.html", results=result, error=None)
+
+    except Exception as e:
+        ERRORS.inc("/predictdata", error_type(e))
+        return render_template("home.html", results=None, error=str(e))
+
+
+@app.route("/api/predict/batch", methods=["POST"])
+def predict_batch():
+    """
+    Score many students in one call.
+
+    Body: a JSON list of records, or {"records": [...]}, using the same
+    field names as the form. Each result carries either a prediction or
+    the validation error for that row.
+    """
+    payload = request.get_json(silent=True)
+    records = payload.get("records") if isinstance(payload, dict) else payload
+
+    if not isinstance(records, list):
+        ERRORS.inc("/api/predict/batch", "InvalidPayload")
+        return jsonify(error='Expected a JSON list of records or {"records": [...]}.'), 400
+    if len(records) > MAX_BATCH_RECORDS:
+        ERRORS.inc("/api/predict/batch", "TooManyRecords")
+        return jsonify(error=f"At most {MAX_BATCH_RECORDS} records per request."), 413
+
+    try:
+        predictions, errors = get_pipeline().predict_batch(records)
+    except Exception as e:
+        ERRORS.inc("/api/predict/batch", error_type(e))
+        return jsonify(error=str(e)), 500
+
+    if errors:
+        ERRORS.inc("/api/predict/batch", "InvalidRecord", amount=len(errors))
+
+    results = []
+    for i, pred in enumerate(predictions):
+        if i in errors:
+            results.append({"index": i, "error": errors[i]})
+        else:
+            results.append({"index": i, "prediction": _clamp_score(pred)})
+
+    return jsonify(results=results, count=len(records), error_count=len(errors))
+
+
+@app.route("/api/explain", methods=["POST"])
+def explain_datapoint():
+    """
+    Per-feature explanation of one student's prediction.
+
+    Body: a JSON record with the form's field names, or
+    {"record": {...}, "method": "auto" | "exact" | "lime", "num_samples": N}.
+    "exact" (linear and tree models) decomposes the prediction itself;
+    "lime" fits a local surrogate on N perturbed samples.
+    """
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        ERRORS.inc("/api/explain", "InvalidPayload")
+        return jsonify(error='Expected a JSON record or {"record": {...}}.'), 400
+    record = payload.get("record", payload)
+
+    try:
+        data = CustomData.from_record(record)
+        result = ExplainPipeline().explain_record(
+            data,
+            method=payload.get("method") or request.args.get("method", "auto"),
+            num_samples=payload.get("num_samples") or request.args.get("num_samples"),
         )
+    except ValueError as e:
+        ERRORS.inc("/api/explain", "InvalidRecord")
+        return jsonify(error=str(e)), 400
+    except Exception as e:
+        ERRORS.inc("/api/explain", error_type(e))
+        return jsonify(error=str(e)), 500
 
-        pred_df = data.get_data_as_data_frame()
+    return jsonify(prediction=_clamp_score(result["model_output"]), **result)
 
-        preds = get_pipeline().predict(pred_df)
 
-        result = float(preds[0])
-        result = max(0.0, min(100.0, result))
+@app.route("/api/explain/cache", methods=["GET"])
+def explanation_cache_stats():
+    return jsonify(ExplainPipeline.cache_stats())
 
-        return render_template("home.html", results=result, error=None)
 
+@app.route("/api/predict/cache", methods=["GET"])
+def prediction_cache_stats():
+    return jsonify(PredictPipeline.cache_stats())
+
+
+@app.route("/api/predict/batching", methods=["GET"])
+def prediction_batching_stats():
+    return jsonify(PredictPipeline.batching_stats())
+
+
+@app.route("/api/model", methods=["GET"])
+def model_info():
+    try:
+        return jsonify(get_pipeline().model_info())
     except Exception as e:
-        return render_template("home.html", results=None, error=str(e))
+        return jsonify(error=str(e)), 500
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus scrape endpoint; under gunicorn it covers every worker (see src/metrics.py)."""
+    return Response(REGISTRY.render(), headers={"Content-Type": CONTENT_TYPE})
+
+
+@app.route("/api/admin/reload", methods=["POST"])
+def reload_model():
+    """
+    Load the artifact store's current version now instead of waiting for
+    the watcher. Requires ADMIN_TOKEN in the X-Admin-Token header; the
+    route does not exist when ADMIN_TOKEN is unset. Only the worker that
+    handles the call reloads immediately; the others follow via their watcher.
+    """
+    token = os.getenv("ADMIN_TOKEN")
+    if not token:
+        return jsonify(error="Not found."), 404
+    if not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), token):
+        return jsonify(error="Forbidden."), 403
+
+    try:
+        reloaded = PredictPipeline.reload(force=request.args.get("force") == "1")
+        return jsonify(reloaded=reloaded, **PredictPipeline.model_info())
+    except Exception as e:
+        return jsonify(error=str(e)), 500
+
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port = 5000, debug=True)
@@ -0,0 +1,305 @@
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from application import MAX_BATCH_RECORDS, _clamp_score, get_pipeline
+from src.logger import logging, serving_logger
+from src.metrics import CONTENT_TYPE, ERRORS, PHASE_SECONDS, REGISTRY, REQUEST_SECONDS, error_type
+from src.pipeline.explain_pipeline import ExplainPipeline
+from src.pipeline.predict_pipeline import CustomData, PredictPipeline
+
+# ============================================================
+# ASGI entry point (same routes as application.py)
+# ============================================================
+# Run with:  uvicorn asgi:app --host 0.0.0.0 --port 8000 --workers 2
+# The event loop only parses requests and writes responses; every model
+# call runs on a bounded thread pool, so thousands of idle or slow
+# connections cost no worker and a burst beyond ASGI_MAX_PENDING gets a
+# fast 503 instead of an ever-growing queue.
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+# Template `url_for` endpoint -> path
+ROUTE_PATHS = {"index": "/", "predict_datapoint": "/predictdata"}
+
+
+class PredictionApp:
+    """
+    Dependency-free ASGI application serving the prediction routes.
+
+    `max_workers` threads run inference; at most `max_pending` requests may
+    be waiting for or running on them before new ones are rejected with 503.
+    The pool serves requests with or without lifespan events; lifespan
+    startup only preloads and warms the model. On lifespan shutdown the
+    app stops taking new work, waits up to `shutdown_timeout` seconds for
+    in-flight requests, then stops the pool.
+    """
+
+    def __init__(self, max_workers=None, max_pending=None, shutdown_timeout=None):
+        self.max_workers = max_workers or _env_int("ASGI_MAX_WORKERS", os.cpu_count() or 1)
+        self.max_pending = max_pending or _env_int("ASGI_MAX_PENDING", 256)
+        self.shutdown_timeout = shutdown_timeout or _env_int("ASGI_SHUTDOWN_TIMEOUT", 30)
+
+        # The pool starts its threads on first use
+        self.executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="asgi-predict")
+        self.pending = 0
+        self.rejected = 0
+        self.accepting = True
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+        self.templates = Environment(
+            loader=FileSystemLoader(os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")),
+            autoescape=select_autoescape(["html"]),
+        )
+        self.templates.globals["url_for"] = lambda endpoint, **_: ROUTE_PATHS[endpoint]
+
+        self.routes = {
+            ("GET", "/"): self.index,
+            ("GET", "/predictdata"): self.predict_form,
+            ("POST", "/predictdata"): self.predict_datapoint,
+            ("POST", "/api/predict/batch"): self.predict_batch,
+            ("POST", "/api/explain"): self.explain_datapoint,
+            ("GET", "/api/explain/cache"): self.explanation_cache_stats,
+            ("GET", "/api/predict/cache"): self.cache_stats,
+            ("GET", "/api/predict/batching"): self.batching_stats,
+            ("GET", "/api/model"): self.model_info,
+            ("GET", "/metrics"): self.metrics,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self.handle(scope, receive, send)
+
+    # -------------------------- lifespan --------------------------
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await self.startup()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def startup(self):
+        # Load (and warm up) the model off the loop; a failure must not stop
+        # the server (requests will retry the load, as in application.py)
+        load = PredictPipeline.warm_up if PredictPipeline.config.warm_up else PredictPipeline.preload
+        try:
+            await asyncio.get_running_loop().run_in_executor(self.executor, load)
+            if PredictPipeline.config.warm_up:
+                await asyncio.get_running_loop().run_in_executor(self.executor, ExplainPipeline.warm_up)
+                for template in ("index.html", "home.html"):
+                    self.templates.get_template(template)
+        except Exception as e:
+            logging.warning(f"ASGI startup could not preload the model: {e}")
+
+    async def shutdown(self):
+        self.accepting = False
+        try:
+            await asyncio.wait_for(self._idle.wait(), self.shutdown_timeout)
+        except asyncio.TimeoutError:
+            logging.warning(f"ASGI shutdown: {self.pending} requests still running after {self.shutdown_timeout}s")
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    # -------------------------- plumbing --------------------------
+    async def run_blocking(self, fn, *args):
+        """Run `fn` on the inference pool; raises Overloaded past max_pending."""
+        if not self.accepting or self.pending >= self.max_pending:
+            self.rejected += 1
+            raise Overloaded()
+
+        self.pending += 1
+        self._idle.clear()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            self.pending -= 1
+            if self.pending == 0:
+                self._idle.set()
+
+    async def handle(self, scope, receive, send):
+        start = time.perf_counter()
+        handler = self.routes.get((scope["method"], scope["path"]))
+
+        if handler is None:
+            allowed = any(path == scope["path"] for _, path in self.routes)
+            status, headers, body = self.json({"error": "Method not allowed." if allowed else "Not found."},
+                                              405 if allowed else 404)
+        else:
+            try:
+                request_body = await self.read_body(receive)
+                status, headers, body = await handler(request_body)
+            except Overloaded:
+                status, headers, body = self.json({"error": "Server is busy, retry shortly."}, 503)
+                headers.append((b"retry-after", b"1"))
+            except BodyTooLarge:
+                status, headers, body = self.json({"error": "Request body too large."}, 413)
+
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+        elapsed = time.perf_counter() - start
+        route = scope["path"] if handler is not None else "unmatched"
+        REQUEST_SECONDS.observe(elapsed, route, scope["method"], str(status))
+        REGISTRY.start_flusher()
+        if serving_logger.isEnabledFor(logging.INFO):
+            serving_logger.info(
+                f"{scope['method']} {scope['path']} -> {status} in {elapsed * 1000:.2f} ms",
+                extra={"route": route, "status": status, "duration_ms": elapsed * 1000},
+            )
+
+    @staticmethod
+    async def read_body(receive):
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                raise BodyTooLarge()
+            chunks.append(chunk)
+            if not message.get("more_body"):
+                return b"".join(chunks)
+
+    @staticmethod
+    def json(payload, status=200):
+        return status, [(b"content-type", b"application/json")], json.dumps(payload).encode("utf-8")
+
+    def html(self, template, status=200, **context):
+        body = self.templates.get_template(template).render(**context).encode("utf-8")
+        return status, [(b"content-type", b"text/html; charset=utf-8")], body
+
+    # --------------------------- routes ---------------------------
+    async def index(self, body):
+        return self.html("index.html")
+
+    async def predict_form(self, body):
+        return self.html("home.html", results=None, error=None)
+
+    async def predict_datapoint(self, body):
+        form = dict(parse_qsl(body.decode("utf-8"), keep_blank_values=True))
+        try:
+            with PHASE_SECONDS.time("record", "validation"):
+                data = CustomData.from_record(form)
+            result = _clamp_score(await self.run_blocking(get_pipeline().predict_record, data))
+            return self.html("home.html", results=result, error=None)
+        except Overloaded:
+            ERRORS.inc("/predictdata", "Overloaded")
+            raise
+        except Exception as e:
+            ERRORS.inc("/predictdata", error_type(e))
+            return self.html("home.html", results=None, error=str(e))
+
+    async def predict_batch(self, body):
+        try:
+            payload = json.loads(body) if body else None
+        except ValueError:
+            payload = None
+        records = payload.get("records") if isinstance(payload, dict) else payload
+
+        if not isinstance(records, list):
+            ERRORS.inc("/api/predict/batch", "InvalidPayload")
+            return self.json({"error": 'Expected a JSON list of records or {"records": [...]}.'}, 400)
+        if len(records) > MAX_BATCH_RECORDS:
+            ERRORS.inc("/api/predict/batch", "TooManyRecords")
+            return self.json({"error": f"At most {MAX_BATCH_RECORDS} records per request."}, 413)
+
+        try:
+            predictions, errors = await self.run_blocking(get_pipeline().predict_batch, records)
+        except Overloaded:
+            ERRORS.inc("/api/predict/batch", "Overloaded")
+            raise
+        except Exception as e:
+            ERRORS.inc("/api/predict/batch", error_type(e))
+            return self.json({"error": str(e)}, 500)
+
+        if errors:
+            ERRORS.inc("/api/predict/batch", "InvalidRecord", amount=len(errors))
+
+        results = []
+        for i, pred in enumerate(predictions):
+            if i in errors:
+                results.append({"index": i, "error": errors[i]})
+            else:
+                results.append({"index": i, "prediction": _clamp_score(pred)})
+
+        return self.json({"results": results, "count": len(records), "error_count": len(errors)})
+
+    async def explain_datapoint(self, body):
+        try:
+            payload = json.loads(body) if body else None
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict):
+            ERRORS.inc("/api/explain", "InvalidPayload")
+            return self.json({"error": 'Expected a JSON record or {"record": {...}}.'}, 400)
+        record = payload.get("record", payload)
+
+        try:
+            data = CustomData.from_record(record)
+            result = await self.run_blocking(
+                ExplainPipeline().explain_record, data, payload.get("method") or "auto", payload.get("num_samples")
+            )
+        except Overloaded:
+            ERRORS.inc("/api/explain", "Overloaded")
+            raise
+        except ValueError as e:
+            ERRORS.inc("/api/explain", "InvalidRecord")
+            return self.json({"error": str(e)}, 400)
+        except Exception as e:
+            ERRORS.inc("/api/explain", error_type(e))
+            return self.json({"error": str(e)}, 500)
+
+        return self.json(dict(result, prediction=_clamp_score(result["model_output"])))
+
+    async def explanation_cache_stats(self, body):
+        return self.json(ExplainPipeline.cache_stats())
+
+    async def cache_stats(self, body):
+        return self.json(PredictPipeline.cache_stats())
+
+    async def batching_stats(self, body):
+        return self.json(PredictPipeline.batching_stats())
+
+    async def metrics(self, body):
+        # Rendering reads every worker's snapshot file; keep that off the loop
+        text = await asyncio.get_running_loop().run_in_executor(None, REGISTRY.render)
+        return 200, [(b"content-type", CONTENT_TYPE.encode("ascii"))], text.encode("utf-8")
+
+    async def model_info(self, body):
+        try:
+            info = await self.run_blocking(PredictPipeline.model_info)
+            info["server"] = {"pending": self.pending, "max_pending": self.max_pending, "rejected": self.rejected}
+            return self.json(info)
+        except Overloaded:
+            raise
+        except Exception as e:
+            return self.json({"error": str(e)}, 500)
+
+
+class Overloaded(Exception):
+    """Raised when the inference pool already holds max_pending requests."""
+
+
+class BodyTooLarge(Exception):
+    pass
+
+
+app = PredictionApp()
@@ -0,0 +1,56 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from benchmarks.common import environment, save_results
+from src.pipeline.batcher import MicroBatcher
+from src.utils import load_object
+
+
+def benchmark(threads=32, n_requests=3000, windows_ms=(0.5, 2.0, 5.0), max_batch_size=64):
+    """
+    `threads` concurrent clients score unique rows with a 100-tree
+    RandomForest, first one predict call per row, then through a
+    MicroBatcher per window. Returns {label: (requests/s, p50 ms, p99 ms, stats)}.
+    """
+    preprocessor = load_object(os.path.join("artifacts", "preprocessor.pkl"))
+    data = pd.read_csv(os.path.join("notebook", "data", "stud.csv"))
+    X = preprocessor.transform(data.drop(columns=["math_score"]))
+    X = X.toarray() if hasattr(X, "toarray") else X
+    model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=1).fit(X, data["math_score"])
+    rows = [X[i % X.shape[0]] for i in range(n_requests)]
+
+    def run(score):
+        latencies = []
+
+        def one(row):
+            start = time.perf_counter()
+            score(row)
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(one, rows))
+        elapsed = time.perf_counter() - start
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        return n_requests / elapsed, p50, p99
+
+    results = {"unbatched": run(lambda row: model.predict(row[None, :])) + ({},)}
+    for window in windows_ms:
+        batcher = MicroBatcher(lambda items: model.predict(np.vstack(items)), max_batch_size, window)
+        results[f"window {window} ms"] = run(batcher.predict) + (batcher.stats(),)
+
+    return results
+
+
+if __name__ == "__main__":
+    results = benchmark()
+    for label, (throughput, p50, p99, stats) in results.items():
+        batches = f" | mean batch {stats['mean_batch_size']:.1f}" if stats else ""
+        print(f"{label:<16} {throughput:8.0f} req/s | p50 {p50:6.2f} ms | p99 {p99:6.2f} ms{batches}")
+    results["environment"] = environment()
+    print(f"saved {save_results(results, name='batcher')}")
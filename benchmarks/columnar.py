@@ -0,0 +1,66 @@
+import multiprocessing
+import os
+import resource
+import shutil
+import time
+
+import pandas as pd
+
+from benchmarks.common import environment, save_results
+from src.columnar import read_frame, write_frame
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _bench_write(source, n_rows, path, queue):
+    df = pd.read_csv(source).sample(n=n_rows, replace=True, random_state=0).reset_index(drop=True)
+    before = _peak_rss_mb()
+    start = time.perf_counter()
+    write_frame(df, path)
+    queue.put((time.perf_counter() - start, _peak_rss_mb() - before))
+
+
+def _bench_read(path, queue):
+    before = _peak_rss_mb()
+    start = time.perf_counter()
+    read_frame(path)
+    queue.put((time.perf_counter() - start, _peak_rss_mb() - before))
+
+
+def benchmark(source=os.path.join("notebook", "data", "stud.csv"), n_rows=1_000_000,
+              work_dir=os.path.join("artifacts", "bench")):
+    """
+    Time writing/reading `n_rows` (resampled from `source`) as CSV vs
+    columnar. Each step runs in a fresh process so the peak-RSS growth
+    reported (MB) belongs to that step alone.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    os.makedirs(work_dir, exist_ok=True)
+    results = {}
+
+    def run(label, fn, *args):
+        queue = ctx.Queue()
+        process = ctx.Process(target=fn, args=args + (queue,))
+        process.start()
+        results[label] = queue.get()
+        process.join()
+
+    try:
+        for fmt in ("csv", "cols"):
+            path = os.path.join(work_dir, f"bench.{fmt}")
+            run(f"write_{fmt}", _bench_write, source, n_rows, path)
+            run(f"read_{fmt}", _bench_read, path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return results
+
+
+if __name__ == "__main__":
+    results = benchmark()
+    for label, (seconds, peak_mb) in results.items():
+        print(f"{label:<12} {seconds:7.3f} s   peak RSS +{peak_mb:7.1f} MB")
+    results["environment"] = environment()
+    print(f"saved {save_results(results, name='columnar')}")
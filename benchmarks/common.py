@@ -0,0 +1,219 @@
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+
+from src.pipeline.predict_pipeline import SMOKE_RECORD
+
+RESULTS_DIR = os.path.join("benchmarks", "results")
+
+
+def random_records(n, seed=0):
+    """Valid records with varied scores, so the prediction cache cannot answer them."""
+    rng = np.random.default_rng(seed)
+    scores = rng.integers(0, 101, size=(n, 2))
+    return [dict(SMOKE_RECORD, reading_score=int(r), writing_score=int(w)) for r, w in scores]
+
+
+def latency_summary(seconds):
+    """p50/p95/p99/mean/max in milliseconds from a list of durations in seconds."""
+    ms = np.asarray(seconds, dtype=float) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "n": int(ms.size),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "mean_ms": float(ms.mean()),
+        "max_ms": float(ms.max()),
+    }
+
+
+def time_calls(fn, args_list, warmup=3):
+    """Call fn(*args) for every args tuple and return the per-call durations."""
+    for args in args_list[:warmup]:
+        fn(*args)
+    durations = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+# ------------------------------------------------------------------
+# Processes and memory
+# ------------------------------------------------------------------
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def memory_mb(pid):
+    """Rss, Pss and USS (private pages) of a process in MB, from smaps_rollup."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "uss": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def child_pids(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def server_memory(pid):
+    """Per-worker and total memory of a server; a single-process server is its own worker."""
+    workers = [memory_mb(child) for child in child_pids(pid)]
+    master = memory_mb(pid)
+    if not workers:
+        workers, master = [master], None
+
+    def mean(key):
+        return sum(w[key] for w in workers) / len(workers)
+
+    return {
+        "workers": len(workers),
+        "worker_rss_mb": mean("rss"),
+        "worker_uss_mb": mean("uss"),
+        "total_pss_mb": sum(w["pss"] for w in workers) + (master["pss"] if master else 0),
+    }
+
+
+def start_server(kind, port, workers=2, env=None):
+    """Start gunicorn (sync workers) or uvicorn on 127.0.0.1:port; returns the Popen."""
+    if kind == "gunicorn":
+        cmd = ["-m", "gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{port}", "application:application"]
+    elif kind == "uvicorn":
+        cmd = ["-m", "uvicorn", "asgi:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    else:
+        raise ValueError(f"Unknown server: {kind}")
+
+    return subprocess.Popen(
+        [sys.executable] + cmd,
+        env=dict(os.environ, PYTHONWARNINGS="ignore", **(env or {})),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def post_json(url, payload, timeout=60):
+    body = json.dumps(payload).encode("utf-8")
+    req = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return resp.status, json.loads(resp.read())
+
+
+def wait_until_serving(server, url, timeout=120):
+    """Block until `url` answers a one-record batch; returns seconds waited."""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            post_json(url, [SMOKE_RECORD])
+            return time.perf_counter() - start
+        except OSError:
+            if server.poll() is not None:
+                raise RuntimeError("Server exited during startup")
+            time.sleep(0.02)
+    raise TimeoutError(f"Server did not answer {url} within {timeout}s")
+
+
+# ------------------------------------------------------------------
+# HTTP load generator (asyncio, one connection per request)
+# ------------------------------------------------------------------
+async def _request(port, raw, latencies, statuses):
+    start = time.perf_counter()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(raw)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        status = response.split(b" ", 2)[1].decode("ascii")
+    except (OSError, IndexError) as e:
+        status = type(e).__name__
+    latencies.append(time.perf_counter() - start)
+    statuses[status] = statuses.get(status, 0) + 1
+
+
+async def _load(port, raws, concurrency):
+    latencies, statuses = [], {}
+    gate = asyncio.Semaphore(concurrency)
+
+    async def guarded(raw):
+        async with gate:
+            await _request(port, raw, latencies, statuses)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(guarded(raw) for raw in raws))
+    return latencies, statuses, time.perf_counter() - start
+
+
+def http_load(port, path, bodies, concurrency, content_type="application/json"):
+    """
+    POST every body to `path` with at most `concurrency` requests in flight.
+    Returns requests/s, latency percentiles and a count per status code.
+    """
+    raws = [
+        (
+            f"POST {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Type: {content_type}\r\n"
+            f"Connection: close\r\nContent-Length: {len(body)}\r\n\r\n"
+        ).encode("ascii") + body
+        for body in bodies
+    ]
+    latencies, statuses, elapsed = asyncio.run(_load(port, raws, concurrency))
+    return dict(
+        concurrency=concurrency,
+        requests_per_second=len(raws) / elapsed,
+        status_codes=statuses,
+        **latency_summary(latencies),
+    )
+
+
+# ------------------------------------------------------------------
+# Results
+# ------------------------------------------------------------------
+def environment():
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = "unknown"
+
+    import sklearn
+
+    return {
+        "git_revision": revision,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def save_results(results, output_dir=RESULTS_DIR, name="serving"):
+    os.makedirs(output_dir, exist_ok=True)
+    meta = results.get("environment", {})
+    file_name = f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{meta.get('git_revision', 'unknown')}.json"
+    path = os.path.join(output_dir, file_name)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    return path
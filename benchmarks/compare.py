@@ -0,0 +1,82 @@
+"""
+Compare two benchmark result files.
+
+    python -m benchmarks.compare OLD.json NEW.json [--threshold 10]
+
+Prints every metric whose value moved by more than --threshold percent,
+flagging regressions: latencies, durations and memory should go down,
+throughput (…_per_second) should go up. Exits 1 if any metric regressed.
+"""
+import argparse
+import json
+import sys
+
+HIGHER_IS_BETTER = ("per_second",)
+LOWER_IS_BETTER = ("_ms", "_seconds", "_mb")
+
+
+def flatten(results, prefix=""):
+    """{dotted.path: number} for every numeric leaf, skipping the environment block."""
+    flat = {}
+    for key, value in results.items():
+        if key == "environment":
+            continue
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, path + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = float(value)
+    return flat
+
+
+def direction(metric):
+    """+1 if higher is better, -1 if lower is better, 0 if the metric is informational."""
+    name = metric.rsplit(".", 1)[-1]
+    if name.endswith(HIGHER_IS_BETTER):
+        return 1
+    if name.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(old, new, threshold=10.0):
+    """Return [(metric, old, new, change %, verdict)] for metrics that moved more than threshold %."""
+    old_flat, new_flat = flatten(old), flatten(new)
+    rows = []
+    for metric in sorted(old_flat.keys() & new_flat.keys()):
+        before, after = old_flat[metric], new_flat[metric]
+        if before == 0:
+            continue
+        change = (after - before) / abs(before) * 100
+        if abs(change) <= threshold:
+            continue
+        sign = direction(metric)
+        verdict = "changed" if sign == 0 else ("improved" if change * sign > 0 else "REGRESSED")
+        rows.append((metric, before, after, change, verdict))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change to report")
+    args = parser.parse_args(argv)
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    print(f"{old['environment']['git_revision']} -> {new['environment']['git_revision']}")
+    rows = compare(old, new, args.threshold)
+    for metric, before, after, change, verdict in rows:
+        print(f"{verdict:<10} {metric:<60} {before:12.3f} -> {after:12.3f} ({change:+.1f}%)")
+    if not rows:
+        print(f"No metric moved by more than {args.threshold}%")
+
+    return 1 if any(row[4] == "REGRESSED" for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
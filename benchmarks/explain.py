@@ -0,0 +1,68 @@
+import time
+
+from lime.lime_tabular import LimeTabularExplainer
+
+from benchmarks.common import environment, save_results
+from src.columnar import read_frame
+from src.pipeline.explain_pipeline import CATEGORICAL_FEATURES, ExplainPipeline, TrainingStats
+from src.pipeline.predict_pipeline import SMOKE_RECORD, CustomData, PredictPipeline
+
+
+def benchmark(n_records=20):
+    """
+    Seconds per explanation for distinct records: a naive LIME setup (the
+    explainer built from the training data per request and the perturbations
+    scored through a DataFrame, with LIME's default 5000 samples and with
+    ours) against this pipeline's LIME, cached and exact paths.
+    """
+    pipeline = ExplainPipeline()
+    bundle = PredictPipeline._current_bundle()
+    stats = pipeline._training_stats()
+    records = [
+        dict(SMOKE_RECORD, reading_score=40 + i * 2, writing_score=45 + i * 2) for i in range(n_records)
+    ]
+    items = [CustomData.from_record(r) for r in records]
+
+    def naive(data, num_samples=5000):
+        frame = read_frame(pipeline._training_data_path())
+        local_stats = TrainingStats(frame[CustomData.FEATURE_ORDER].to_dict("records"))
+        explainer = LimeTabularExplainer(
+            local_stats.encoded, mode="regression", feature_names=CustomData.FEATURE_ORDER,
+            categorical_features=list(range(len(CATEGORICAL_FEATURES))),
+        )
+
+        def predict_fn(samples):
+            frame = CustomData.to_data_frame(local_stats.decode(samples))
+            return bundle.model.predict(bundle.preprocessor.transform(frame))
+
+        return explainer.explain_instance(local_stats.encode(data), predict_fn, num_features=7, num_samples=num_samples)
+
+    def per_record(fn):
+        fn(items[0])
+        start = time.perf_counter()
+        for data in items:
+            fn(data)
+        return (time.perf_counter() - start) / len(items)
+
+    ExplainPipeline._cache.clear()
+    results = {
+        "model": type(bundle.model).__name__,
+        "num_samples": pipeline.config.num_samples,
+        "naive_lime_5000_samples_seconds": per_record(naive),
+        "naive_lime_seconds": per_record(lambda d: naive(d, pipeline.config.num_samples)),
+        "lime_seconds": per_record(lambda d: pipeline.explain_record(d, "lime")),
+        "cached_seconds": per_record(lambda d: pipeline.explain_record(d, "lime")),
+    }
+    if pipeline._exact_explainer(bundle) is not None:
+        ExplainPipeline._cache.clear()
+        results["exact_seconds"] = per_record(lambda d: pipeline.explain_record(d, "exact"))
+    results["training_rows"] = len(stats.records)
+    return results
+
+
+if __name__ == "__main__":
+    results = benchmark()
+    for name, value in results.items():
+        print(f"{name:<32} {value * 1000:8.2f} ms" if isinstance(value, float) else f"{name:<32} {value}")
+    results["environment"] = environment()
+    print(f"saved {save_results(results, name='explain')}")
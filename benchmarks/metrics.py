@@ -0,0 +1,34 @@
+import time
+
+from benchmarks.common import environment, save_results
+from src.metrics import Counter, Histogram
+
+
+def benchmark(n=1_000_000):
+    """Nanoseconds per Histogram.observe / Counter.inc call on the hot path."""
+    histogram = Histogram("bench_seconds", "benchmark", ("route", "phase"))
+    counter = Counter("bench_total", "benchmark", ("route",))
+
+    start = time.perf_counter()
+    for i in range(n):
+        histogram.observe(0.0003, "/predictdata", "model_predict")
+    observe_ns = (time.perf_counter() - start) / n * 1e9
+
+    start = time.perf_counter()
+    for i in range(n):
+        counter.inc("/predictdata")
+    inc_ns = (time.perf_counter() - start) / n * 1e9
+
+    start = time.perf_counter()
+    for i in range(n):
+        pass
+    loop_ns = (time.perf_counter() - start) / n * 1e9
+
+    return {"observe_ns": observe_ns - loop_ns, "inc_ns": inc_ns - loop_ns}
+
+
+if __name__ == "__main__":
+    results = benchmark()
+    print(f"Histogram.observe {results['observe_ns']:6.0f} ns | Counter.inc {results['inc_ns']:6.0f} ns")
+    results["environment"] = environment()
+    print(f"saved {save_results(results, name='metrics')}")
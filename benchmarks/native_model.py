@@ -0,0 +1,76 @@
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from catboost import CatBoostRegressor
+from xgboost import XGBRegressor
+
+from benchmarks.common import environment, save_results
+from src.pipeline.native_model import export_native_model, load_native_model
+from src.utils import load_object
+
+
+def _per_call(fn, n):
+    fn()
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def benchmark(n_repeat=2000, batch_rows=1000):
+    """
+    Train the XGBoost and CatBoost candidates on the student data and
+    compare the pickled sklearn wrapper with the native backend: load time,
+    single-row and batch predict latency (microseconds) and max abs diff.
+    """
+    preprocessor = load_object(os.path.join("artifacts", "preprocessor.pkl"))
+    data = pd.read_csv(os.path.join("notebook", "data", "stud.csv"))
+    X = preprocessor.transform(data.drop(columns=["math_score"]))
+    y = data["math_score"].to_numpy()
+    batch = X[np.arange(batch_rows) % X.shape[0]]
+
+    models = {
+        "XGBRegressor": XGBRegressor(n_estimators=256, learning_rate=0.05, tree_method="hist", random_state=42),
+        "CatBoostRegressor": CatBoostRegressor(iterations=100, depth=6, verbose=False, random_seed=42,
+                                               allow_writing_files=False),
+    }
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, model in models.items():
+            model.fit(X, y)
+            pickle_path = os.path.join(tmp_dir, f"{name}.pkl")
+            with open(pickle_path, "wb") as f:
+                pickle.dump(model, f)
+            native_path = export_native_model(model, tmp_dir)
+
+            wrapper = load_object(pickle_path)
+            native = load_native_model(native_path)
+            results[name] = {
+                "load_pickle_ms": _per_call(lambda: load_object(pickle_path), 20) / 1e3,
+                "load_native_ms": _per_call(lambda: load_native_model(native_path), 20) / 1e3,
+                "row_pickle_us": _per_call(lambda: wrapper.predict(X[:1]), n_repeat),
+                "row_native_us": _per_call(lambda: native.predict(X[:1]), n_repeat),
+                "batch_pickle_us": _per_call(lambda: wrapper.predict(batch), n_repeat // 20),
+                "batch_native_us": _per_call(lambda: native.predict(batch), n_repeat // 20),
+                "max_abs_diff": float(np.abs(wrapper.predict(batch) - native.predict(batch)).max()),
+            }
+
+    return results
+
+
+if __name__ == "__main__":
+    results = benchmark()
+    for name, r in results.items():
+        print(
+            f"{name:<18} load {r['load_pickle_ms']:6.2f} -> {r['load_native_ms']:6.2f} ms | "
+            f"1 row {r['row_pickle_us']:7.1f} -> {r['row_native_us']:7.1f} us | "
+            f"1000 rows {r['batch_pickle_us']:8.1f} -> {r['batch_native_us']:8.1f} us | "
+            f"max diff {r['max_abs_diff']:.1e}"
+        )
+    results["environment"] = environment()
+    print(f"saved {save_results(results, name='native_model')}")
@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from benchmarks.common import free_port, post_json, server_memory, start_server, wait_until_serving
+from src.artifact_store import ArtifactStore
+from src.pipeline.predict_pipeline import SMOKE_RECORD
+from src.utils import load_object, save_object
+
+
+def _build_store(store_dir, n_estimators):
+    """Publish a RandomForest (the largest candidate model) into a scratch store."""
+    preprocessor_path = os.path.join("artifacts", "preprocessor.pkl")
+    preprocessor = load_object(preprocessor_path)
+
+    train = pd.read_csv(os.path.join("notebook", "data", "stud.csv"))
+    X = preprocessor.transform(train.drop(columns=["math_score"]))
+    model = RandomForestRegressor(n_estimators=n_estimators, random_state=42, n_jobs=1)
+    model.fit(X, train["math_score"])
+
+    model_path = os.path.join(store_dir, "model.pkl")
+    save_object(model_path, model)
+    ArtifactStore(store_dir).publish({"model.pkl": model_path, "preprocessor.pkl": preprocessor_path})
+    return os.path.getsize(model_path) / 1e6
+
+
+def _run_server(store_dir, preload, workers):
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/api/predict/batch"
+    server = start_server(
+        "gunicorn",
+        port,
+        workers,
+        env={"MODEL_STORE_DIR": store_dir, "MODEL_PRELOAD": "1" if preload else "0", "ARTIFACT_CHECK_INTERVAL": "0"},
+    )
+    try:
+        time_to_first = wait_until_serving(server, url)
+
+        # Concurrent requests so every sync worker serves (and loads) at least once
+        with ThreadPoolExecutor(workers * 4) as pool:
+            list(pool.map(lambda _: post_json(url, [SMOKE_RECORD]), range(workers * 40)))
+
+        return dict(time_to_first_prediction=time_to_first, **server_memory(server.pid))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def benchmark(workers=4, n_estimators=500):
+    """
+    Serve a RandomForest with `workers` gunicorn sync workers, first with
+    lazy per-worker loading, then preloaded in the master. Memory is per
+    worker: RSS counts shared pages in full, USS only the worker's private
+    pages; total PSS is the whole server's real footprint.
+    """
+    store_dir = tempfile.mkdtemp(prefix="preload-bench-")
+    try:
+        results = {"model_mb": _build_store(store_dir, n_estimators)}
+        for label, preload in (("lazy", False), ("preload", True)):
+            results[label] = _run_server(store_dir, preload, workers)
+        return results
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    results = benchmark()
+    print(f"RandomForest model.pkl: {results['model_mb']:.1f} MB")
+    for label in ("lazy", "preload"):
+        r = results[label]
+        print(
+            f"{label:<8} first prediction {r['time_to_first_prediction']:.2f} s | "
+            f"per worker RSS {r['worker_rss_mb']:.0f} MB, USS {r['worker_uss_mb']:.0f} MB | "
+            f"total PSS {r['total_pss_mb']:.0f} MB"
+        )
@@ -0,0 +1,134 @@
+import os
+import threading
+import time
+
+import numpy as np
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.tree import DecisionTreeRegressor
+
+from benchmarks.common import child_pids, environment, memory_mb, save_results
+from src.search_context import SearchContext
+from src.utils import _run_searches_in_processes
+
+MODELS = {
+    "Ridge": (Ridge(), {"alpha": [0.01, 0.1, 1.0, 10.0, 100.0, 1000.0]}),
+    "Decision Tree": (DecisionTreeRegressor(random_state=0), {"max_depth": [4, 8]}),
+    "Linear Regression": (LinearRegression(), {}),
+}
+
+
+def _tree_memory_mb(pid):
+    """Total PSS and summed RSS of `pid` and all of its descendants."""
+    pss = rss = 0.0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            usage = memory_mb(current)
+            pending.extend(child_pids(current))
+        except OSError:
+            continue  # exited while we looked
+        pss += usage["pss"]
+        rss += usage["rss"]
+    return pss, rss
+
+
+class _PeakSampler(threading.Thread):
+    def __init__(self, interval=0.02):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak_pss = self.peak_rss = 0.0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            pss, rss = _tree_memory_mb(os.getpid())
+            self.peak_pss = max(self.peak_pss, pss)
+            self.peak_rss = max(self.peak_rss, rss)
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def _run(data, shared, outer_jobs, inner_jobs):
+    baseline_pss, _ = _tree_memory_mb(os.getpid())
+    sampler = _PeakSampler()
+    sampler.start()
+    start = time.perf_counter()
+
+    with SearchContext.create(*data, cv=3, shared=shared) as context:
+        tasks = [
+            dict(
+                name=name,
+                model=model,
+                grid=grid,
+                context=context,
+                inner_jobs=inner_jobs,
+                search_options=dict(cv=3, random_state=42, grid_limit=60, min_iter=15, max_iter=60),
+            )
+            for name, (model, grid) in MODELS.items()
+        ]
+        results = _run_searches_in_processes(tasks, outer_jobs)
+        stats = dict(context.stats)
+
+    wall = time.perf_counter() - start
+    sampler.stop()
+    failed = {n: r.get("error") for n, r in results.items() if r["status"] != "ok"}
+    if failed:
+        raise RuntimeError(f"Searches failed: {failed}")
+
+    return dict(
+        wall_seconds=wall,
+        peak_total_pss_mb=sampler.peak_pss,
+        peak_above_baseline_pss_mb=sampler.peak_pss - baseline_pss,
+        peak_summed_rss_mb=sampler.peak_rss,
+        worker_peak_rss_mb={n: r.get("peak_rss_mb") for n, r in results.items()},
+        r2={n: r["r2_score"] for n, r in results.items()},
+        params={n: r["params"] for n, r in results.items()},
+        **stats,
+    )
+
+
+def benchmark(n_rows=400_000, n_features=19, outer_jobs=2, inner_jobs=2, seed=0):
+    """
+    Run the same three model searches on `outer_jobs` processes with
+    `inner_jobs` joblib workers each, once with the data pickled into every
+    task ("inline", the previous behaviour) and once memory-mapped from a
+    SearchContext ("shared"). Peak memory is the PSS of the whole process
+    tree, so pages shared through the mapping are counted once.
+    """
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, n_features))
+    y = X @ rng.normal(size=n_features) + rng.normal(scale=0.5, size=n_rows)
+    split = int(n_rows * 0.8)
+    data = (X[:split], y[:split], X[split:], y[split:])
+
+    results = {"rows": n_rows, "features": n_features, "outer_jobs": outer_jobs, "inner_jobs": inner_jobs}
+    for label, shared in (("inline", False), ("shared", True)):
+        results[label] = _run(data, shared, outer_jobs, inner_jobs)
+
+    results["same_results"] = (
+        results["inline"]["params"] == results["shared"]["params"]
+        and results["inline"]["r2"] == results["shared"]["r2"]
+    )
+    return results
+
+
+if __name__ == "__main__":
+    results = benchmark()
+    results["environment"] = environment()
+    print(
+        f"{results['rows']} rows x {results['features']} features, "
+        f"{results['outer_jobs']} searches x {results['inner_jobs']} jobs"
+    )
+    for label in ("inline", "shared"):
+        r = results[label]
+        print(
+            f"{label:<7} wall {r['wall_seconds']:.1f} s | peak PSS {r['peak_total_pss_mb']:.0f} MB "
+            f"(+{r['peak_above_baseline_pss_mb']:.0f}) | task payload {r['payload_bytes'] / 1e3:.1f} kB "
+            f"in {r['payload_seconds'] * 1000:.1f} ms | storage {r['storage']}"
+        )
+    print(f"identical search results: {results['same_results']}")
+    print(f"saved {save_results(results, name='search')}")
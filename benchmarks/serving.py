@@ -0,0 +1,251 @@
+"""
+Serving benchmark suite.
+
+    python -m benchmarks.serving                      # everything, JSON to benchmarks/results/
+    python -m benchmarks.serving --quick --sections models,http
+    python -m benchmarks.compare OLD.json NEW.json    # diff two runs
+
+Sections:
+  cold_start  fresh process: import application, first and second request
+              through the Flask test client (first one pays the artifact load)
+  flask       in-process Flask test client latency per route
+  models      every ModelTrainer candidate (default params) published to a
+              scratch store and served by PredictPipeline: load time,
+              single-row and 1000-row batch latency
+  http        gunicorn or uvicorn on a local port: requests/s and
+              p50/p95/p99 per concurrency level, then memory per worker
+
+The prediction cache is disabled throughout, so every request is scored.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlencode
+
+import pandas as pd
+
+from benchmarks.common import (
+    environment,
+    free_port,
+    http_load,
+    latency_summary,
+    random_records,
+    save_results,
+    server_memory,
+    start_server,
+    time_calls,
+    wait_until_serving,
+)
+from src.pipeline.predict_pipeline import SMOKE_RECORD
+
+SECTIONS = ("cold_start", "flask", "models", "http")
+
+COLD_START_SCRIPT = """
+import json, time
+start = time.perf_counter()
+from application import app
+imported = time.perf_counter()
+client = app.test_client()
+client.post("/api/predict/batch", json=[RECORD])
+first = time.perf_counter()
+client.post("/api/predict/batch", json=[dict(RECORD, reading_score=RECORD["reading_score"] - 1)])
+second = time.perf_counter()
+print("RESULT " + json.dumps({
+    "import_seconds": imported - start,
+    "first_request_seconds": first - imported,
+    "second_request_seconds": second - first,
+}))
+"""
+
+
+def _isolated_env(store_dir):
+    """Serve the flat artifacts (an empty store) with the cache and watcher off."""
+    return {
+        "MODEL_STORE_DIR": store_dir,
+        "PREDICT_CACHE_SIZE": "0",
+        "ARTIFACT_CHECK_INTERVAL": "0",
+    }
+
+
+def _configure_pipeline(store_dir):
+    from src.artifact_store import ArtifactStore
+    from src.pipeline.predict_pipeline import PredictionCache, PredictPipeline
+
+    PredictPipeline.store = ArtifactStore(store_dir)
+    PredictPipeline.config.artifact_check_interval = 0
+    PredictPipeline._cache = PredictionCache(0)
+    PredictPipeline.reload(force=True)
+    return PredictPipeline
+
+
+def bench_cold_start(store_dir, runs=3):
+    script = COLD_START_SCRIPT.replace("RECORD", repr(SMOKE_RECORD))
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", script],
+            env=dict(os.environ, PYTHONWARNINGS="ignore", **_isolated_env(store_dir)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        line = next(l for l in out.splitlines() if l.startswith("RESULT "))
+        samples.append(json.loads(line[len("RESULT "):]))
+
+    return {key: min(s[key] for s in samples) for key in samples[0]} | {"runs": runs}
+
+
+def bench_flask(store_dir, n=300):
+    _configure_pipeline(store_dir)
+    from application import app
+
+    client = app.test_client()
+    records = random_records(n, seed=1)
+
+    def form(record):
+        client.post("/predictdata", data=record)
+
+    def single(record):
+        client.post("/api/predict/batch", json=[record])
+
+    batches = [records[i:i + 100] for i in range(0, n, 100)] * 3
+
+    return {
+        "predictdata_form": latency_summary(time_calls(form, [(r,) for r in records])),
+        "api_batch_1": latency_summary(time_calls(single, [(r,) for r in records])),
+        "api_batch_100": latency_summary(time_calls(lambda b: client.post("/api/predict/batch", json=b),
+                                                    [(b,) for b in batches])),
+    }
+
+
+def bench_models(store_dir, n_single=300, n_batches=10, batch_rows=1000):
+    from src.components.model_trainer import ModelTrainer
+    from src.pipeline.predict_pipeline import CustomData
+    from src.utils import load_object, save_object
+
+    preprocessor_path = os.path.join("artifacts", "preprocessor.pkl")
+    preprocessor = load_object(preprocessor_path)
+    data = pd.read_csv(os.path.join("notebook", "data", "stud.csv"))
+    X = preprocessor.transform(data.drop(columns=["math_score"]))
+    y = data["math_score"].to_numpy()
+
+    trainer = ModelTrainer()
+    config = trainer.model_trainer_config
+    config.model_store_dir = store_dir
+    config.trained_model_file_path = os.path.join(store_dir, "model.pkl")
+    config.build_prediction_table = False
+
+    models, _ = trainer.get_models_and_params()
+    singles = [CustomData.from_record(r) for r in random_records(n_single, seed=2)]
+    batch = random_records(batch_rows, seed=3)
+    results = {}
+
+    for name, model in models.items():
+        if "CatBoost" in type(model).__name__:
+            model.set_params(allow_writing_files=False)
+
+        start = time.perf_counter()
+        model.fit(X, y)
+        fit_seconds = time.perf_counter() - start
+
+        save_object(config.trained_model_file_path, model)
+        trainer.publish_model_version(preprocessor_path, None, name, {})
+
+        pipeline_cls = _configure_pipeline(store_dir)
+        start = time.perf_counter()
+        pipeline_cls.reload(force=True)
+        load_seconds = time.perf_counter() - start
+
+        pipeline = pipeline_cls()
+        single = latency_summary(time_calls(pipeline.predict_record, [(d,) for d in singles]))
+        batched = latency_summary(time_calls(pipeline.predict_batch, [(batch,)] * n_batches))
+
+        results[name] = {
+            "backend": pipeline_cls.model_info()["backend"],
+            "fit_seconds": fit_seconds,
+            "load_seconds": load_seconds,
+            "single_row": single,
+            f"batch_{batch_rows}": batched,
+            "batch_rows_per_second": batch_rows / (batched["mean_ms"] / 1000),
+        }
+
+    return results
+
+
+def bench_http(store_dir, server="gunicorn", workers=2, concurrency=(1, 8, 32, 128), n_requests=2000):
+    port = free_port()
+    process = start_server(server, port, workers, env=_isolated_env(store_dir))
+    try:
+        startup_seconds = wait_until_serving(process, f"http://127.0.0.1:{port}/api/predict/batch")
+
+        levels = {}
+        for level in concurrency:
+            bodies = [json.dumps([r]).encode("utf-8") for r in random_records(n_requests, seed=level)]
+            levels[str(level)] = http_load(port, "/api/predict/batch", bodies, level)
+
+        forms = [urlencode(r).encode("ascii") for r in random_records(n_requests // 2, seed=99)]
+        form = http_load(port, "/predictdata", forms, max(concurrency), "application/x-www-form-urlencoded")
+
+        return {
+            "server": server,
+            "workers": workers,
+            "startup_to_first_prediction_seconds": startup_seconds,
+            "api_batch_1": levels,
+            "predictdata_form": form,
+            "memory": server_memory(process.pid),
+        }
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def run(sections=SECTIONS, quick=False, server="gunicorn", workers=2, concurrency=(1, 8, 32, 128)):
+    scale = 0.2 if quick else 1.0
+    store_dir = tempfile.mkdtemp(prefix="serving-bench-")
+    results = {"environment": environment(), "quick": quick}
+
+    try:
+        if "cold_start" in sections:
+            results["cold_start"] = bench_cold_start(store_dir, runs=1 if quick else 3)
+        if "flask" in sections:
+            results["flask"] = bench_flask(store_dir, n=int(300 * scale) or 1)
+        if "models" in sections:
+            model_dir = tempfile.mkdtemp(prefix="store-", dir=store_dir)
+            results["models"] = bench_models(model_dir, n_single=int(300 * scale), n_batches=3 if quick else 10)
+        if "http" in sections:
+            results["http"] = bench_http(store_dir, server, workers, concurrency, n_requests=int(2000 * scale))
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serving latency/throughput benchmarks")
+    parser.add_argument("--sections", default=",".join(SECTIONS), help=f"comma list of {', '.join(SECTIONS)}")
+    parser.add_argument("--quick", action="store_true", help="fewer repetitions (smoke run)")
+    parser.add_argument("--server", default="gunicorn", choices=["gunicorn", "uvicorn"])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", default="1,8,32,128")
+    parser.add_argument("--output-dir", default=os.path.join("benchmarks", "results"))
+    args = parser.parse_args(argv)
+
+    results = run(
+        sections=[s.strip() for s in args.sections.split(",") if s.strip()],
+        quick=args.quick,
+        server=args.server,
+        workers=args.workers,
+        concurrency=tuple(int(c) for c in args.concurrency.split(",")),
+    )
+    path = save_results(results, args.output_dir)
+    print(json.dumps({k: v for k, v in results.items() if k != "environment"}, indent=2))
+    print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Serving start-up benchmark.
+
+    python -m benchmarks.startup            # JSON to benchmarks/results/startup-*.json
+
+Every scenario runs in a fresh interpreter: import application, optionally
+application.warm_up(), then two /predictdata requests through the Flask
+test client. Reported per scenario: import, warm-up and first/second request
+seconds, and which heavy libraries are loaded after import and after the
+first request. Scenarios serve the flat artifacts and the same artifacts
+published as a store version (which records a smoke prediction), each cold
+and warmed up. `import_profile` is the slowest modules of
+`python -X importtime -c "import application"`.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.common import environment, save_results
+from src.pipeline.predict_pipeline import SMOKE_RECORD
+
+HEAVY_MODULES = ("pandas", "scipy", "sklearn", "sklearn.model_selection", "sklearn.ensemble", "xgboost", "catboost")
+
+SCRIPT = """
+import json, sys, time
+HEAVY = HEAVY_MODULES
+start = time.perf_counter()
+from application import app, warm_up
+imported = time.perf_counter()
+after_import = [m for m in HEAVY if m in sys.modules]
+warm_up_seconds = warm_up() if WARM_UP else None
+ready = time.perf_counter()
+client = app.test_client()
+client.post("/predictdata", data=RECORD)
+first = time.perf_counter()
+client.post("/predictdata", data=dict(RECORD, reading_score=RECORD["reading_score"] - 1))
+second = time.perf_counter()
+print("RESULT " + json.dumps({
+    "import_seconds": imported - start,
+    "warm_up_seconds": warm_up_seconds,
+    "first_request_seconds": first - ready,
+    "second_request_seconds": second - first,
+    "modules_after_import": after_import,
+    "modules_after_first_request": [m for m in HEAVY if m in sys.modules],
+}))
+"""
+
+
+def _run(code, env, args=()):
+    return subprocess.run(
+        [sys.executable, *args, "-c", code],
+        env=dict(os.environ, PYTHONWARNINGS="ignore", PREDICT_CACHE_SIZE="0", ARTIFACT_CHECK_INTERVAL="0", **env),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def _publish(store_dir):
+    """Publish the flat artifacts as a store version, as a training run would."""
+    from src.components.model_trainer import ModelTrainer
+
+    trainer = ModelTrainer()
+    trainer.model_trainer_config.model_store_dir = store_dir
+    trainer.model_trainer_config.build_prediction_table = False
+    trainer.publish_model_version(os.path.join("artifacts", "preprocessor.pkl"), None, "current", {})
+
+
+def bench_scenario(store_dir, warm_up, runs=3):
+    script = (
+        SCRIPT.replace("HEAVY_MODULES", repr(HEAVY_MODULES))
+        .replace("WARM_UP", repr(warm_up))
+        .replace("RECORD", repr(SMOKE_RECORD))
+    )
+    samples = []
+    for _ in range(runs):
+        out = _run(script, {"MODEL_STORE_DIR": store_dir}).stdout
+        line = next(l for l in out.splitlines() if l.startswith("RESULT "))
+        samples.append(json.loads(line[len("RESULT "):]))
+
+    result = {}
+    for key, value in samples[0].items():
+        numeric = isinstance(value, float)
+        result[key] = min(s[key] for s in samples) if numeric else value
+    return result
+
+
+def import_profile(top=15):
+    """Slowest modules (self time) and the total for `import application`."""
+    stderr = _run("import application", {}, ("-X", "importtime")).stderr
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((name.strip(), int(self_us), int(cumulative_us)))
+
+    total = next(c for name, s, c in entries if name == "application")
+    slowest = sorted(entries, key=lambda e: e[1], reverse=True)[:top]
+    return {
+        "total_seconds": total / 1e6,
+        "modules": len(entries),
+        "slowest_self_ms": {name: s / 1000 for name, s, c in slowest},
+    }
+
+
+def run(runs=3):
+    work_dir = tempfile.mkdtemp(prefix="startup-bench-")
+    flat_dir = os.path.join(work_dir, "empty-store")
+    store_dir = os.path.join(work_dir, "store")
+    results = {"environment": environment(), "import_profile": import_profile()}
+
+    try:
+        _publish(store_dir)
+        for label, path in (("flat", flat_dir), ("store", store_dir)):
+            for warm_up in (False, True):
+                name = f"{label}_{'warm' if warm_up else 'cold'}"
+                results[name] = bench_scenario(path, warm_up, runs)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serving import and first-request benchmark")
+    parser.add_argument("--runs", type=int, default=3, help="fresh processes per scenario (min is reported)")
+    parser.add_argument("--output-dir", default=os.path.join("benchmarks", "results"))
+    args = parser.parse_args(argv)
+
+    results = run(args.runs)
+    path = save_results(results, args.output_dir, name="startup")
+    print(json.dumps({k: v for k, v in results.items() if k != "environment"}, indent=2))
+    print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import AdaBoostRegressor, ExtraTreesRegressor, GradientBoostingRegressor, RandomForestRegressor
+from sklearn.tree import DecisionTreeRegressor
+
+from benchmarks.common import environment, save_results
+from src.pipeline.tree_engine import FlatTreeEnsemble
+from src.utils import load_object
+
+
+def _per_call(fn, n):
+    fn()
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n
+
+
+def benchmark(n_repeat=300, batch_rows=1000, sweep_rows=(1, 8, 64, 256, 1024, 4096)):
+    """
+    Fit every supported candidate on the student data and compare sklearn's
+    predict with the flattened engine: artifact size (pickle vs .npz),
+    single-row latency, batch throughput and max abs difference. The sweep
+    gives sklearn/flat time per batch size, the basis of FLAT_MAX_ROWS.
+    """
+    preprocessor = load_object(os.path.join("artifacts", "preprocessor.pkl"))
+    data = pd.read_csv(os.path.join("notebook", "data", "stud.csv"))
+    X = preprocessor.transform(data.drop(columns=["math_score"]))
+    X = X.toarray() if hasattr(X, "toarray") else np.asarray(X)
+    y = data["math_score"].to_numpy()
+    batch = X[np.arange(batch_rows) % X.shape[0]]
+
+    models = {
+        "Decision Tree": DecisionTreeRegressor(random_state=42),
+        "Random Forest": RandomForestRegressor(n_estimators=128, random_state=42, n_jobs=1),
+        "Extra Trees": ExtraTreesRegressor(n_estimators=128, random_state=42, n_jobs=1),
+        "Gradient Boosting": GradientBoostingRegressor(n_estimators=128, random_state=42),
+        "AdaBoost Regressor": AdaBoostRegressor(n_estimators=128, random_state=42),
+    }
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, model in models.items():
+            model.fit(X, y)
+            pickle_path = os.path.join(tmp_dir, "model.pkl")
+            with open(pickle_path, "wb") as f:
+                pickle.dump(model, f)
+            flat_path = FlatTreeEnsemble.from_sklearn(model).save(os.path.join(tmp_dir, "model.trees.npz"))
+            flat = FlatTreeEnsemble.load(flat_path)
+
+            row_sklearn = _per_call(lambda: model.predict(X[:1]), n_repeat)
+            row_flat = _per_call(lambda: flat.predict(X[:1]), n_repeat)
+            batch_sklearn = _per_call(lambda: model.predict(batch), max(n_repeat // 20, 3))
+            batch_flat = _per_call(lambda: flat.predict(batch), max(n_repeat // 20, 3))
+
+            results[name] = {
+                "pickle_kb": os.path.getsize(pickle_path) / 1024,
+                "flat_kb": os.path.getsize(flat_path) / 1024,
+                "row_sklearn_us": row_sklearn * 1e6,
+                "row_flat_us": row_flat * 1e6,
+                "batch_rows_per_second_sklearn": batch_rows / batch_sklearn,
+                "batch_rows_per_second_flat": batch_rows / batch_flat,
+                "max_abs_diff": float(np.abs(model.predict(X) - flat.predict(X)).max()),
+                "speedup_by_rows": {},
+            }
+            for rows in sweep_rows:
+                sweep = X[np.arange(rows) % X.shape[0]]
+                n = max(3, n_repeat // rows)
+                results[name]["speedup_by_rows"][rows] = (
+                    _per_call(lambda: model.predict(sweep), n) / _per_call(lambda: flat.predict(sweep), n)
+                )
+
+    return results
+
+
+if __name__ == "__main__":
+    results = benchmark()
+    for name, r in results.items():
+        print(
+            f"{name:<18} size {r['pickle_kb']:8.1f} -> {r['flat_kb']:7.1f} KB | "
+            f"1 row {r['row_sklearn_us']:7.1f} -> {r['row_flat_us']:6.1f} us | "
+            f"rows/s {r['batch_rows_per_second_sklearn']:9.0f} -> {r['batch_rows_per_second_flat']:9.0f} | "
+            f"max diff {r['max_abs_diff']:.1e}"
+        )
+        print(" " * 19 + "speedup by rows: " + ", ".join(f"{k}: {v:.2f}x" for k, v in r["speedup_by_rows"].items()))
+    results["environment"] = environment()
+    print(f"saved {save_results(results, name='tree_engine')}")
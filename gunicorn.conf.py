@@ -0,0 +1,92 @@
+# ============================================================
+# Gunicorn settings (read automatically from the working directory)
+# ============================================================
+# Command-line flags (bind, workers, threads from the EB Procfile)
+# still take precedence over anything set here.
+import gc
+import glob
+import os
+import shutil
+import tempfile
+
+# Load the model once in the master and fork the workers from it, so all
+# workers share the model's pages copy-on-write instead of each unpickling
+# its own copy. MODEL_PRELOAD=0 restores lazy per-worker loading.
+preload_model = os.getenv("MODEL_PRELOAD", "1").strip().lower() not in ("0", "false", "no", "off")
+preload_app = preload_model
+
+_created_metrics_dir = None
+
+
+def on_starting(server):
+    # Workers write metric snapshots here and /metrics merges them, so a
+    # scrape sees the whole server rather than whichever worker answered.
+    # Leftovers from a previous run would double count, so start empty.
+    global _created_metrics_dir
+    if not os.getenv("METRICS_DIR"):
+        _created_metrics_dir = os.environ["METRICS_DIR"] = tempfile.mkdtemp(prefix="gunicorn-metrics-")
+    metrics_dir = os.environ["METRICS_DIR"]
+    os.makedirs(metrics_dir, exist_ok=True)
+    for path in glob.glob(os.path.join(metrics_dir, "*.json")):
+        os.remove(path)
+
+
+def on_exit(server):
+    if _created_metrics_dir:
+        shutil.rmtree(_created_metrics_dir, ignore_errors=True)
+
+
+def post_fork(server, worker):
+    # Runs in the new worker before it accepts connections: the first user
+    # request must not pay for model loading or lazy imports.
+    from src.metrics import REGISTRY
+    from src.pipeline.predict_pipeline import PredictPipeline
+
+    REGISTRY.start_flusher()
+    if PredictPipeline.config.warm_up:
+        try:
+            from application import warm_up
+
+            seconds = warm_up()
+            server.log.info(f"Worker {worker.pid} warmed up in {seconds:.2f}s")
+        except Exception as e:
+            server.log.warning(f"Worker {worker.pid} warm-up failed, loading lazily: {e}")
+
+
+def child_exit(server, worker):
+    # Keep a dead worker's counters in the totals (they must never go
+    # backwards) but drop its gauges, e.g. its loaded model version.
+    from src.metrics import REGISTRY
+
+    try:
+        REGISTRY.archive_process(worker.pid)
+    except Exception as e:
+        server.log.warning(f"Could not archive metrics of worker {worker.pid}: {e}")
+
+
+def when_ready(server):
+    # Runs in the master after the socket is bound and before any worker is
+    # forked. A failure here must not stop the server (the reason the app
+    # avoids import-time loading): workers then load lazily as before.
+    if not preload_model:
+        return
+
+    try:
+        from src.pipeline.predict_pipeline import PredictPipeline
+
+        bundle = PredictPipeline.preload()
+        server.log.info(f"Preloaded model version {bundle.version}")
+        # Pull the serving path's lazy imports into the master too, so the
+        # workers share them instead of each importing its own copy
+        if PredictPipeline.config.warm_up:
+            from application import warm_up
+
+            warm_up()
+    except Exception as e:
+        server.log.warning(f"Model preload failed, workers will load lazily: {e}")
+
+    # Move everything allocated so far out of the collector's reach; a GC
+    # pass in a worker would otherwise write to every object header and
+    # un-share the pages.
+    gc.collect()
+    gc.freeze()
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import file_sha256, replace_path
+
+STORE_DIR = os.path.join("artifacts", "models")
+MANIFEST_FILE = "manifest.json"
+CURRENT_FILE = "CURRENT"
+
+
+class ArtifactStore:
+    """
+    Immutable, versioned model artifacts.
+
+    Every published version is a directory <root>/<version>/ holding copies
+    of the serving files (model, preprocessor, prediction table) plus a
+    manifest.json with their sha256 and free-form metadata. <root>/CURRENT
+    names the live version and is switched with a single atomic rename, so
+    a reader sees either the old version or the new one, never a mix.
+    """
+
+    def __init__(self, root=STORE_DIR, keep_versions=5):
+        self.root = root
+        self.keep_versions = keep_versions
+
+    def version_dir(self, version):
+        return os.path.join(self.root, version)
+
+    def path(self, version, name):
+        return os.path.join(self.version_dir(version), name)
+
+    def current_version(self):
+        """Name of the live version, or None if nothing was published yet."""
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def read_manifest(self, version):
+        try:
+            with open(os.path.join(self.version_dir(version), MANIFEST_FILE)) as f:
+                return json.load(f)
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def current_matches(self, files):
+        """True when CURRENT holds every file in `files` ({name: path}) with the same content."""
+        current = self.current_version()
+        if current is None:
+            return False
+        published = self.read_manifest(current).get("files", {})
+        return all(published.get(name) == file_sha256(path) for name, path in files.items())
+
+    def versions(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if not name.startswith(".") and os.path.exists(os.path.join(self.root, name, MANIFEST_FILE))
+        )
+
+    def publish(self, files, metadata=None):
+        """
+        Copy `files` ({name: path}) into a new version, make it current and
+        return its name. Re-publishing the current content is a no-op.
+        """
+        try:
+            hashes = {name: file_sha256(path) for name, path in sorted(files.items())}
+            digest = hashlib.sha256(json.dumps(hashes, sort_keys=True).encode("utf-8")).hexdigest()
+
+            current = self.current_version()
+            if current is not None and self.read_manifest(current).get("content_sha256") == digest:
+                logging.info(f"Artifacts unchanged; {current} stays current")
+                return current
+
+            version = f"{time.strftime('%Y%m%d-%H%M%S')}-{digest[:8]}"
+            os.makedirs(self.root, exist_ok=True)
+            tmp_dir = tempfile.mkdtemp(dir=self.root, prefix=".tmp-")
+
+            for name, path in files.items():
+                shutil.copyfile(path, os.path.join(tmp_dir, name))
+
+            manifest = {
+                "version": version,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "content_sha256": digest,
+                "files": hashes,
+                "metadata": metadata or {},
+            }
+            with open(os.path.join(tmp_dir, MANIFEST_FILE), "w") as f:
+                json.dump(manifest, f, indent=2, default=str)
+
+            replace_path(tmp_dir, self.version_dir(version))
+            self._set_current(version)
+            logging.info(f"Published model version {version}")
+
+            self.prune()
+            return version
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _set_current(self, version):
+        with tempfile.NamedTemporaryFile("w", delete=False, dir=self.root, suffix=".tmp") as tmp:
+            tmp.write(version)
+            temp_path = tmp.name
+        os.replace(temp_path, os.path.join(self.root, CURRENT_FILE))
+
+    def rollback(self, version):
+        """Point CURRENT back at an already published version."""
+        if version not in self.versions():
+            raise CustomException(f"Unknown model version: {version}", sys)
+        self._set_current(version)
+
+    def prune(self):
+        """Delete the oldest versions beyond `keep_versions`, never the current one."""
+        if not self.keep_versions or self.keep_versions <= 0:
+            return
+        current = self.current_version()
+        old = [v for v in self.versions() if v != current]
+        for version in old[:max(0, len(old) - (self.keep_versions - 1))]:
+            shutil.rmtree(self.version_dir(version), ignore_errors=True)
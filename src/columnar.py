@@ -0,0 +1,118 @@
+import json
+import os
+import sys
+
+import numpy as np
+
+from src.exception import CustomException
+from src.utils import replace_path
+
+SCHEMA_FILE = "schema.json"
+FORMAT_VERSION = 1
+
+
+def is_columnar(path):
+    return not str(path).lower().endswith(".csv")
+
+
+def write_frame(df, path):
+    """
+    Write a DataFrame as a columnar artifact: a directory holding one .npy
+    per column plus schema.json. String/categorical columns are stored as
+    integer codes with their categories in the schema, so dtypes survive
+    the round trip and every column can be memory-mapped on read.
+    Paths ending in .csv are written as plain CSV instead.
+    """
+    import pandas as pd
+
+    try:
+        if not is_columnar(path):
+            df.to_csv(path, index=False, header=True)
+            return
+
+        tmp_dir = f"{path}.tmp-{os.getpid()}"
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        schema = {"format_version": FORMAT_VERSION, "n_rows": len(df), "columns": []}
+        for i, (name, series) in enumerate(df.items()):
+            file_name = f"{i:03d}.npy"
+            entry = {"name": name, "file": file_name, "pandas_dtype": str(series.dtype)}
+
+            if series.dtype == object or isinstance(series.dtype, pd.CategoricalDtype):
+                values = series.astype("category")
+                np.save(os.path.join(tmp_dir, file_name), values.cat.codes.to_numpy())
+                entry.update(
+                    kind="categorical",
+                    categories=values.cat.categories.tolist(),
+                    ordered=bool(values.cat.ordered),
+                )
+            else:
+                np.save(os.path.join(tmp_dir, file_name), series.to_numpy())
+                entry.update(kind="numeric")
+
+            schema["columns"].append(entry)
+
+        with open(os.path.join(tmp_dir, SCHEMA_FILE), "w") as f:
+            json.dump(schema, f, indent=2)
+
+        replace_path(tmp_dir, path)
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def read_schema(path):
+    with open(os.path.join(path, SCHEMA_FILE)) as f:
+        return json.load(f)
+
+
+def read_columns(path, columns=None, mmap=True):
+    """
+    Return {column: ndarray} straight from a columnar artifact without
+    building a DataFrame (or importing pandas). Numeric columns are memory-mapped when `mmap`;
+    categorical columns come back as their integer codes.
+    """
+    try:
+        schema = read_schema(path)
+        mode = "r" if mmap else None
+        return {
+            entry["name"]: np.load(os.path.join(path, entry["file"]), mmap_mode=mode)
+            for entry in schema["columns"]
+            if columns is None or entry["name"] in columns
+        }
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def read_frame(path, columns=None, mmap=True):
+    """Read a columnar (or .csv) artifact back into a DataFrame with its original dtypes."""
+    import pandas as pd
+
+    try:
+        if not is_columnar(path):
+            return pd.read_csv(path, usecols=columns)
+
+        schema = read_schema(path)
+        mode = "r" if mmap else None
+        data = {}
+
+        for entry in schema["columns"]:
+            if columns is not None and entry["name"] not in columns:
+                continue
+
+            values = np.load(os.path.join(path, entry["file"]), mmap_mode=mode)
+            if entry["kind"] == "categorical":
+                values = pd.Categorical.from_codes(
+                    np.asarray(values),
+                    categories=entry["categories"],
+                    ordered=entry["ordered"],
+                )
+                if entry["pandas_dtype"] == "object":
+                    values = np.asarray(values.astype(object))
+
+            data[entry["name"]] = values
+
+        return pd.DataFrame(data, copy=False)
+
+    except Exception as e:
+        raise CustomException(e, sys)
@@ -5,49 +5,99 @@ from dataclasses import dataclass
 import pandas as pd
 from sklearn.model_selection import train_test_split
 
+from src.columnar import write_frame
 from src.exception import CustomException
 from src.logger import logging
+from src.profiler import annotate, profile_run, span
 from src.components.data_transformation import DataTransformation
 from src.components.model_trainer import ModelTrainer
+from src.stage_cache import StageCache
+from src.utils import file_sha256
 
 
 @dataclass
 class DataIngestionConfig:
-    train_data_path: str = os.path.join("artifacts", "train.csv")
-    test_data_path: str = os.path.join("artifacts", "test.csv")
-    raw_data_path: str = os.path.join("artifacts", "data.csv")
+    # Columnar artifacts (see src/columnar.py); point these at .csv files
+    # to hand off plain CSV instead
+    train_data_path: str = os.path.join("artifacts", "train.cols")
+    test_data_path: str = os.path.join("artifacts", "test.cols")
+    raw_data_path: str = os.path.join("artifacts", "data.cols")
+    # Optional CSV copies of the same data (notebooks, manual inspection)
+    export_csv: bool = False
+    train_csv_path: str = os.path.join("artifacts", "train.csv")
+    test_csv_path: str = os.path.join("artifacts", "test.csv")
+    raw_csv_path: str = os.path.join("artifacts", "data.csv")
+    # ✅ Robust dataset path (relative to project root)
+    source_data_path: str = os.path.join("notebook", "data", "stud.csv")
+    test_size: float = 0.2
+    random_state: int = 42
 
 
 class DataIngestion:
     def __init__(self):
         self.ingestion_config = DataIngestionConfig()
+        self.cache = StageCache()
 
+    @span("data_ingestion")
     def initiate_data_ingestion(self):
         logging.info("Entered the data ingestion component")
         try:
-            # ✅ Robust dataset path (relative to project root)
-            data_path = os.path.join("notebook", "data", "stud.csv")
+            data_path = self.ingestion_config.source_data_path
+            outputs = {
+                "data": self.ingestion_config.raw_data_path,
+                "train": self.ingestion_config.train_data_path,
+                "test": self.ingestion_config.test_data_path,
+            }
+            if self.ingestion_config.export_csv:
+                outputs.update({
+                    "data.csv": self.ingestion_config.raw_csv_path,
+                    "train.csv": self.ingestion_config.train_csv_path,
+                    "test.csv": self.ingestion_config.test_csv_path,
+                })
+
+            cache_key = self.cache.make_key(
+                "data_ingestion",
+                file_sha256(data_path),
+                {name: os.path.splitext(path)[1] for name, path in outputs.items()},
+                self.ingestion_config.test_size,
+                self.ingestion_config.random_state,
+            )
+            if self.cache.restore_files("data_ingestion", cache_key, outputs):
+                logging.info("Source data and split unchanged; skipped data ingestion")
+                annotate(cached=True)
+                return self.ingestion_config.train_data_path, self.ingestion_config.test_data_path
 
-            df = pd.read_csv(data_path)
+            with span("read_source"):
+                df = pd.read_csv(data_path)
             logging.info("Read the dataset as dataframe")
+            annotate(rows=len(df))
 
             # ✅ Ensure artifacts directory exists
             artifacts_dir = os.path.dirname(self.ingestion_config.train_data_path) or "artifacts"
             os.makedirs(artifacts_dir, exist_ok=True)
 
             # Save raw data
-            df.to_csv(self.ingestion_config.raw_data_path, index=False, header=True)
+            with span("write_raw"):
+                write_frame(df, self.ingestion_config.raw_data_path)
             logging.info(f"Saved raw data to: {self.ingestion_config.raw_data_path}")
 
             logging.info("Train-test split initiated")
             train_set, test_set = train_test_split(
                 df,
-                test_size=0.2,
-                random_state=42
+                test_size=self.ingestion_config.test_size,
+                random_state=self.ingestion_config.random_state
             )
 
-            train_set.to_csv(self.ingestion_config.train_data_path, index=False, header=True)
-            test_set.to_csv(self.ingestion_config.test_data_path, index=False, header=True)
+            with span("write_splits"):
+                write_frame(train_set, self.ingestion_config.train_data_path)
+                write_frame(test_set, self.ingestion_config.test_data_path)
+
+            if self.ingestion_config.export_csv:
+                write_frame(df, self.ingestion_config.raw_csv_path)
+                write_frame(train_set, self.ingestion_config.train_csv_path)
+                write_frame(test_set, self.ingestion_config.test_csv_path)
+
+            self.cache.store_files("data_ingestion", cache_key, outputs)
 
             logging.info("Data ingestion completed")
             logging.info(f"Train data saved to: {self.ingestion_config.train_data_path}")
@@ -60,11 +110,13 @@ class DataIngestion:
 
 
 if __name__ == "__main__":
-    obj = DataIngestion()
-    train_data, test_data = obj.initiate_data_ingestion()
+    # Writes artifacts/run_reports/training-<time>.json; PROFILE_TRAINING=1 adds cProfile output
+    with profile_run("training"):
+        obj = DataIngestion()
+        train_data, test_data = obj.initiate_data_ingestion()
 
-    data_transformation = DataTransformation()
-    train_arr, test_arr, _ = data_transformation.initiate_data_transformation(train_data, test_data)
+        data_transformation = DataTransformation()
+        train_set, test_set, preprocessor_path = data_transformation.initiate_data_transformation(train_data, test_data)
 
-    model_trainer = ModelTrainer()
-    print(model_trainer.initiate_model_trainer(train_arr, test_arr))
+        model_trainer = ModelTrainer()
+        print(model_trainer.initiate_model_trainer(train_set, test_set, preprocessor_path))
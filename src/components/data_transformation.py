@@ -3,14 +3,17 @@ import sys
 from dataclasses import dataclass
 
 import numpy as np
-import pandas as pd
+from scipy import sparse
 from sklearn.compose import ColumnTransformer
 from sklearn.impute import SimpleImputer
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
 
+from src.columnar import read_frame
 from src.exception import CustomException
 from src.logger import logging
+from src.profiler import annotate, span
+from src.stage_cache import StageCache, path_sha256
 from src.utils import save_object
 
 
@@ -18,11 +21,15 @@ from src.utils import save_object
 class DataTransformationConfig:
     # ✅ FIXED filename
     preprocessor_obj_file_path: str = os.path.join("artifacts", "preprocessor.pkl")
+    # The transformed matrix stays sparse (CSR) when its overall density is
+    # below this; 1.0 always keeps it sparse, 0.0 always densifies
+    sparse_threshold: float = 0.3
 
 
 class DataTransformation:
     def __init__(self):
         self.data_transformation_config = DataTransformationConfig()
+        self.cache = StageCache()
 
     def get_data_transformer_object(self):
         """Build and return the preprocessing pipeline."""
@@ -53,7 +60,8 @@ class DataTransformation:
                 transformers=[
                     ("num_pipeline", num_pipeline, numerical_columns),
                     ("cat_pipeline", cat_pipeline, categorical_columns),
-                ]
+                ],
+                sparse_threshold=self.data_transformation_config.sparse_threshold,
             )
 
             return preprocessor
@@ -61,36 +69,68 @@ class DataTransformation:
         except Exception as e:
             raise CustomException(e, sys)
 
+    @span("data_transformation")
     def initiate_data_transformation(self, train_path, test_path):
-        try:
-            train_df = pd.read_csv(train_path)
-            test_df = pd.read_csv(test_path)
-            logging.info("Read train and test data completed")
+        """
+        Fit the preprocessor on the train split and transform both splits.
 
+        Returns ((X_train, y_train), (X_test, y_test), preprocessor_path).
+        X is a CSR matrix when the one-hot output is sparse enough (see
+        sparse_threshold), otherwise a dense array; y is a 1-D float array.
+        """
+        try:
             target_column_name = "math_score"
+            preprocessor_path = self.data_transformation_config.preprocessor_obj_file_path
+
+            cache_key = self.cache.make_key(
+                "data_transformation",
+                path_sha256(train_path),
+                path_sha256(test_path),
+                target_column_name,
+                self.get_data_transformer_object(),
+            )
+            cached = self.cache.get("data_transformation", cache_key)
+            if cached is not None and self.cache.restore_files(
+                "data_transformation", cache_key, {"preprocessor.pkl": preprocessor_path}
+            ):
+                logging.info("Train/test data and transformer unchanged; skipped data transformation")
+                annotate(cached=True)
+                return cached["train_set"], cached["test_set"], preprocessor_path
+
+            train_df = read_frame(train_path)
+            test_df = read_frame(test_path)
+            logging.info("Read train and test data completed")
 
             X_train = train_df.drop(columns=[target_column_name])
-            y_train = train_df[target_column_name]
+            y_train = train_df[target_column_name].to_numpy(dtype=np.float64)
 
             X_test = test_df.drop(columns=[target_column_name])
-            y_test = test_df[target_column_name]
+            y_test = test_df[target_column_name].to_numpy(dtype=np.float64)
 
             preprocessing_obj = self.get_data_transformer_object()
             logging.info("Fitting preprocessing object on train data")
 
-            X_train_arr = preprocessing_obj.fit_transform(X_train)
-            X_test_arr = preprocessing_obj.transform(X_test)
+            with span("fit_transform", rows=len(X_train)):
+                X_train_arr = preprocessing_obj.fit_transform(X_train)
+            with span("transform", rows=len(X_test)):
+                X_test_arr = preprocessing_obj.transform(X_test)
 
-            train_arr = np.c_[X_train_arr, np.array(y_train)]
-            test_arr = np.c_[X_test_arr, np.array(y_test)]
+            train_set = (X_train_arr, y_train)
+            test_set = (X_test_arr, y_test)
+            layout = "sparse" if sparse.issparse(X_train_arr) else "dense"
+            logging.info(f"Transformed train features: {layout} {X_train_arr.shape}")
+            annotate(layout=layout, shape=list(X_train_arr.shape))
 
             logging.info("Saving preprocessing object")
             save_object(
-                file_path=self.data_transformation_config.preprocessor_obj_file_path,
+                file_path=preprocessor_path,
                 obj=preprocessing_obj,
             )
 
-            return train_arr, test_arr, self.data_transformation_config.preprocessor_obj_file_path
+            self.cache.put("data_transformation", cache_key, {"train_set": train_set, "test_set": test_set})
+            self.cache.store_files("data_transformation", cache_key, {"preprocessor.pkl": preprocessor_path})
+
+            return train_set, test_set, preprocessor_path
 
         except Exception as e:
             raise CustomException(e, sys)
@@ -0,0 +1,475 @@
+import copy
+import csv
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import r2_score
+
+from src.columnar import read_frame, write_frame
+from src.components.data_ingestion import DataIngestionConfig
+from src.components.data_transformation import DataTransformation
+from src.components.model_trainer import ModelTrainer
+from src.exception import CustomException
+from src.logger import logging
+from src.pipeline.compiled_preprocessor import CompiledPreprocessor
+from src.profiler import annotate, profile_run, record, span
+from src.utils import load_object, save_object
+
+
+@dataclass
+class IncrementalTrainerConfig:
+    # The artifacts the full DataIngestion -> ModelTrainer chain writes
+    train_data_path: str = DataIngestionConfig.train_data_path
+    test_data_path: str = DataIngestionConfig.test_data_path
+    raw_data_path: str = DataIngestionConfig.raw_data_path
+    # New rows are appended here too, so the next full run (and the
+    # ingestion cache key, a hash of this file) includes them
+    source_data_path: str = DataIngestionConfig.source_data_path
+    preprocessor_obj_file_path: str = os.path.join("artifacts", "preprocessor.pkl")
+    trained_model_file_path: str = os.path.join("artifacts", "model.pkl")
+    target_column: str = "math_score"
+    # New rows whose content hash falls below this fraction join the test split
+    test_fraction: float = 0.2
+    split_hash_key: str = "0123456789123456"
+    # Trees / boosting rounds added per update, relative to the current model
+    growth_fraction: float = 0.1
+    # Fall back to the full search when the updated model's test R2 is more
+    # than max_r2_drop below the current model's, or below min_r2
+    max_r2_drop: float = 0.02
+    min_r2: float = 0.6
+
+
+# Minimum distance (float32 steps) between a moved split and a training value
+CUT_MARGIN_ULPS = 64
+# Models that keep training from their current state (see _continue_training)
+CONTINUABLE = (
+    "RandomForestRegressor", "ExtraTreesRegressor", "GradientBoostingRegressor", "XGBRegressor", "CatBoostRegressor",
+)
+
+
+def _sklearn_trees(model):
+    if hasattr(model, "tree_"):
+        return [model.tree_]
+    return [est.tree_ for est in np.asarray(model.estimators_, dtype=object).ravel()]
+
+
+def _column(X, j):
+    column = X[:, j]
+    return column.toarray().ravel() if hasattr(column, "toarray") else np.asarray(column)
+
+
+def _moved_cuts(cuts, affine, old_values, new_values, strict, dtype):
+    """
+    Cuts in the new scaling that send every training value the same way as
+    `cuts` do in the old one, for the rule `x < cut` (strict) or `x <= cut`.
+    `old_values`/`new_values` are the sorted distinct training values of the
+    column in both scalings and `affine` the cuts' image under the map.
+    Each cut keeps its affine image but stays CUT_MARGIN_ULPS float32 steps
+    (at most a quarter of the gap) clear of the neighbouring new values, so
+    the map's rounding error cannot carry a training value across it.
+    """
+    cuts = cuts.astype(dtype).astype(np.float64)
+    n_left = np.searchsorted(old_values, cuts, side="left" if strict else "right")
+    values = new_values.astype(np.float64)
+    lo = np.where(n_left > 0, values[np.maximum(n_left - 1, 0)], -np.inf)
+    hi = np.where(n_left < len(values), values[np.minimum(n_left, len(values) - 1)], np.inf)
+
+    magnitude = np.maximum(np.abs(np.where(np.isfinite(lo), lo, 0)), np.abs(np.where(np.isfinite(hi), hi, 0)))
+    margin = CUT_MARGIN_ULPS * np.spacing(magnitude.astype(np.float32)).astype(np.float64)
+    margin = np.minimum(margin, (hi - lo) / 4)
+    return np.clip(affine, lo + margin, hi - margin).astype(dtype).astype(np.float64)
+
+
+def _kept_booster(model):
+    """The XGBoost booster without the rounds early stopping discarded."""
+    booster = model.get_booster()
+    best_iteration = booster.attr("best_iteration")
+    return booster if best_iteration is None else booster[: int(best_iteration) + 1]
+
+
+def _model_size(model):
+    """(constructor parameter, current value) for the model's number of trees/rounds."""
+    name = type(model).__name__
+    if name == "XGBRegressor":
+        return "n_estimators", model.get_booster().num_boosted_rounds()
+    if name == "CatBoostRegressor":
+        return "iterations", model.tree_count_
+    return "n_estimators", len(model.estimators_)
+
+
+class IncrementalTrainer:
+    """
+    Daily-update alternative to re-running DataIngestion -> DataTransformation
+    -> ModelTrainer from nothing.
+
+    New rows are split by content hash and appended to the train/test
+    artifacts and to the source dataset, and the preprocessor is refitted on the grown train split
+    (its statistics are cheap to recompute). While its feature layout is
+    unchanged, the current model keeps training from its saved state:
+    split thresholds on the rescaled numeric columns are moved to the new
+    scaling while staying between the same two training values, and once
+    the moved model
+    reproduces the current predictions on the training rows, sklearn
+    forests and gradient boosting grow with warm_start, XGBoost continues
+    from its booster (xgb_model) and CatBoost from init_model. Models
+    without a continuation (linear, single trees, AdaBoost), or whose
+    splits cannot be moved exactly, are refitted with their tuned
+    parameters. The full search runs only when a new category changes the
+    layout or the updated model's R2 on the grown test split falls more
+    than max_r2_drop below the current model's.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or IncrementalTrainerConfig()
+        self.model_trainer = ModelTrainer()
+        trainer_config = self.model_trainer.model_trainer_config
+        trainer_config.trained_model_file_path = self.config.trained_model_file_path
+        trainer_config.preprocessor_obj_file_path = self.config.preprocessor_obj_file_path
+        self.data_transformation = DataTransformation()
+        self.data_transformation.data_transformation_config.preprocessor_obj_file_path = (
+            self.config.preprocessor_obj_file_path
+        )
+
+    # ------------------------------------------------------------------
+    # Data
+    # ------------------------------------------------------------------
+    def _split_new_rows(self, new_rows, columns):
+        missing = [c for c in columns if c not in new_rows.columns]
+        if missing:
+            raise ValueError(f"New data is missing columns: {missing}")
+
+        new_rows = new_rows[columns]
+        new_rows = new_rows[new_rows[self.config.target_column].notna()].reset_index(drop=True)
+        hashes = pd.util.hash_pandas_object(new_rows, index=False, hash_key=self.config.split_hash_key)
+        is_test = (hashes.to_numpy() % 10_000) < int(self.config.test_fraction * 10_000)
+        return new_rows[~is_test], new_rows[is_test]
+
+    def _features_target(self, frame, preprocessor):
+        target = self.config.target_column
+        X = preprocessor.transform(frame.drop(columns=[target]))
+        return X, frame[target].to_numpy(dtype=np.float64)
+
+    def _write_data(self, train_df, test_df, new_rows):
+        write_frame(train_df, self.config.train_data_path)
+        write_frame(test_df, self.config.test_data_path)
+        write_frame(pd.concat([train_df, test_df], ignore_index=True), self.config.raw_data_path)
+
+        path = self.config.source_data_path
+        columns = list(pd.read_csv(path, nrows=0).columns)
+        new_rows[columns].to_csv(path, mode="a", header=False, index=False, quoting=csv.QUOTE_ALL)
+
+    # ------------------------------------------------------------------
+    # Preprocessor and model state
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _feature_shift(old_preprocessor, new_preprocessor):
+        """
+        Per numeric output column, (columns, a, b) with new = a * old + b, or
+        None when the two preprocessors do not produce the same layout.
+        Imputed values follow the new fill value, not this map.
+        """
+        try:
+            old = CompiledPreprocessor.from_column_transformer(old_preprocessor)
+            new = CompiledPreprocessor.from_column_transformer(new_preprocessor)
+        except ValueError:
+            return None
+
+        if old.n_features != new.n_features or len(old.numeric_blocks) != len(new.numeric_blocks):
+            return None
+        old_maps = [b["index_maps"] for b in old.categorical_blocks]
+        if old_maps != [b["index_maps"] for b in new.categorical_blocks]:
+            return None
+
+        columns, a, b = [], [], []
+        for old_block, new_block in zip(old.numeric_blocks, new.numeric_blocks):
+            if (old_block["start"], old_block["columns"]) != (new_block["start"], new_block["columns"]):
+                return None
+            width = len(old_block["columns"])
+            old_mean = old_block["mean"] if old_block["mean"] is not None else np.zeros(width)
+            new_mean = new_block["mean"] if new_block["mean"] is not None else np.zeros(width)
+            old_scale = old_block["scale"] if old_block["scale"] is not None else np.ones(width)
+            new_scale = new_block["scale"] if new_block["scale"] is not None else np.ones(width)
+
+            columns.extend(range(old_block["start"], old_block["stop"]))
+            a.extend(old_scale / new_scale)
+            b.extend((old_mean - new_mean) / new_scale)
+
+        return np.array(columns, dtype=np.intp), np.array(a), np.array(b)
+
+    @staticmethod
+    def _value_pairs(X_old, X_new, columns):
+        """
+        Per shifted column, the sorted distinct float32 training values in the
+        old scaling and the matching values in the new one; None when some
+        column does not pair them one-to-one in increasing order (e.g. missing
+        values imputed with a different median than before).
+        """
+        pairs = {}
+        for j in columns:
+            old = _column(X_old, j).astype(np.float32)
+            new = _column(X_new, j).astype(np.float32)
+            old_values, first = np.unique(old, return_index=True)
+            new_values = new[first]
+            n_pairs = len(np.unique(np.column_stack([old, new]), axis=0))
+            if n_pairs != len(old_values) or np.any(np.diff(new_values) <= 0):
+                return None
+            pairs[j] = (old_values.astype(np.float64), new_values)
+        return pairs
+
+    @staticmethod
+    def _shift_splits(model, shift, pairs):
+        """
+        Move split thresholds on the shifted columns (see _moved_cuts) so every
+        training row takes the same path through every tree as before.
+        XGBoost tests `x < cut`; sklearn `x <= threshold` and CatBoost
+        `x > border` (right) keep equality on the left.
+        """
+        columns, a, b = shift
+
+        def moved(feature, threshold, is_split, strict, dtype):
+            threshold = np.asarray(threshold, dtype=np.float64).copy()
+            for k, j in enumerate(columns):
+                hit = is_split & (feature == j)
+                if hit.any():
+                    affine = a[k] * threshold[hit] + b[k]
+                    threshold[hit] = _moved_cuts(threshold[hit], affine, *pairs[j], strict, dtype)
+            return threshold
+
+        name = type(model).__name__
+        if name == "XGBRegressor":
+            booster = model.get_booster()
+            state = json.loads(booster.save_raw("json"))
+            for tree in state["learner"]["gradient_booster"]["model"]["trees"]:
+                is_split = np.asarray(tree["left_children"]) != -1
+                feature = np.asarray(tree["split_indices"], dtype=np.intp)
+                tree["split_conditions"] = moved(
+                    feature, tree["split_conditions"], is_split, True, np.float32,
+                ).tolist()
+            booster.load_model(bytearray(json.dumps(state).encode("utf-8")))
+        elif name == "CatBoostRegressor":
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                path = os.path.join(tmp_dir, "model.json")
+                model.save_model(path, format="json")
+                with open(path) as f:
+                    state = json.load(f)
+                for entry in state["features_info"].get("float_features", []):
+                    borders = entry.get("borders") or []
+                    feature = np.full(len(borders), entry["flat_feature_index"], dtype=np.intp)
+                    entry["borders"] = moved(
+                        feature, borders, np.ones(len(borders), dtype=bool), False, np.float32,
+                    ).tolist()
+                with open(path, "w") as f:
+                    json.dump(state, f)
+                model.load_model(path, format="json")
+        else:
+            for tree in _sklearn_trees(model):
+                state = tree.__getstate__()
+                nodes = state["nodes"]
+                nodes["threshold"] = moved(
+                    nodes["feature"], nodes["threshold"], nodes["left_child"] != -1, False, np.float64,
+                )
+                tree.__setstate__(state)
+        return model
+
+    def _continue_training(self, model, X, y, X_old, shift):
+        """
+        Grow the model on (X, y) from its current state, after moving its
+        splits by `shift` (see _feature_shift). X_old is the same training
+        data under the old preprocessor; when the moved model does not
+        reproduce the old predictions on it, the model is refitted instead.
+        Returns (model, method).
+        """
+        name = type(model).__name__
+        if name not in CONTINUABLE:
+            return self._refit(model, X, y), "refit"
+
+        expected = model.predict(X_old)
+        pairs = self._value_pairs(X_old, X, shift[0])
+        shifted = None
+        if pairs is not None:
+            try:
+                # A copy: the loaded model stays intact for the refit below
+                shifted = self._shift_splits(copy.deepcopy(model), shift, pairs)
+            except Exception as e:
+                logging.warning(f"Moving the splits of {name} failed: {e}")
+        # Same paths give the same leaves; only the summation order may differ
+        if shifted is None or not np.allclose(shifted.predict(X), expected, rtol=0, atol=1e-9):
+            logging.warning(f"Moved splits do not reproduce the current {name} predictions; refitting")
+            return self._refit(model, X, y), "refit"
+        model = shifted
+
+        if name in ("RandomForestRegressor", "ExtraTreesRegressor", "GradientBoostingRegressor"):
+            param, size = _model_size(model)
+            model.set_params(warm_start=True, **{param: size + self._growth(size)})
+            model.fit(X, y)
+            model.set_params(warm_start=False)
+            return model, "warm_start"
+
+        if name == "XGBRegressor":
+            from xgboost import XGBRegressor
+
+            booster = _kept_booster(model)
+            size = booster.num_boosted_rounds()
+            params = dict(model.get_params(), n_estimators=self._growth(size), early_stopping_rounds=None)
+            grown = XGBRegressor(**params)
+            grown.fit(X, y, xgb_model=booster, verbose=False)
+            grown.set_params(n_estimators=grown.get_booster().num_boosted_rounds())
+            return grown, "xgb_model"
+
+        if name == "CatBoostRegressor":
+            from catboost import CatBoostRegressor
+
+            size = model.tree_count_
+            params = dict(model.get_params(), iterations=self._growth(size))
+            params.pop("early_stopping_rounds", None)
+            grown = CatBoostRegressor(**params)
+            grown.fit(X, y, init_model=model)
+            return grown, "init_model"
+
+    @staticmethod
+    def _refit(model, X, y):
+        """Fit a fresh model with the current one's parameters and size."""
+        name = type(model).__name__
+        if name == "XGBRegressor":
+            from xgboost import XGBRegressor
+
+            size = _kept_booster(model).num_boosted_rounds()
+            return XGBRegressor(**dict(model.get_params(), n_estimators=size, early_stopping_rounds=None)).fit(X, y)
+        if name == "CatBoostRegressor":
+            from catboost import CatBoostRegressor
+
+            params = dict(model.get_params(), iterations=model.tree_count_)
+            params.pop("early_stopping_rounds", None)
+            return CatBoostRegressor(**params).fit(X, y)
+        return clone(model).fit(X, y)
+
+    def _growth(self, size):
+        return max(1, math.ceil(self.config.growth_fraction * size))
+
+    def _candidate(self, model):
+        """Name and tuned parameters of `model` as the full search would report them."""
+        models, params = self.model_trainer.get_models_and_params()
+        name = next((n for n, m in models.items() if type(m) is type(model)), type(model).__name__)
+        current = model.get_params()
+        tuned = {k: current[k] for k in params.get(name, {}) if k in current}
+        if hasattr(model, "estimators_") or type(model).__name__ in ("XGBRegressor", "CatBoostRegressor"):
+            param, size = _model_size(model)
+            tuned[param] = size
+        return name, tuned
+
+    # ------------------------------------------------------------------
+    # Update
+    # ------------------------------------------------------------------
+    def _full_search(self, train_df, test_df, new_rows, reason):
+        logging.info(f"Running the full model search: {reason}")
+        self._write_data(train_df, test_df, new_rows)
+        train_set, test_set, preprocessor_path = self.data_transformation.initiate_data_transformation(
+            self.config.train_data_path, self.config.test_data_path,
+        )
+        r2, name, params = self.model_trainer.initiate_model_trainer(train_set, test_set, preprocessor_path)
+        return dict(mode="full", reason=reason, model=name, params=params, r2_score=r2)
+
+    @span("incremental_update")
+    def update(self, new_data_path):
+        """
+        Append the rows in `new_data_path` (CSV or columnar) and update the
+        model. Returns a summary with mode "incremental", "full" or "none".
+        """
+        try:
+            start = time.perf_counter()
+            config = self.config
+
+            train_df = read_frame(config.train_data_path, mmap=False)
+            test_df = read_frame(config.test_data_path, mmap=False)
+            new_train, new_test = self._split_new_rows(read_frame(new_data_path, mmap=False), list(train_df.columns))
+            annotate(new_train_rows=len(new_train), new_test_rows=len(new_test))
+            if not len(new_train) and not len(new_test):
+                logging.info("No new rows with a target; nothing to update")
+                return dict(mode="none", seconds=time.perf_counter() - start)
+
+            new_rows = pd.concat([new_train, new_test], ignore_index=True)
+            train_df = pd.concat([train_df, new_train], ignore_index=True)
+            test_df = pd.concat([test_df, new_test], ignore_index=True)
+
+            # The current model scored on the same grown test split as the update
+            old_preprocessor = load_object(config.preprocessor_obj_file_path)
+            model = load_object(config.trained_model_file_path)
+            y_pred, y_test = self._predict(model, old_preprocessor, test_df)
+            reference_r2 = r2_score(y_test, y_pred)
+
+            with span("fit_preprocessor", rows=len(train_df)):
+                preprocessor = self.data_transformation.get_data_transformer_object()
+                preprocessor.fit(train_df.drop(columns=[config.target_column]))
+
+            shift = self._feature_shift(old_preprocessor, preprocessor)
+            if shift is None:
+                result = self._full_search(train_df, test_df, new_rows, "the preprocessor's feature layout changed")
+                result.update(reference_r2=reference_r2, seconds=time.perf_counter() - start)
+                annotate(mode="full")
+                return result
+
+            X_train, y_train = self._features_target(train_df, preprocessor)
+            X_train_old, _ = self._features_target(train_df, old_preprocessor)
+            with span("continue_training", model=type(model).__name__):
+                model, method = self._continue_training(model, X_train, y_train, X_train_old, shift)
+
+            y_pred, y_test = self._predict(model, preprocessor, test_df)
+            r2 = r2_score(y_test, y_pred)
+            logging.info(f"Incremental update ({method}): test R2 {reference_r2:.4f} -> {r2:.4f}")
+            record("incremental_update", method=method, reference_r2=reference_r2, r2_score=r2)
+
+            if r2 < config.min_r2 or reference_r2 - r2 > config.max_r2_drop:
+                result = self._full_search(
+                    train_df, test_df, new_rows, f"test R2 fell from {reference_r2:.4f} to {r2:.4f}",
+                )
+                result.update(reference_r2=reference_r2, seconds=time.perf_counter() - start)
+                annotate(mode="full")
+                return result
+
+            self._write_data(train_df, test_df, new_rows)
+            save_object(config.preprocessor_obj_file_path, preprocessor)
+            save_object(config.trained_model_file_path, model)
+
+            name, params = self._candidate(model)
+            trainer_config = self.model_trainer.model_trainer_config
+            if trainer_config.build_prediction_table:
+                self.model_trainer.build_prediction_table(model, config.preprocessor_obj_file_path)
+            if trainer_config.publish_version:
+                self.model_trainer.publish_model_version(config.preprocessor_obj_file_path, r2, name, params)
+
+            annotate(mode="incremental", method=method, r2_score=r2)
+            return dict(
+                mode="incremental",
+                method=method,
+                model=name,
+                params=params,
+                r2_score=r2,
+                reference_r2=reference_r2,
+                new_train_rows=len(new_train),
+                new_test_rows=len(new_test),
+                seconds=time.perf_counter() - start,
+            )
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _predict(self, model, preprocessor, frame):
+        X, y = self._features_target(frame, preprocessor)
+        return model.predict(X), y
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m src.components.incremental_trainer NEW_ROWS.csv")
+
+    # Writes artifacts/run_reports/incremental-<time>.json like the full run
+    with profile_run("incremental"):
+        print(IncrementalTrainer().update(sys.argv[1]))
@@ -1,78 +1,214 @@
 import os
 import sys
+import tempfile
 from dataclasses import dataclass
+from typing import Optional
 
-from catboost import CatBoostRegressor
-from sklearn.ensemble import AdaBoostRegressor, GradientBoostingRegressor, RandomForestRegressor
-from sklearn.linear_model import LinearRegression
 from sklearn.metrics import r2_score
-from sklearn.tree import DecisionTreeRegressor
-from xgboost import XGBRegressor
 
+from src.artifact_store import STORE_DIR, ArtifactStore
 from src.exception import CustomException
 from src.logger import logging
-from src.utils import save_object, evaluate_models
+from src.profiler import annotate, span
+from src.pipeline.native_model import export_native_model
+from src.pipeline.predict_pipeline import SMOKE_RECORD, CustomData
+from src.pipeline.prediction_table import PredictionTable
+from src.stage_cache import StageCache
+from src.utils import save_object, load_object, evaluate_models, file_sha256
 
 
 @dataclass
 class ModelTrainerConfig:
     trained_model_file_path: str = os.path.join("artifacts", "model.pkl")
+    preprocessor_obj_file_path: str = os.path.join("artifacts", "preprocessor.pkl")
+    # Precompute predictions for every discrete form input (PredictPipeline table mode)
+    build_prediction_table: bool = True
+    prediction_table_file_path: str = os.path.join("artifacts", "prediction_table.npz")
+    # Cores for the whole search (-1 = all); they are split between
+    # concurrent model searches and each search's own n_jobs
+    n_jobs: int = -1
+    # Wall-clock limit (seconds) per model search; None disables it
+    model_time_budget: Optional[float] = None
+    # "exhaustive" (full grid / random sample) or "halving" (successive
+    # halving + native early stopping for XGBoost/CatBoost)
+    search_strategy: str = "exhaustive"
+    # Memory-map the search data and CV folds from /dev/shm for the worker
+    # processes instead of pickling a copy to each (see SearchContext)
+    shared_search_data: bool = True
+    # Publish each trained model as an immutable version under
+    # artifacts/models/ for PredictPipeline to hot-reload
+    publish_version: bool = True
+    model_store_dir: str = STORE_DIR
+    keep_versions: int = 5
 
 
 class ModelTrainer:
     def __init__(self):
         self.model_trainer_config = ModelTrainerConfig()
+        self.cache = StageCache()
 
-    def initiate_model_trainer(self, train_array, test_array):
+    def get_models_and_params(self):
+        """Candidate models and their hyperparameter grids."""
+        # Imported here so that importing this module (e.g. for
+        # publish_model_version) does not load every model library
+        from catboost import CatBoostRegressor
+        from sklearn.ensemble import AdaBoostRegressor, GradientBoostingRegressor, RandomForestRegressor
+        from sklearn.linear_model import LinearRegression
+        from sklearn.tree import DecisionTreeRegressor
+        from xgboost import XGBRegressor
+
+        models = {
+            "Random Forest": RandomForestRegressor(random_state=42, n_jobs=-1),
+            "Decision Tree": DecisionTreeRegressor(random_state=42),
+            "Gradient Boosting": GradientBoostingRegressor(random_state=42),
+            "Linear Regression": LinearRegression(),
+            "XGBRegressor": XGBRegressor(
+                random_state=42,
+                n_jobs=-1,
+                tree_method="hist",
+                eval_metric="rmse",
+                verbosity=0,
+            ),
+            "CatBoosting Regressor": CatBoostRegressor(verbose=False, random_seed=42),
+            "AdaBoost Regressor": AdaBoostRegressor(random_state=42),
+        }
+
+        params = {
+            "Decision Tree": {
+                "criterion": ["squared_error", "friedman_mse", "absolute_error", "poisson"],
+            },
+            "Random Forest": {
+                "n_estimators": [8, 16, 32, 64, 128, 256],
+            },
+            "Gradient Boosting": {
+                "learning_rate": [0.1, 0.01, 0.05, 0.001],
+                "subsample": [0.6, 0.7, 0.75, 0.8, 0.85, 0.9],
+                "n_estimators": [8, 16, 32, 64, 128, 256],
+            },
+            "Linear Regression": {},  # no hyperparameters to tune
+            "XGBRegressor": {
+                "learning_rate": [0.1, 0.01, 0.05, 0.001],
+                "n_estimators": [8, 16, 32, 64, 128, 256],
+            },
+            "CatBoosting Regressor": {
+                "depth": [6, 8, 10],
+                "learning_rate": [0.01, 0.05, 0.1],
+                "iterations": [30, 50, 100],
+            },
+            "AdaBoost Regressor": {
+                "learning_rate": [0.1, 0.01, 0.5, 0.001],
+                "n_estimators": [8, 16, 32, 64, 128, 256],
+            },
+        }
+
+        return models, params
+
+    def build_prediction_table(self, model, preprocessor_path=None):
+        """Write the full in-domain prediction table for a freshly saved model."""
         try:
-            logging.info("Split training and test input data")
-            X_train, y_train = train_array[:, :-1], train_array[:, -1]
-            X_test, y_test = test_array[:, :-1], test_array[:, -1]
-
-            models = {
-                "Random Forest": RandomForestRegressor(random_state=42, n_jobs=-1),
-                "Decision Tree": DecisionTreeRegressor(random_state=42),
-                "Gradient Boosting": GradientBoostingRegressor(random_state=42),
-                "Linear Regression": LinearRegression(),
-                "XGBRegressor": XGBRegressor(
-                    random_state=42,
-                    n_jobs=-1,
-                    tree_method="hist",
-                    eval_metric="rmse",
-                    verbosity=0,
-                ),
-                "CatBoosting Regressor": CatBoostRegressor(verbose=False, random_seed=42),
-                "AdaBoost Regressor": AdaBoostRegressor(random_state=42),
+            preprocessor_path = preprocessor_path or self.model_trainer_config.preprocessor_obj_file_path
+            preprocessor = load_object(preprocessor_path)
+
+            table = PredictionTable.build(
+                preprocessor,
+                model,
+                model_sha256=file_sha256(self.model_trainer_config.trained_model_file_path),
+                preprocessor_sha256=file_sha256(preprocessor_path),
+            )
+            table.save(self.model_trainer_config.prediction_table_file_path)
+            logging.info(f"Prediction table saved to: {self.model_trainer_config.prediction_table_file_path}")
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def publish_model_version(self, preprocessor_path, r2, best_model_name, best_params):
+        """
+        Copy the saved model, preprocessor and prediction table into a new
+        store version, plus a tree-based winner in its native or flattened format.
+        The manifest records the model's prediction for SMOKE_RECORD so
+        serving can verify the version after loading it.
+        """
+        try:
+            config = self.model_trainer_config
+            files = {
+                "model.pkl": config.trained_model_file_path,
+                "preprocessor.pkl": preprocessor_path,
             }
+            if config.build_prediction_table:
+                files["prediction_table.npz"] = config.prediction_table_file_path
+
+            model = load_object(config.trained_model_file_path)
+            preprocessor = load_object(preprocessor_path)
+            smoke_frame = CustomData.from_record(SMOKE_RECORD).get_data_as_data_frame()
 
-            params = {
-                "Decision Tree": {
-                    "criterion": ["squared_error", "friedman_mse", "absolute_error", "poisson"],
-                },
-                "Random Forest": {
-                    "n_estimators": [8, 16, 32, 64, 128, 256],
-                },
-                "Gradient Boosting": {
-                    "learning_rate": [0.1, 0.01, 0.05, 0.001],
-                    "subsample": [0.6, 0.7, 0.75, 0.8, 0.85, 0.9],
-                    "n_estimators": [8, 16, 32, 64, 128, 256],
-                },
-                "Linear Regression": {},  # no hyperparameters to tune
-                "XGBRegressor": {
-                    "learning_rate": [0.1, 0.01, 0.05, 0.001],
-                    "n_estimators": [8, 16, 32, 64, 128, 256],
-                },
-                "CatBoosting Regressor": {
-                    "depth": [6, 8, 10],
-                    "learning_rate": [0.01, 0.05, 0.1],
-                    "iterations": [30, 50, 100],
-                },
-                "AdaBoost Regressor": {
-                    "learning_rate": [0.1, 0.01, 0.5, 0.001],
-                    "n_estimators": [8, 16, 32, 64, 128, 256],
-                },
+            metadata = {
+                "best_model": best_model_name,
+                "r2_score": r2,
+                "best_params": best_params,
+                "smoke_prediction": float(model.predict(preprocessor.transform(smoke_frame))[0]),
             }
 
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                native_path = export_native_model(model, tmp_dir)
+                if native_path is not None:
+                    metadata["native_model"] = os.path.basename(native_path)
+                    files[metadata["native_model"]] = native_path
+
+                store = ArtifactStore(config.model_store_dir, config.keep_versions)
+                return store.publish(files, metadata)
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    @staticmethod
+    def _split_features_target(data):
+        """Accept an (X, y) pair, or the legacy stacked array with y as the last column."""
+        if isinstance(data, tuple):
+            return data
+        return data[:, :-1], data[:, -1]
+
+    @span("model_trainer")
+    def initiate_model_trainer(self, train_set, test_set, preprocessor_path=None):
+        try:
+            logging.info("Split training and test input data")
+            X_train, y_train = self._split_features_target(train_set)
+            X_test, y_test = self._split_features_target(test_set)
+
+            models, params = self.get_models_and_params()
+            config = self.model_trainer_config
+            preprocessor_path = preprocessor_path or config.preprocessor_obj_file_path
+
+            outputs = {"model.pkl": config.trained_model_file_path}
+            if config.build_prediction_table:
+                outputs["prediction_table.npz"] = config.prediction_table_file_path
+
+            cache_key = self.cache.make_key(
+                "model_trainer",
+                X_train,
+                y_train,
+                X_test,
+                y_test,
+                models,
+                params,
+                config.search_strategy,
+                config.model_time_budget,
+                config.build_prediction_table,
+                file_sha256(preprocessor_path) if config.build_prediction_table else None,
+            )
+            cached = self.cache.get("model_trainer", cache_key)
+            if cached is not None and self.cache.restore_files("model_trainer", cache_key, outputs):
+                logging.info(f"Training inputs unchanged; reusing {cached[1]}")
+                annotate(cached=True)
+                if config.publish_version:
+                    # Publishing reloads the model to record its smoke prediction;
+                    # skip it when the store already serves these exact files
+                    store = ArtifactStore(config.model_store_dir, config.keep_versions)
+                    if store.current_matches(dict(outputs, **{"preprocessor.pkl": preprocessor_path})):
+                        logging.info(f"Model version {store.current_version()} is already current")
+                    else:
+                        self.publish_model_version(preprocessor_path, *cached)
+                return cached
+
             model_report, best_model_name, best_estimator, best_params_by_model = evaluate_models(
                 X_train=X_train,
                 y_train=y_train,
@@ -80,9 +216,14 @@ class ModelTrainer:
                 y_test=y_test,
                 models=models,
                 param=params,
+                n_jobs=self.model_trainer_config.n_jobs,
+                model_time_budget=self.model_trainer_config.model_time_budget,
+                search_strategy=self.model_trainer_config.search_strategy,
+                cache=self.cache,
+                shared_data=self.model_trainer_config.shared_search_data,
             )
 
-            best_model_score = model_report[best_model_name]
+            best_model_score = model_report[best_model_name]["r2_score"]
 
             # ✅ Always show the real parameters used (tuned OR default)
             best_params = best_params_by_model.get(best_model_name)
@@ -100,8 +241,78 @@ class ModelTrainer:
                 obj=best_estimator,
             )
 
+            if self.model_trainer_config.build_prediction_table:
+                with span("prediction_table"):
+                    self.build_prediction_table(best_estimator, preprocessor_path)
+
             r2 = r2_score(y_test, best_estimator.predict(X_test))
+
+            self.cache.put("model_trainer", cache_key, (r2, best_model_name, best_params))
+            self.cache.store_files("model_trainer", cache_key, outputs)
+
+            if config.publish_version:
+                with span("publish_version"):
+                    self.publish_model_version(preprocessor_path, r2, best_model_name, best_params)
+            annotate(best_model=best_model_name, r2_score=r2)
+
             return r2, best_model_name, best_params
 
         except Exception as e:
             raise CustomException(e, sys)
+
+
+def compare_search_strategies(train_path, test_path, strategies=("exhaustive", "halving")):
+    """
+    Fit a fresh preprocessor in memory (no artifacts are written) and run
+    the full model search once per strategy. Returns {strategy: summary}.
+    """
+    import time
+
+    from src.columnar import read_frame
+    from src.components.data_transformation import DataTransformation
+
+    train_df = read_frame(train_path)
+    test_df = read_frame(test_path)
+    target = "math_score"
+
+    preprocessor = DataTransformation().get_data_transformer_object()
+    X_train = preprocessor.fit_transform(train_df.drop(columns=[target]))
+    X_test = preprocessor.transform(test_df.drop(columns=[target]))
+    y_train, y_test = train_df[target].to_numpy(), test_df[target].to_numpy()
+
+    trainer = ModelTrainer()
+    summary = {}
+    for strategy in strategies:
+        models, params = trainer.get_models_and_params()
+        start = time.perf_counter()
+        report, best_name, _, _ = evaluate_models(
+            X_train=X_train,
+            y_train=y_train,
+            X_test=X_test,
+            y_test=y_test,
+            models=models,
+            param=params,
+            n_jobs=trainer.model_trainer_config.n_jobs,
+            search_strategy=strategy,
+        )
+        summary[strategy] = {
+            "total_time": time.perf_counter() - start,
+            "best_model": best_name,
+            "best_r2": report[best_name]["r2_score"],
+            "models": report,
+        }
+
+    return summary
+
+
+if __name__ == "__main__":
+    # The splits DataIngestion writes (columnar by default), not the CSV copies
+    from src.components.data_ingestion import DataIngestionConfig
+
+    ingestion_config = DataIngestionConfig()
+    results = compare_search_strategies(ingestion_config.train_data_path, ingestion_config.test_data_path)
+    for strategy, result in results.items():
+        print(f"{strategy}: {result['total_time']:.1f}s, best={result['best_model']} R2={result['best_r2']:.4f}")
+        for name, entry in result["models"].items():
+            r2 = "n/a" if entry["r2_score"] is None else f"{entry['r2_score']:.4f}"
+            print(f"    {name:<22} R2={r2}  fit={entry['fit_time']:.2f}s")
@@ -0,0 +1,373 @@
+import os
+import sys
+import tempfile
+from collections import Counter
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.linear_model import SGDRegressor
+
+from src.components.data_transformation import DataTransformation
+from src.components.model_trainer import ModelTrainer
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import save_object
+
+
+@dataclass
+class StreamingTrainerConfig:
+    source_data_path: str = os.path.join("notebook", "data", "stud.csv")
+    target_column: str = "math_score"
+    preprocessor_obj_file_path: str = os.path.join("artifacts", "preprocessor.pkl")
+    trained_model_file_path: str = os.path.join("artifacts", "model.pkl")
+    # Rows held in memory at once; peak memory scales with this, not the file
+    chunk_size: int = 100_000
+    # Rows whose content hash falls below this fraction go to the test split
+    test_fraction: float = 0.2
+    split_hash_key: str = "0123456789123456"
+    # Exact medians are kept as value counts up to this many distinct values
+    # per column, after which a fixed-size uniform reservoir is used instead
+    max_distinct_values: int = 100_000
+    reservoir_size: int = 100_000
+    sgd_epochs: int = 5
+    xgb_rounds: int = 200
+    # The winner is not saved below this test R2 (same bar as ModelTrainer)
+    min_r2: float = 0.6
+    xgb_params: tuple = (
+        ("objective", "reg:squarederror"),
+        ("tree_method", "hist"),
+        ("learning_rate", 0.1),
+        ("max_depth", 6),
+        ("verbosity", 0),
+    )
+    random_state: int = 42
+
+
+class _RunningMoments:
+    """Count/mean/M2 merged chunk by chunk (Chan et al. parallel variance)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def merge(self, count, mean, m2):
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    def update(self, values):
+        if len(values):
+            mean = float(values.mean())
+            self.merge(len(values), mean, float(((values - mean) ** 2).sum()))
+
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else 0.0
+
+
+class _StreamingMedian:
+    """
+    Exact median from value counts while the column has few distinct values
+    (e.g. 0-100 scores); degrades to a uniform reservoir sample otherwise.
+    """
+
+    def __init__(self, max_distinct, reservoir_size, rng):
+        self.max_distinct = max_distinct
+        self.reservoir_size = reservoir_size
+        self.rng = rng
+        self.counts = Counter()
+        self.reservoir = None
+        self.seen = 0
+
+    def update(self, values):
+        if self.reservoir is not None:
+            self._sample(values)
+            return
+
+        self.counts.update(values.tolist())
+        if len(self.counts) > self.max_distinct:
+            self._switch_to_reservoir()
+
+    def _switch_to_reservoir(self):
+        values = np.repeat(
+            np.fromiter(self.counts.keys(), dtype=np.float64),
+            np.fromiter(self.counts.values(), dtype=np.int64),
+        )
+        self.rng.shuffle(values)
+        self.counts = Counter()
+        self.reservoir = np.empty(0)
+        self._sample(values)
+
+    def _sample(self, values):
+        free = self.reservoir_size - len(self.reservoir)
+        if free > 0:
+            taken = values[:free]
+            self.reservoir = np.concatenate([self.reservoir, taken])
+            self.seen += len(taken)
+            values = values[free:]
+        if not len(values):
+            return
+
+        # Algorithm R, vectorised: the i-th value of the stream (1-based)
+        # lands in a random slot < i and is kept if that slot exists
+        positions = self.seen + np.arange(1, len(values) + 1)
+        slots = (self.rng.random(len(values)) * positions).astype(np.int64)
+        keep = slots < self.reservoir_size
+        self.reservoir[slots[keep]] = values[keep]
+        self.seen += len(values)
+
+    def median(self):
+        if self.reservoir is not None:
+            return float(np.median(self.reservoir))
+        if not self.counts:
+            return np.nan
+
+        keys = np.array(sorted(self.counts))
+        cumulative = np.cumsum([self.counts[k] for k in keys])
+        total = cumulative[-1]
+        lower = keys[np.searchsorted(cumulative, (total - 1) // 2 + 1)]
+        upper = keys[np.searchsorted(cumulative, total // 2 + 1)]
+        return float((lower + upper) / 2)
+
+
+class StreamingTrainer:
+    """
+    Out-of-core alternative to DataIngestion -> DataTransformation ->
+    ModelTrainer for sources larger than RAM.
+
+    The source CSV is read in chunks and every row is assigned to train or
+    test by hashing its content, so no split ever materialises. Pass 1
+    accumulates the imputer/scaler/one-hot statistics on the train rows and
+    turns them into the same fitted ColumnTransformer the in-memory path
+    saves. Pass 2 trains models that learn incrementally (SGDRegressor via
+    partial_fit, XGBoost via an external-memory DMatrix) and a final pass
+    scores them on the test rows. Peak memory is bounded by chunk_size.
+    The winner gets the same prediction table and store version as a
+    ModelTrainer winner.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or StreamingTrainerConfig()
+        self.rng = np.random.default_rng(self.config.random_state)
+        self.data_transformation = DataTransformation()
+        self.model_trainer = ModelTrainer()
+        trainer_config = self.model_trainer.model_trainer_config
+        trainer_config.trained_model_file_path = self.config.trained_model_file_path
+        trainer_config.preprocessor_obj_file_path = self.config.preprocessor_obj_file_path
+
+    def _chunks(self):
+        return pd.read_csv(self.config.source_data_path, chunksize=self.config.chunk_size)
+
+    def _is_test(self, chunk):
+        hashes = pd.util.hash_pandas_object(chunk, index=False, hash_key=self.config.split_hash_key)
+        return (hashes.to_numpy() % 10_000) < int(self.config.test_fraction * 10_000)
+
+    def _split_chunks(self, test):
+        target = self.config.target_column
+        for chunk in self._chunks():
+            chunk = chunk[chunk[target].notna()]
+            mask = self._is_test(chunk)
+            part = chunk[mask] if test else chunk[~mask]
+            if len(part):
+                yield part
+
+    def _transformed_chunks(self, preprocessor, test=False):
+        target = self.config.target_column
+        for part in self._split_chunks(test):
+            X = preprocessor.transform(part.drop(columns=[target]))
+            yield X, part[target].to_numpy(dtype=np.float64)
+
+    def fit_preprocessor(self):
+        """Pass 1: stream the train rows and build the fitted ColumnTransformer."""
+        try:
+            preprocessor = self.data_transformation.get_data_transformer_object()
+            numeric_columns, categorical_columns = [], []
+            for name, _, columns in preprocessor.transformers:
+                (numeric_columns if name == "num_pipeline" else categorical_columns).extend(columns)
+
+            moments = {c: _RunningMoments() for c in numeric_columns}
+            medians = {
+                c: _StreamingMedian(self.config.max_distinct_values, self.config.reservoir_size, self.rng)
+                for c in numeric_columns
+            }
+            missing = Counter()
+            category_counts = {c: Counter() for c in categorical_columns}
+            n_rows = 0
+
+            for part in self._split_chunks(test=False):
+                n_rows += len(part)
+                for column in numeric_columns:
+                    values = pd.to_numeric(part[column], errors="coerce").to_numpy(dtype=np.float64)
+                    present = values[~np.isnan(values)]
+                    missing[column] += len(values) - len(present)
+                    moments[column].update(present)
+                    medians[column].update(present)
+                for column in categorical_columns:
+                    category_counts[column].update(part[column].dropna().tolist())
+
+            if n_rows == 0:
+                raise ValueError("No training rows found in the source data")
+
+            # Missing values are imputed with the median before scaling, so
+            # fold that many copies of the median into the scaler moments
+            fill = np.array([medians[c].median() for c in numeric_columns])
+            for column, value in zip(numeric_columns, fill):
+                moments[column].merge(missing[column], value, 0.0)
+
+            modes = [
+                min(counts.items(), key=lambda kv: (-kv[1], kv[0]))[0]
+                for counts in category_counts.values()
+            ]
+            preprocessor = self._build_fitted_preprocessor(
+                preprocessor, numeric_columns, categorical_columns, category_counts, fill, moments, modes,
+            )
+
+            logging.info(f"Streamed preprocessor statistics over {n_rows} training rows")
+            return preprocessor, n_rows
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    @staticmethod
+    def _build_fitted_preprocessor(preprocessor, numeric_columns, categorical_columns,
+                                   category_counts, fill, moments, modes):
+        # Fit on a tiny seed frame holding every category once so the
+        # encoder/transformer internals are set up exactly as sklearn does,
+        # then overwrite the statistics with the streamed ones.
+        categories = [sorted(category_counts[c]) for c in categorical_columns]
+        n_seed = max(len(c) for c in categories)
+        seed = {c: [cats[i % len(cats)] for i in range(n_seed)] for c, cats in zip(categorical_columns, categories)}
+        seed.update({c: np.arange(n_seed, dtype=np.float64) for c in numeric_columns})
+        preprocessor.fit(pd.DataFrame(seed))
+
+        num_pipeline = preprocessor.named_transformers_["num_pipeline"]
+        num_pipeline.named_steps["imputer"].statistics_ = fill
+
+        scaler = num_pipeline.named_steps["scaler"]
+        variance = np.array([moments[c].variance for c in numeric_columns])
+        scale = np.sqrt(variance)
+        scale[scale < 10 * np.finfo(scale.dtype).eps] = 1.0
+        scaler.mean_ = np.array([moments[c].mean for c in numeric_columns])
+        scaler.var_ = variance
+        scaler.scale_ = scale
+        scaler.n_samples_seen_ = moments[numeric_columns[0]].count
+
+        cat_pipeline = preprocessor.named_transformers_["cat_pipeline"]
+        cat_pipeline.named_steps["imputer"].statistics_ = np.array(modes, dtype=object)
+
+        return preprocessor
+
+    def train_sgd(self, preprocessor):
+        """Linear model trained with partial_fit, one pass over the file per epoch."""
+        model = SGDRegressor(random_state=self.config.random_state)
+        for epoch in range(self.config.sgd_epochs):
+            for X, y in self._transformed_chunks(preprocessor):
+                order = self.rng.permutation(len(y))
+                model.partial_fit(X[order], y[order])
+            logging.info(f"SGDRegressor epoch {epoch + 1}/{self.config.sgd_epochs} done")
+        return model
+
+    def train_xgboost(self, preprocessor):
+        """XGBoost trained from an external-memory DMatrix fed chunk by chunk."""
+        trainer = self
+
+        class ChunkIter(xgb.DataIter):
+            def __init__(self, cache_prefix):
+                self._chunks = None
+                super().__init__(cache_prefix=cache_prefix)
+
+            def next(self, input_data):
+                if self._chunks is None:
+                    self._chunks = trainer._transformed_chunks(preprocessor)
+                try:
+                    X, y = next(self._chunks)
+                except StopIteration:
+                    return 0
+                input_data(data=X, label=y)
+                return 1
+
+            def reset(self):
+                self._chunks = None
+
+        with tempfile.TemporaryDirectory(prefix="xgb-cache-") as cache_dir:
+            dtrain = xgb.DMatrix(ChunkIter(os.path.join(cache_dir, "train")))
+            params = dict(self.config.xgb_params, seed=self.config.random_state)
+            booster = xgb.train(params, dtrain, num_boost_round=self.config.xgb_rounds)
+
+        # Wrap in the sklearn estimator so PredictPipeline can call .predict
+        model = xgb.XGBRegressor()
+        model.load_model(booster.save_raw("ubj"))
+        return model
+
+    def evaluate(self, preprocessor, models):
+        """Streaming R2 of every model on the hashed test split."""
+        n = 0
+        sum_y = 0.0
+        sum_y2 = 0.0
+        sse = {name: 0.0 for name in models}
+
+        for X, y in self._transformed_chunks(preprocessor, test=True):
+            n += len(y)
+            sum_y += float(y.sum())
+            sum_y2 += float((y * y).sum())
+            for name, model in models.items():
+                sse[name] += float(((y - model.predict(X)) ** 2).sum())
+
+        if n == 0:
+            raise ValueError("No test rows found; increase test_fraction")
+
+        sst = sum_y2 - sum_y * sum_y / n
+        return {name: 1.0 - err / sst for name, err in sse.items()}, n
+
+    def initiate_streaming_training(self):
+        try:
+            preprocessor, n_train = self.fit_preprocessor()
+
+            models = {
+                "SGD Regressor": self.train_sgd(preprocessor),
+                "XGBRegressor": self.train_xgboost(preprocessor),
+            }
+            report, n_test = self.evaluate(preprocessor, models)
+
+            best_model_name = max(report, key=report.get)
+            logging.info(f"Streaming training report ({n_train} train / {n_test} test rows): {report}")
+            logging.info(f"Best model: {best_model_name} | R2: {report[best_model_name]:.4f}")
+
+            if report[best_model_name] < self.config.min_r2:
+                raise CustomException("No best model found", sys)
+
+            save_object(self.config.preprocessor_obj_file_path, preprocessor)
+            save_object(self.config.trained_model_file_path, models[best_model_name])
+
+            params = {
+                "SGD Regressor": {"epochs": self.config.sgd_epochs},
+                "XGBRegressor": dict(self.config.xgb_params, num_boost_round=self.config.xgb_rounds),
+            }
+            trainer_config = self.model_trainer.model_trainer_config
+            if trainer_config.build_prediction_table:
+                self.model_trainer.build_prediction_table(
+                    models[best_model_name], self.config.preprocessor_obj_file_path,
+                )
+            if trainer_config.publish_version:
+                self.model_trainer.publish_model_version(
+                    self.config.preprocessor_obj_file_path,
+                    report[best_model_name],
+                    best_model_name,
+                    params[best_model_name],
+                )
+
+            return report[best_model_name], best_model_name, report
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    print(StreamingTrainer().initiate_streaming_training())
@@ -15,7 +15,7 @@ def error_message_detail(error: Exception) -> str:
 
 
 class CustomException(Exception):
-    def __init__(self, error_message: Exception):
+    def __init__(self, error_message: Exception, error_detail=None):
         super().__init__(str(error_message))
         self.error_message = error_message_detail(error_message)
 
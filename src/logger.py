@@ -1,18 +1,205 @@
+import atexit
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import random
+import time
 from datetime import datetime
 
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, rotation is per process
+    fcntl = None
+
 LOG_DIR = os.path.join(os.getcwd(), "logs")
 os.makedirs(LOG_DIR, exist_ok=True)
 
-LOG_FILE = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
+LOG_FORMAT = "[%(asctime)s] %(levelname)s %(name)s:%(lineno)d - %(message)s"
+
+# LOG_MODE=file (default): one timestamped text log per process start,
+# written synchronously. LOG_MODE=queue: callers only enqueue records and a
+# background thread writes them as JSON lines to logs/app.log, rotated by
+# size (LOG_MAX_BYTES) or by time (LOG_ROTATE_WHEN, e.g. "midnight").
+LOG_MODE = os.getenv("LOG_MODE", "file").strip().lower()
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").strip().upper()
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES") or 10 * 1024 * 1024)
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT") or 5)
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "").strip()
+
+# Per-request lines go to the "serving" logger: off (WARNING) unless
+# LOG_SERVING_LEVEL lowers it, and then only a LOG_SERVING_SAMPLE_RATE
+# fraction of INFO/DEBUG records is kept.
+LOG_SERVING_LEVEL = os.getenv("LOG_SERVING_LEVEL", "WARNING").strip().upper()
+LOG_SERVING_SAMPLE_RATE = float(os.getenv("LOG_SERVING_SAMPLE_RATE") or 1.0)
+
+if LOG_MODE == "queue":
+    LOG_FILE = "app.log"
+else:
+    LOG_FILE = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
 LOG_FILE_PATH = os.path.join(LOG_DIR, LOG_FILE)
 
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra=` fields are included as keys."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "line": record.lineno,
+            "pid": record.process,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Only resolves the message on the caller's thread (args may be mutated
+    after the call); formatting, including tracebacks, and the file write
+    happen on the writer thread.
+    """
+
+    def prepare(self, record):
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a `rate` fraction of records below WARNING; warnings and errors always pass."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or self.rate >= 1 or random.random() < self.rate
+
+
+class _SharedFileMixin:
+    """
+    Lets several processes (gunicorn workers) append to and rotate one file.
+    Each write holds an flock on <file>.lock; if another process rotated the
+    file since our last write, we reopen it instead of rotating it again.
+    """
+
+    def _lock_fd(self):
+        if getattr(self, "_lock_pid", None) != os.getpid():
+            # flock is per open file, so a forked child needs its own descriptor
+            self._lock_file = os.open(self.baseFilename + ".lock", os.O_CREAT | os.O_WRONLY, 0o644)
+            self._lock_pid = os.getpid()
+        return self._lock_file
+
+    def _rotated_elsewhere(self):
+        if self.stream is None:
+            return False
+        try:
+            return os.stat(self.baseFilename).st_ino != os.fstat(self.stream.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def emit(self, record):
+        if fcntl is None:
+            return super().emit(record)
+
+        fd = self._lock_fd()
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            if self._rotated_elsewhere():
+                self.stream.close()
+                self.stream = self._open()
+                if hasattr(self, "computeRollover"):
+                    self.rolloverAt = self.computeRollover(int(time.time()))
+            super().emit(record)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class SharedRotatingFileHandler(_SharedFileMixin, logging.handlers.RotatingFileHandler):
+    pass
+
+
+class SharedTimedRotatingFileHandler(_SharedFileMixin, logging.handlers.TimedRotatingFileHandler):
+    pass
+
+
+def _file_handler():
+    if LOG_ROTATE_WHEN:
+        handler = SharedTimedRotatingFileHandler(
+            LOG_FILE_PATH, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT, delay=True
+        )
+    else:
+        handler = SharedRotatingFileHandler(
+            LOG_FILE_PATH, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, delay=True
+        )
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+_queue_handler = None
+_listener = None
+
+
+def _start_listener():
+    """(Re)start the writer thread with a fresh queue; called again in forked children."""
+    global _listener
+    records = queue.SimpleQueue()
+    _queue_handler.queue = records
+    _listener = logging.handlers.QueueListener(records, _file_handler(), respect_handler_level=True)
+    _listener.start()
+
+
+def stop_queue_logging():
+    """Flush queued records and stop the writer thread (registered with atexit)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def _setup_queue_logging():
+    global _queue_handler
+    _queue_handler = _QueueHandler(queue.SimpleQueue())
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(LOG_LEVEL)
+    _start_listener()
+
+    atexit.register(stop_queue_logging)
+    # A forked worker inherits the handler but not the writer thread
+    os.register_at_fork(after_in_child=_start_listener)
+
+
 if not logging.getLogger().hasHandlers():
-    logging.basicConfig(
-        filename=LOG_FILE_PATH,
-        format="[%(asctime)s] %(levelname)s %(name)s:%(lineno)d - %(message)s",
-        level=logging.INFO,
-    )
+    if LOG_MODE == "queue":
+        _setup_queue_logging()
+    else:
+        logging.basicConfig(
+            filename=LOG_FILE_PATH,
+            format=LOG_FORMAT,
+            level=LOG_LEVEL,
+        )
 
 logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+serving_logger = logging.getLogger("serving")
+serving_logger.setLevel(LOG_SERVING_LEVEL)
+if LOG_SERVING_SAMPLE_RATE < 1:
+    serving_logger.addFilter(SamplingFilter(LOG_SERVING_SAMPLE_RATE))
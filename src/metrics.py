@@ -0,0 +1,396 @@
+import abc
+import atexit
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from threading import get_ident
+
+from src.exception import CustomException
+from src.logger import logging
+
+# Set to a shared directory to aggregate metrics across worker processes
+# (gunicorn.conf.py does this automatically); unset means single-process.
+METRICS_DIR_ENV = "METRICS_DIR"
+ARCHIVE_FILE = "archived.json"
+
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class _Metric(abc.ABC):
+    """
+    Base for counters, histograms and gauges. Every thread records into its own
+    shard (a dict keyed by label values), so the hot path takes no lock;
+    the lock is only held to create a thread's shard and to read them all.
+    Shards are keyed by thread id, so a pool reusing ids reuses shards.
+    """
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._shards = {}
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        shard = self._shards.get(get_ident())
+        if shard is None:
+            with self._lock:
+                shard = self._shards.setdefault(get_ident(), {})
+        return shard
+
+    def _shard_items(self):
+        """Every (labels, value) recorded by any thread, one pair per shard."""
+        with self._lock:
+            shards = list(self._shards.values())
+        for shard in shards:
+            yield from list(shard.items())
+
+    @abc.abstractmethod
+    def _merged(self):
+        """{labels: value} combined across threads."""
+
+    def snapshot(self):
+        return {
+            "type": self.kind,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": [[list(labels), value] for labels, value in self._merged().items()],
+        }
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        shard = self._shards.get(get_ident()) or self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def _merged(self):
+        totals = {}
+        for labels, value in self._shard_items():
+            totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        shard = self._shards.get(get_ident()) or self._shard()
+        entry = shard.get(labels)
+        if entry is None:
+            # Per-bucket (non-cumulative) counts, the +Inf bucket, then the sum
+            entry = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        entry[bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    def time(self, *labels):
+        return _Timer(self, labels)
+
+    def _merged(self):
+        totals = {}
+        for labels, entry in self._shard_items():
+            total = totals.setdefault(labels, [0] * len(entry[:-1]) + [0.0])
+            for i, value in enumerate(entry):
+                total[i] += value
+        return totals
+
+    def snapshot(self):
+        snap = super().snapshot()
+        snap["buckets"] = list(self.buckets)
+        return snap
+
+
+class Gauge(_Metric):
+    """Last-value metric; `set` replaces the value for its labels."""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def set(self, value, *labels):
+        self._values[labels] = value
+
+    def clear(self):
+        self._values = {}
+
+    def _merged(self):
+        return dict(self._values)
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class Registry:
+    """
+    Holds the process's metrics and renders the Prometheus text format.
+
+    In multi-process mode (METRICS_DIR set) each process writes its
+    snapshot to <METRICS_DIR>/metrics-<pid>.json about once a second and
+    right before rendering; rendering merges every file. Counters and
+    histograms are summed across processes; gauges keep one series per
+    process under a `pid` label. `archive_process` folds a dead worker's
+    counters into archived.json so totals never go backwards.
+    """
+
+    def __init__(self, flush_interval=1.0):
+        self.metrics = {}
+        self.collectors = []
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    def _after_fork(self):
+        # A forked worker must not report what its parent recorded (e.g. the
+        # preload in the gunicorn master) as its own; gauges stay valid.
+        for metric in self.metrics.values():
+            if metric.kind != "gauge":
+                metric._shards = {}
+                metric._lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    def register(self, metric):
+        with self._lock:
+            self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def add_collector(self, collect):
+        """`collect()` returns {name: snapshot dict} computed at scrape time."""
+        self.collectors.append(collect)
+
+    def snapshot(self):
+        snap = {name: metric.snapshot() for name, metric in list(self.metrics.items())}
+        for collect in self.collectors:
+            try:
+                snap.update(collect())
+            except Exception as e:
+                logging.warning(f"Metrics collector failed: {e}")
+        return snap
+
+    # ----------------------- multi-process -----------------------
+    @staticmethod
+    def metrics_dir():
+        return os.getenv(METRICS_DIR_ENV) or None
+
+    def write_snapshot(self):
+        path_dir = self.metrics_dir()
+        if path_dir is None:
+            return
+        os.makedirs(path_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", delete=False, dir=path_dir, suffix=".tmp") as tmp:
+            json.dump(self.snapshot(), tmp)
+            temp_path = tmp.name
+        os.replace(temp_path, os.path.join(path_dir, f"metrics-{os.getpid()}.json"))
+
+    def start_flusher(self):
+        """Start this process's snapshot writer (no-op when single-process or already running)."""
+        if self.metrics_dir() is None or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True).start()
+        atexit.register(self._safe_flush)
+
+    def _safe_flush(self):
+        try:
+            self.write_snapshot()
+        except Exception as e:
+            logging.warning(f"Could not write metrics snapshot: {e}")
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self._safe_flush()
+
+    @classmethod
+    def archive_process(cls, pid):
+        """Merge a dead process's counters/histograms into the archive and drop its file."""
+        path_dir = cls.metrics_dir()
+        if path_dir is None:
+            return
+        path = os.path.join(path_dir, f"metrics-{pid}.json")
+        if not os.path.exists(path):
+            return
+
+        archive_path = os.path.join(path_dir, ARCHIVE_FILE)
+        snapshots = [_read_json(archive_path), _read_json(path)]
+        merged = _merge([s for s in snapshots if s], include_gauges=False)
+
+        with tempfile.NamedTemporaryFile("w", delete=False, dir=path_dir, suffix=".tmp") as tmp:
+            json.dump(merged, tmp)
+            temp_path = tmp.name
+        os.replace(temp_path, archive_path)
+        os.remove(path)
+
+    def collect(self):
+        """Merged {name: snapshot} for this process, or for all processes in multi-process mode."""
+        path_dir = self.metrics_dir()
+        if path_dir is None:
+            return self.snapshot()
+
+        self.write_snapshot()
+        snapshots = []
+        for path in sorted(glob.glob(os.path.join(path_dir, "*.json"))):
+            snap = _read_json(path)
+            if not snap:
+                continue
+            name = os.path.basename(path)
+            pid = None if name == ARCHIVE_FILE else name[len("metrics-"):-len(".json")]
+            snapshots.append(_label_gauges(snap, pid))
+        return _merge(snapshots, include_gauges=True)
+
+    def render(self):
+        return render_text(self.collect())
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _label_gauges(snapshot, pid):
+    if pid is None:
+        return snapshot
+    for snap in snapshot.values():
+        if snap["type"] == "gauge":
+            snap["labelnames"] = snap["labelnames"] + ["pid"]
+            snap["samples"] = [[labels + [pid], value] for labels, value in snap["samples"]]
+    return snapshot
+
+
+def _merge(snapshots, include_gauges):
+    merged = {}
+    for snapshot in snapshots:
+        for name, snap in snapshot.items():
+            if snap["type"] == "gauge" and not include_gauges:
+                continue
+            target = merged.setdefault(name, dict(snap, samples={}))
+            for labels, value in snap["samples"]:
+                key = tuple(labels)
+                if snap["type"] == "histogram":
+                    current = target["samples"].get(key)
+                    target["samples"][key] = value if current is None else [a + b for a, b in zip(current, value)]
+                elif snap["type"] == "counter":
+                    target["samples"][key] = target["samples"].get(key, 0) + value
+                else:
+                    target["samples"][key] = value
+
+    for snap in merged.values():
+        snap["samples"] = [[list(labels), value] for labels, value in snap["samples"].items()]
+    return merged
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_text(snapshots):
+    """Prometheus text exposition format (0.0.4) for merged snapshots."""
+    lines = []
+    for name in sorted(snapshots):
+        snap = snapshots[name]
+        names = snap["labelnames"]
+        lines.append(f"# HELP {name} {snap['help']}")
+        lines.append(f"# TYPE {name} {snap['type']}")
+
+        for labels, value in sorted(snap["samples"], key=lambda s: [str(v) for v in s[0]]):
+            if snap["type"] != "histogram":
+                lines.append(f"{name}{_label_text(names, labels)} {_number(value)}")
+                continue
+
+            cumulative = 0
+            for bound, count in zip(snap["buckets"] + [float("inf")], value[:-1]):
+                cumulative += count
+                le = f'le="{_number(float(bound))}"'
+                lines.append(f"{name}_bucket{_label_text(names, labels, le)} {cumulative}")
+            lines.append(f"{name}_sum{_label_text(names, labels)} {_number(float(value[-1]))}")
+            lines.append(f"{name}_count{_label_text(names, labels)} {cumulative}")
+
+    return "\n".join(lines) + "\n"
+
+
+def error_type(exc):
+    """Name of the underlying error (CustomException wraps the original as its context)."""
+    while isinstance(exc, CustomException) and exc.__context__ is not None:
+        exc = exc.__context__
+    return type(exc).__name__
+
+
+REGISTRY = Registry()
+os.register_at_fork(after_in_child=REGISTRY._after_fork)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# ============================================================
+# Serving metrics
+# ============================================================
+REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("route", "method", "status")
+)
+# operation: record (/predictdata), batch (/api/predict/batch) or coalesced
+# (micro-batches built from concurrent records). phase: validation, lookup
+# (prediction table + cache), dataframe_build, preprocess, model_predict.
+PHASE_SECONDS = REGISTRY.histogram(
+    "prediction_phase_duration_seconds", "Time spent in each prediction phase.", ("operation", "phase")
+)
+ERRORS = REGISTRY.counter("prediction_errors_total", "Failed prediction requests by route and error type.",
+                          ("route", "type"))
+MODEL_LOAD_SECONDS = REGISTRY.histogram(
+    "model_load_duration_seconds", "Time to load and smoke-test a model version.", ("result",),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+MODEL_INFO = REGISTRY.gauge("model_info", "Loaded model version (always 1).", ("version", "backend"))
+MODEL_LOADED_AT = REGISTRY.gauge("model_loaded_timestamp_seconds", "Unix time the live model was loaded.")
@@ -0,0 +1,312 @@
+"""
+Bulk scoring of CSV/Parquet files.
+
+    python -m src.pipeline.batch_score students.csv predictions.csv
+    python -m src.pipeline.batch_score in.parquet out.parquet --workers 8 --chunk-size 50000
+
+Rows are validated with the same rules as the /predictdata form
+(CustomData.from_record); a row that fails validation or scoring goes to
+the reject file with its row number and error instead of stopping the run.
+Parquet input/output needs pyarrow.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.exception import CustomException
+from src.logger import logging
+from src.pipeline.predict_pipeline import CustomData, PredictPipeline
+
+PREDICTION_COLUMN = "prediction"
+
+
+@dataclass
+class BatchScoreConfig:
+    chunk_size: int = 20_000
+    # Scoring processes; 0 scores in this process (no pool, no pickling)
+    workers: int = os.cpu_count() or 1
+    # Chunks queued or running per worker; bounds memory, keeps workers busy
+    max_pending_per_worker: int = 2
+    # Same 0-100 clamp the web routes apply to a prediction
+    clip: bool = True
+    log_every_chunks: int = 10
+    rejects_path: Optional[str] = None
+
+
+# ------------------------------------------------------------------
+# Streaming readers / writers
+# ------------------------------------------------------------------
+def _is_parquet(path):
+    return str(path).lower().endswith((".parquet", ".pq"))
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet files need pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+def iter_chunks(path, chunk_size):
+    """
+    Yield DataFrames of at most `chunk_size` rows. CSV values are read as
+    strings with blanks kept as "", exactly what the form would post.
+    """
+    if _is_parquet(path):
+        pa = _require_pyarrow()
+        for batch in pa.parquet.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+        return
+
+    yield from pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False)
+
+
+class ChunkWriter:
+    """
+    Append DataFrame chunks to a CSV or Parquet file. Writes go to a temp
+    file next to `path` that replaces it on close, so a failed run never
+    leaves a half-written output behind.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._parquet = _is_parquet(path)
+        dir_name = os.path.dirname(os.path.abspath(path))
+        os.makedirs(dir_name, exist_ok=True)
+        fd, self._temp_path = tempfile.mkstemp(dir=dir_name, suffix=".tmp")
+        os.close(fd)
+        self._file = None
+        self._writer = None
+
+    def write(self, frame):
+        if self._parquet:
+            pa = _require_pyarrow()
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._writer is None:
+                self._writer = pa.parquet.ParquetWriter(self._temp_path, table.schema)
+            self._writer.write_table(table)
+        else:
+            if self._file is None:
+                self._file = open(self._temp_path, "w", newline="")
+                frame.to_csv(self._file, index=False, header=True)
+            else:
+                frame.to_csv(self._file, index=False, header=False)
+        self.rows += len(frame)
+
+    def close(self, columns=None):
+        """Finish the file; an output with no rows still gets a header (`columns`)."""
+        if self._writer is None and self._file is None and columns is not None:
+            self.write(pd.DataFrame(columns=columns))
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+        os.replace(self._temp_path, self.path)
+
+    def abort(self):
+        for handle in (self._writer, self._file):
+            if handle is not None:
+                handle.close()
+        if os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
+
+
+# ------------------------------------------------------------------
+# Scoring (runs in the worker processes)
+# ------------------------------------------------------------------
+_worker_bundle = None
+
+
+def _init_worker(source):
+    """Pool initializer: load the pinned model version once per worker."""
+    global _worker_bundle
+    _worker_bundle = PredictPipeline._load_bundle(source)
+
+
+def score_records(bundle, records):
+    """
+    Validate and score a list of raw records. Returns (predictions, rejects):
+    predictions is a float array aligned with `records` (NaN for rejects),
+    rejects maps the position in `records` to its error message.
+    """
+    predictions = np.full(len(records), np.nan)
+    rejects = {}
+    positions = []
+    items = []
+
+    for i, record in enumerate(records):
+        try:
+            items.append(CustomData.from_record(record))
+            positions.append(i)
+        except ValueError as e:
+            rejects[i] = str(e)
+
+    if not items:
+        return predictions, rejects
+
+    try:
+        predictions[positions] = PredictPipeline._predict_many(bundle, items, "bulk")
+    except Exception:
+        # One bad row (e.g. a category the encoder never saw) fails the whole
+        # chunk: score row by row so only that row is rejected
+        for i, item in zip(positions, items):
+            try:
+                predictions[i] = PredictPipeline._predict_many(bundle, [item], "bulk")[0]
+            except Exception as e:
+                cause = e.__context__ if isinstance(e, CustomException) and e.__context__ is not None else e
+                rejects[i] = f"Prediction failed: {cause}"
+
+    return predictions, rejects
+
+
+def _records(frame):
+    # Much faster than DataFrame.to_dict("records") for string columns
+    columns = list(frame.columns)
+    return [dict(zip(columns, row)) for row in frame.itertuples(index=False, name=None)]
+
+
+def _score_chunk(frame):
+    return score_records(_worker_bundle, _records(frame))
+
+
+# ------------------------------------------------------------------
+# Driver
+# ------------------------------------------------------------------
+class BatchScorer:
+    def __init__(self, config: Optional[BatchScoreConfig] = None):
+        self.config = config or BatchScoreConfig()
+
+    @staticmethod
+    def default_rejects_path(output_path):
+        root, _ = os.path.splitext(output_path)
+        return f"{root}.rejects.csv"
+
+    def _results(self, chunks, source):
+        """
+        Yield (chunk, predictions, rejects) in input order. At most
+        workers * max_pending_per_worker chunks are in flight, so memory
+        stays bounded however large the input is.
+        """
+        if self.config.workers <= 0:
+            bundle = PredictPipeline._load_bundle(source)
+            for chunk in chunks:
+                yield (chunk,) + score_records(bundle, _records(chunk))
+            return
+
+        window = self.config.workers * self.config.max_pending_per_worker
+        pending = deque()
+        with ProcessPoolExecutor(
+            self.config.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(source,),
+        ) as pool:
+            for chunk in chunks:
+                # The DataFrame pickles far smaller than a list of row dicts
+                pending.append((chunk, pool.submit(_score_chunk, chunk)))
+                if len(pending) >= window:
+                    chunk, future = pending.popleft()
+                    yield (chunk,) + future.result()
+            while pending:
+                chunk, future = pending.popleft()
+                yield (chunk,) + future.result()
+
+    def score_file(self, input_path, output_path):
+        """
+        Score `input_path` into `output_path` (input columns + prediction).
+        Returns a summary dict including rows/second.
+        """
+        config = self.config
+        rejects_path = config.rejects_path or self.default_rejects_path(output_path)
+        source = PredictPipeline._source()
+        start = time.perf_counter()
+
+        output = ChunkWriter(output_path)
+        rejected = ChunkWriter(rejects_path)
+        columns = None
+        rows = 0
+        try:
+            for n, (chunk, predictions, rejects) in enumerate(
+                self._results(iter_chunks(input_path, config.chunk_size), source), start=1
+            ):
+                columns = list(chunk.columns)
+                mask = np.ones(len(chunk), dtype=bool)
+                if rejects:
+                    positions = sorted(rejects)
+                    mask[positions] = False
+                    bad = chunk.iloc[positions].copy()
+                    bad.insert(0, "row", [rows + p for p in positions])
+                    bad["error"] = [rejects[p] for p in positions]
+                    rejected.write(bad)
+
+                good = chunk[mask].copy()
+                values = predictions[mask]
+                good[PREDICTION_COLUMN] = np.clip(values, 0.0, 100.0) if config.clip else values
+                output.write(good)
+                rows += len(chunk)
+
+                if n % config.log_every_chunks == 0:
+                    logging.info(f"Scored {rows} rows ({rows / (time.perf_counter() - start):.0f} rows/s)")
+
+            output.close(columns=(columns or []) + [PREDICTION_COLUMN])
+            rejected.close(columns=["row"] + (columns or []) + ["error"])
+        except Exception as e:
+            output.abort()
+            rejected.abort()
+            raise CustomException(e, sys)
+
+        seconds = time.perf_counter() - start
+        summary = {
+            "input": input_path,
+            "output": output_path,
+            "rejects": rejects_path,
+            "model_source": list(source),
+            "rows": rows,
+            "scored": output.rows,
+            "rejected": rejected.rows,
+            "seconds": seconds,
+            "rows_per_second": rows / seconds if seconds > 0 else 0.0,
+            "workers": config.workers,
+            "chunk_size": config.chunk_size,
+        }
+        logging.info(f"Bulk scoring finished: {summary}")
+        return summary
+
+
+def main(argv=None):
+    defaults = BatchScoreConfig()
+    parser = argparse.ArgumentParser(description="Score a CSV/Parquet file with the live model")
+    parser.add_argument("input", help="CSV or Parquet file with the form's fields as columns")
+    parser.add_argument("output", help="CSV or Parquet file for the input columns plus a prediction column")
+    parser.add_argument("--rejects", help="CSV for invalid rows (default: <output>.rejects.csv)")
+    parser.add_argument("--workers", type=int, default=defaults.workers, help="0 scores in this process")
+    parser.add_argument("--chunk-size", type=int, default=defaults.chunk_size)
+    parser.add_argument("--no-clip", action="store_true", help="write raw model output instead of 0-100")
+    args = parser.parse_args(argv)
+
+    config = BatchScoreConfig(
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        clip=not args.no_clip,
+        rejects_path=args.rejects,
+    )
+    summary = BatchScorer(config).score_file(args.input, args.output)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from src.logger import logging
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item predictions into batched calls.
+
+    `submit` queues an item and returns a Future. A background thread takes
+    the first waiting item, keeps collecting for up to `max_wait_ms` or
+    until `max_batch_size` items are queued, then calls
+    `predict_many(items)` once and resolves every Future with its row.
+    A larger window means bigger batches (throughput) at the cost of up to
+    `max_wait_ms` of added latency for the first request in each batch.
+    """
+
+    def __init__(self, predict_many, max_batch_size=64, max_wait_ms=2.0, name="predict-batcher"):
+        self.predict_many = predict_many
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._queue = None
+        self._pid = None
+
+        self.batches = 0
+        self.items = 0
+        self.errors = 0
+        self.queue_wait_seconds = 0.0
+        self.size_histogram = {}
+
+    def _ensure_thread(self):
+        # A forked worker inherits the queue but not the thread serving it
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.SimpleQueue()
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, args=(self._queue,), name=self.name, daemon=True).start()
+
+    def submit(self, item):
+        self._ensure_thread()
+        future = Future()
+        self._queue.put((item, future, time.monotonic()))
+        return future
+
+    def predict(self, item, timeout=None):
+        """Submit one item and wait for its prediction."""
+        return self.submit(item).result(timeout)
+
+    def _collect(self, pending):
+        batch = [pending.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(pending.get(timeout=remaining))
+                else:
+                    # Window closed: still take whatever is already queued
+                    batch.append(pending.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self, pending):
+        while True:
+            batch = self._collect(pending)
+            started = time.monotonic()
+
+            try:
+                results = self.predict_many([item for item, _, _ in batch])
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                logging.error(f"Batched prediction of {len(batch)} items failed: {e}")
+                self.errors += 1
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+            self._record(len(batch), sum(started - queued for _, _, queued in batch))
+
+    @staticmethod
+    def _bucket(size):
+        """Power-of-two bucket label: 1, 2, 3-4, 5-8, 9-16, ..."""
+        if size <= 2:
+            return str(size)
+        upper = 1 << (size - 1).bit_length()
+        return f"{upper // 2 + 1}-{upper}"
+
+    def _record(self, size, waited):
+        with self._lock:
+            self.batches += 1
+            self.items += size
+            self.queue_wait_seconds += waited
+            bucket = self._bucket(size)
+            self.size_histogram[bucket] = self.size_histogram.get(bucket, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "batches": self.batches,
+                "items": self.items,
+                "errors": self.errors,
+                "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+                "mean_queue_wait_ms": self.queue_wait_seconds / self.items * 1000 if self.items else 0.0,
+                "batch_size_histogram": dict(
+                    sorted(self.size_histogram.items(), key=lambda kv: int(kv[0].split("-")[0]))
+                ),
+            }
@@ -0,0 +1,263 @@
+import sys
+
+import numpy as np
+
+from src.exception import CustomException
+
+
+class CompiledPreprocessor:
+    """
+    Pandas-free replica of the fitted ColumnTransformer built by
+    DataTransformation.get_data_transformer_object.
+
+    The fitted statistics (imputer fill values, scaler mean/scale and one-hot
+    category -> column maps) are pulled out once, and feature vectors are then
+    written straight from plain dicts into a preallocated NumPy array.
+    Supported steps: SimpleImputer, StandardScaler and OneHotEncoder; anything
+    else raises ValueError so callers can fall back to the sklearn path.
+    """
+
+    def __init__(self, numeric_blocks, categorical_blocks, n_features, sparse_output=False):
+        self.numeric_blocks = numeric_blocks
+        self.categorical_blocks = categorical_blocks
+        self.n_features = n_features
+        self.sparse_output = sparse_output
+
+    @classmethod
+    def from_column_transformer(cls, preprocessor):
+        if not hasattr(preprocessor, "transformers_"):
+            raise ValueError("Preprocessor must be a fitted ColumnTransformer.")
+
+        numeric_blocks = []
+        categorical_blocks = []
+        offset = 0
+
+        for name, transformer, columns in preprocessor.transformers_:
+            if transformer == "drop" or (name == "remainder" and len(columns) == 0):
+                continue
+            if isinstance(transformer, str):
+                raise ValueError(f"Unsupported transformer '{transformer}' for {name}.")
+
+            steps = [step for _, step in getattr(transformer, "steps", [("", transformer)])]
+            columns = list(columns)
+            encoder = next((s for s in steps if type(s).__name__ == "OneHotEncoder"), None)
+
+            if encoder is None:
+                block = cls._compile_numeric(steps, columns, offset)
+                numeric_blocks.append(block)
+                offset += len(columns)
+            else:
+                block = cls._compile_categorical(steps, columns, offset)
+                categorical_blocks.append(block)
+                offset += block["width"]
+
+        return cls(
+            numeric_blocks=numeric_blocks,
+            categorical_blocks=categorical_blocks,
+            n_features=offset,
+            sparse_output=bool(getattr(preprocessor, "sparse_output_", False)),
+        )
+
+    @staticmethod
+    def _imputer_fill(step, n_columns):
+        missing = step.missing_values
+        if not (isinstance(missing, float) and np.isnan(missing)):
+            raise ValueError("Only NaN missing_values are supported by SimpleImputer.")
+        if getattr(step, "add_indicator", False):
+            raise ValueError("SimpleImputer(add_indicator=True) is not supported.")
+        fill = np.asarray(step.statistics_)
+        if len(fill) != n_columns:
+            raise ValueError("SimpleImputer dropped columns; cannot compile.")
+        return fill
+
+    @classmethod
+    def _compile_numeric(cls, steps, columns, offset):
+        block = {
+            "columns": columns,
+            "start": offset,
+            "stop": offset + len(columns),
+            "fill": None,
+            "mean": None,
+            "scale": None,
+        }
+        for step in steps:
+            kind = type(step).__name__
+            if kind == "SimpleImputer" and block["mean"] is None and block["scale"] is None:
+                block["fill"] = cls._imputer_fill(step, len(columns)).astype(np.float64)
+            elif kind == "StandardScaler" and block["mean"] is None and block["scale"] is None:
+                if step.with_mean:
+                    block["mean"] = np.asarray(step.mean_, dtype=np.float64)
+                if step.with_std:
+                    block["scale"] = np.asarray(step.scale_, dtype=np.float64)
+            else:
+                raise ValueError(f"Unsupported numeric step: {kind}")
+        return block
+
+    @classmethod
+    def _compile_categorical(cls, steps, columns, offset):
+        fill = None
+        encoder = None
+        for step in steps:
+            kind = type(step).__name__
+            if kind == "SimpleImputer" and encoder is None:
+                fill = cls._imputer_fill(step, len(columns))
+            elif kind == "OneHotEncoder" and encoder is None:
+                encoder = step
+            else:
+                raise ValueError(f"Unsupported categorical step: {kind}")
+
+        if encoder.drop_idx_ is not None:
+            raise ValueError("OneHotEncoder(drop=...) is not supported.")
+        if getattr(encoder, "_infrequent_enabled", False):
+            raise ValueError("OneHotEncoder infrequent categories are not supported.")
+
+        index_maps = []
+        position = offset
+        for categories in encoder.categories_:
+            index_maps.append({value: position + i for i, value in enumerate(categories)})
+            position += len(categories)
+
+        return {
+            "columns": columns,
+            "fill": None if fill is None else list(fill),
+            "index_maps": index_maps,
+            "ignore_unknown": encoder.handle_unknown != "error",
+            "width": position - offset,
+        }
+
+    @staticmethod
+    def _to_float(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return np.nan
+
+    @staticmethod
+    def _is_missing(value):
+        # Mirrors SimpleImputer on object columns: only NaN counts as missing.
+        return isinstance(value, float) and value != value
+
+    def _fill_row(self, out, record):
+        for block in self.numeric_blocks:
+            values = np.array([self._to_float(record.get(c)) for c in block["columns"]])
+            if block["fill"] is not None:
+                mask = np.isnan(values)
+                if mask.any():
+                    values[mask] = block["fill"][mask]
+            if block["mean"] is not None:
+                values -= block["mean"]
+            if block["scale"] is not None:
+                values /= block["scale"]
+            out[block["start"]:block["stop"]] = values
+
+        for block in self.categorical_blocks:
+            for j, column in enumerate(block["columns"]):
+                value = record.get(column)
+                if block["fill"] is not None and self._is_missing(value):
+                    value = block["fill"][j]
+                index = block["index_maps"][j].get(value)
+                if index is not None:
+                    out[index] = 1.0
+                elif not block["ignore_unknown"]:
+                    raise ValueError(f"Found unknown category {value!r} in column {column}.")
+
+    def feature_groups(self):
+        """Raw column -> indices of the output columns computed from it."""
+        groups = {}
+        for block in self.numeric_blocks:
+            for i, column in enumerate(block["columns"]):
+                groups[column] = [block["start"] + i]
+        for block in self.categorical_blocks:
+            for column, index_map in zip(block["columns"], block["index_maps"]):
+                groups[column] = sorted(index_map.values())
+        return groups
+
+    def _finish(self, X):
+        if self.sparse_output:
+            from scipy import sparse
+            return sparse.csr_matrix(X)
+        return X
+
+    def transform_record(self, record):
+        """Transform one mapping of column -> raw value into a (1, n_features) matrix."""
+        out = np.zeros((1, self.n_features), dtype=np.float64)
+        self._fill_row(out[0], record)
+        return self._finish(out)
+
+    def transform_records(self, records):
+        """
+        Transform a sequence of mappings into an (n_rows, n_features) matrix.
+        Same result as transform_record per row, but filled a column at a
+        time, which is several times faster for large batches.
+        """
+        out = np.zeros((len(records), self.n_features), dtype=np.float64)
+        if not len(records):
+            return self._finish(out)
+
+        for block in self.numeric_blocks:
+            values = np.array(
+                [[self._to_float(record.get(c)) for c in block["columns"]] for record in records],
+                dtype=np.float64,
+            )
+            if block["fill"] is not None:
+                values = np.where(np.isnan(values), block["fill"], values)
+            if block["mean"] is not None:
+                values -= block["mean"]
+            if block["scale"] is not None:
+                values /= block["scale"]
+            out[:, block["start"]:block["stop"]] = values
+
+        rows = np.arange(len(records))
+        for block in self.categorical_blocks:
+            for j, column in enumerate(block["columns"]):
+                index_map = block["index_maps"][j]
+                fill = block["fill"][j] if block["fill"] is not None else None
+                indices = np.empty(len(records), dtype=np.intp)
+                for i, record in enumerate(records):
+                    value = record.get(column)
+                    if fill is not None and self._is_missing(value):
+                        value = fill
+                    index = index_map.get(value)
+                    if index is None:
+                        if not block["ignore_unknown"]:
+                            raise ValueError(f"Found unknown category {value!r} in column {column}.")
+                        index = -1
+                    indices[i] = index
+                known = indices >= 0
+                out[rows[known], indices[known]] = 1.0
+
+        return self._finish(out)
+
+
+def verify_parity(preprocessor, frame, compiled=None, model=None):
+    """
+    Check that the compiled transform reproduces `preprocessor.transform`
+    exactly on every row of `frame` (and the model predictions, if given).
+    Returns the number of rows checked; raises AssertionError on mismatch.
+    """
+    try:
+        compiled = compiled or CompiledPreprocessor.from_column_transformer(preprocessor)
+
+        expected = preprocessor.transform(frame)
+        actual = compiled.transform_records(frame.to_dict(orient="records"))
+
+        if hasattr(expected, "toarray"):
+            expected = expected.toarray()
+        if hasattr(actual, "toarray"):
+            actual = actual.toarray()
+
+        if not np.array_equal(expected, actual):
+            rows = np.unique(np.nonzero(expected != actual)[0])
+            raise AssertionError(f"Compiled transform differs on rows: {rows[:10].tolist()}")
+
+        if model is not None:
+            if not np.array_equal(model.predict(expected), model.predict(actual)):
+                raise AssertionError("Model predictions differ between sklearn and compiled features.")
+
+        return len(frame)
+
+    except AssertionError:
+        raise
+    except Exception as e:
+        raise CustomException(e, sys)
+
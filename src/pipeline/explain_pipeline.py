@@ -0,0 +1,362 @@
+import csv
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.columnar import is_columnar, read_columns, read_schema
+from src.exception import CustomException
+from src.logger import logging
+from src.metrics import PHASE_SECONDS
+from src.pipeline.native_model import CatBoostNativeModel, FlatTreeModel, XGBoostNativeModel
+from src.pipeline.predict_pipeline import CustomData, PredictionCache, PredictPipeline, _env_flag, _env_float
+from src.pipeline.tree_engine import FlatTreeEnsemble
+
+METHODS = ("auto", "exact", "lime")
+
+CATEGORICAL_FEATURES = [
+    "gender",
+    "race_ethnicity",
+    "parental_level_of_education",
+    "lunch",
+    "test_preparation_course",
+]
+
+
+@dataclass
+class ExplainPipelineConfig:
+    # Training rows the explainers sample from (read once per process): the
+    # train split DataIngestionConfig.train_data_path writes, or the CSV copy
+    # when only that exists (ingestion configured for CSV, older checkouts)
+    train_data_path: str = os.path.join("artifacts", "train.cols")
+    train_csv_path: str = os.path.join("artifacts", "train.csv")
+    # Perturbed samples per LIME explanation; all of them are scored in one
+    # predict call, so this is the batch size of that call
+    num_samples: int = int(_env_float("EXPLAIN_NUM_SAMPLES", 1000))
+    max_num_samples: int = 20_000
+    # 0 disables the explanation cache; TTL <= 0 means entries never expire
+    cache_size: int = int(_env_float("EXPLAIN_CACHE_SIZE", 1024))
+    cache_ttl_seconds: float = _env_float("EXPLAIN_CACHE_TTL", 0)
+    random_state: int = 42
+    # warm_up() always reads the training data and prepares exact
+    # explanations; building the LIME explainer there too imports sklearn
+    # and scipy into every serving process
+    warm_up_lime: bool = _env_flag("EXPLAIN_WARMUP_LIME")
+
+
+class TrainingStats:
+    """
+    What the explainers need from the training data, computed once: the
+    categories of each categorical column (LIME works on integer codes),
+    the encoded training matrix LIME derives its quartile bins and
+    sampling frequencies from, and the raw records for model-specific means.
+    Read with read_columns (columnar) or the csv module, so serving
+    processes never import pandas.
+    """
+
+    def __init__(self, records):
+        self.records = records
+        self.categories = {
+            column: sorted({record[column] for record in records}) for column in CATEGORICAL_FEATURES
+        }
+        self.codes = {
+            column: {value: i for i, value in enumerate(values)} for column, values in self.categories.items()
+        }
+        self.encoded = np.array([self.encode_values(record) for record in records], dtype=float)
+
+    @classmethod
+    def load(cls, path):
+        try:
+            if is_columnar(path):
+                records = cls._read_columnar(path)
+            else:
+                with open(path, newline="") as f:
+                    records = [
+                        {column: row[column] for column in CustomData.FEATURE_ORDER} for row in csv.DictReader(f)
+                    ]
+            for record in records:
+                record["reading_score"] = float(record["reading_score"])
+                record["writing_score"] = float(record["writing_score"])
+            return cls(records)
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    @staticmethod
+    def _read_columnar(path):
+        columns = read_columns(path, CustomData.FEATURE_ORDER, mmap=False)
+        for entry in read_schema(path)["columns"]:
+            if entry["name"] in columns and entry["kind"] == "categorical":
+                # Code -1 (missing) picks the trailing "", as csv reads an empty cell
+                values = np.asarray(entry["categories"] + [""], dtype=object)
+                columns[entry["name"]] = values[columns[entry["name"]]]
+        rows = zip(*(columns[column] for column in CustomData.FEATURE_ORDER))
+        return [dict(zip(CustomData.FEATURE_ORDER, row)) for row in rows]
+
+    def encode_values(self, record):
+        """A record as a LIME row (category codes, numeric scores)."""
+        row = []
+        for column in CustomData.FEATURE_ORDER:
+            value = record[column]
+            if column in self.codes:
+                if value not in self.codes[column]:
+                    raise ValueError(f"LIME needs a {column} seen in training, got {value!r}.")
+                row.append(self.codes[column][value])
+            else:
+                row.append(float(value))
+        return row
+
+    def encode(self, data):
+        return np.array(self.encode_values(vars(data)), dtype=float)
+
+    def decode(self, samples):
+        """LIME's perturbed rows back into CustomData items."""
+        columns = []
+        for j, column in enumerate(CustomData.FEATURE_ORDER):
+            if column in self.categories:
+                values = np.asarray(self.categories[column], dtype=object)
+                columns.append(values[samples[:, j].astype(int)])
+            else:
+                columns.append(samples[:, j])
+        return [CustomData(*row) for row in zip(*columns)]
+
+
+class ExplainPipeline:
+    """
+    Per-feature explanations of the live model's prediction for one record.
+
+    "exact" decomposes the prediction itself: coefficient times the
+    distance from the training mean for linear models, decision-path
+    contributions for the sklearn tree models (via FlatTreeEnsemble) and
+    the libraries' own SHAP values for XGBoost/CatBoost. "lime" fits a
+    local surrogate on `num_samples` perturbations of the record, which
+    works for any model; the perturbations go through PredictPipeline in a
+    single batched predict call. "auto" picks exact when the model has it.
+
+    Training statistics are read once per process and the per-version
+    state (tree arrays, linear means) once per model version; explanations
+    are cached by (version, method, samples) + the record's feature tuple.
+    """
+    config = ExplainPipelineConfig()
+
+    _stats = None
+    _lime = None
+    _exact = None  # (version, explainer or None)
+    _lock = threading.RLock()
+    _cache = PredictionCache(config.cache_size, config.cache_ttl_seconds)
+
+    @classmethod
+    def _training_stats(cls):
+        if cls._stats is None:
+            with cls._lock:
+                if cls._stats is None:
+                    cls._stats = TrainingStats.load(cls._training_data_path())
+        return cls._stats
+
+    @classmethod
+    def _training_data_path(cls):
+        path = cls.config.train_data_path
+        if not os.path.exists(path) and os.path.exists(cls.config.train_csv_path):
+            return cls.config.train_csv_path
+        return path
+
+    @classmethod
+    def _lime_explainer(cls):
+        if cls._lime is None:
+            stats = cls._training_stats()
+            with cls._lock:
+                if cls._lime is None:
+                    from lime.lime_tabular import LimeTabularExplainer
+
+                    cls._lime = LimeTabularExplainer(
+                        stats.encoded,
+                        mode="regression",
+                        feature_names=CustomData.FEATURE_ORDER,
+                        categorical_features=[CustomData.FEATURE_ORDER.index(c) for c in CATEGORICAL_FEATURES],
+                        categorical_names={
+                            CustomData.FEATURE_ORDER.index(c): values for c, values in stats.categories.items()
+                        },
+                        random_state=cls.config.random_state,
+                    )
+        return cls._lime
+
+    @classmethod
+    def _exact_explainer(cls, bundle):
+        """(method name, fn(X) -> (bias, contributions)) for the bundle's model, or None."""
+        cached = cls._exact
+        if cached is not None and cached[0] == bundle.version:
+            return cached[1]
+
+        with cls._lock:
+            explainer = cls._build_exact_explainer(bundle)
+            cls._exact = (bundle.version, explainer)
+        logging.info(
+            f"Exact explanations for version {bundle.version}: {explainer[0] if explainer else 'unavailable'}"
+        )
+        return explainer
+
+    @classmethod
+    def _build_exact_explainer(cls, bundle):
+        model = bundle.model
+        if bundle.compiled is None:
+            return None
+
+        if isinstance(model, (FlatTreeEnsemble, FlatTreeModel, XGBoostNativeModel, CatBoostNativeModel)):
+            tree_path = isinstance(model, (FlatTreeEnsemble, FlatTreeModel))
+            return "tree_path" if tree_path else "tree_shap", model.contributions
+        if FlatTreeEnsemble.supports(model):
+            return "tree_path", FlatTreeEnsemble.from_sklearn(model).contributions
+        if type(model).__name__ == "XGBRegressor":
+            # A copy: the wrapper that serves predictions keeps its thread settings
+            return "tree_shap", XGBoostNativeModel(model.get_booster().copy()).contributions
+        if type(model).__name__ == "CatBoostRegressor":
+            return "tree_shap", CatBoostNativeModel(model).contributions
+
+        coef = getattr(model, "coef_", None)
+        if coef is not None and np.ndim(coef) == 1:
+            records = cls._training_stats().records
+            mean = np.asarray(bundle.compiled.transform_records(records).mean(axis=0)).ravel()
+            coef = np.asarray(coef, dtype=float)
+            base = float(model.intercept_ + coef @ mean)
+
+            def linear(X):
+                X = X.toarray() if hasattr(X, "toarray") else np.asarray(X)
+                return np.full(X.shape[0], base), (X - mean) * coef
+
+            return "linear", linear
+        return None
+
+    @classmethod
+    def warm_up(cls):
+        """
+        Precompute the training statistics and the live version's exact
+        explainer. Returns the seconds taken. Runs in the gunicorn master, so
+        it uses the preloaded bundle and never starts the watcher thread.
+        """
+        start = time.perf_counter()
+        cls._training_stats()
+        cls._exact_explainer(PredictPipeline._bundle or PredictPipeline.preload())
+        if cls.config.warm_up_lime:
+            cls._lime_explainer()
+        return time.perf_counter() - start
+
+    @staticmethod
+    def _resolve_method(method):
+        method = (method or "auto").strip().lower()
+        if method not in METHODS:
+            raise ValueError(f"Unknown explanation method {method!r}; use one of {', '.join(METHODS)}.")
+        return method
+
+    def _num_samples(self, num_samples):
+        if num_samples in (None, ""):
+            return self.config.num_samples
+        try:
+            num_samples = int(num_samples)
+        except (TypeError, ValueError):
+            raise ValueError("num_samples must be an integer.")
+        if not (10 <= num_samples <= self.config.max_num_samples):
+            raise ValueError(f"num_samples must be between 10 and {self.config.max_num_samples}.")
+        return num_samples
+
+    def explain_record(self, data, method="auto", num_samples=None):
+        """
+        Explain the live model's prediction for one validated CustomData.
+        Raises ValueError for an unknown method, a bad num_samples or
+        "exact" on a model without exact contributions.
+        """
+        method = self._resolve_method(method)
+        num_samples = self._num_samples(num_samples)
+        bundle = PredictPipeline._current_bundle()
+
+        exact = self._exact_explainer(bundle) if method != "lime" else None
+        if method == "exact" and exact is None:
+            raise ValueError(f"No exact contributions for {type(bundle.model).__name__}; use method=lime.")
+
+        method_key = (exact[0], 0) if exact is not None else ("lime", num_samples)
+        key = (bundle.version,) + method_key + data.cache_key()
+        hit, result = self._cache.get(key)
+        if hit:
+            return dict(result, cached=True)
+
+        try:
+            start = time.perf_counter()
+            if exact is not None:
+                result = self._explain_exact(bundle, data, *exact)
+            else:
+                result = self._explain_lime(bundle, data, num_samples)
+            PHASE_SECONDS.observe(time.perf_counter() - start, "explain", result["method"])
+
+        except ValueError:
+            raise
+        except Exception as e:
+            raise CustomException(e, sys)
+
+        result["model_version"] = bundle.version
+        self._cache.put(key, result)
+        return dict(result, cached=False)
+
+    @staticmethod
+    def _explain_exact(bundle, data, method, contributions_fn):
+        X = bundle.compiled.transform_record(vars(data))
+        bias, contributions = contributions_fn(X)
+        contributions = np.asarray(contributions)[0]
+
+        features = []
+        for column, indices in bundle.compiled.feature_groups().items():
+            features.append({
+                "feature": column,
+                "value": getattr(data, column),
+                "contribution": float(contributions[indices].sum()),
+            })
+        features.sort(key=lambda f: abs(f["contribution"]), reverse=True)
+
+        base_value = float(np.asarray(bias)[0])
+        return {
+            "method": method,
+            "model_output": base_value + sum(f["contribution"] for f in features),
+            "base_value": base_value,
+            "contributions": features,
+        }
+
+    def _explain_lime(self, bundle, data, num_samples):
+        stats = self._training_stats()
+        explainer = self._lime_explainer()
+
+        def predict_fn(samples):
+            return PredictPipeline._predict_many(bundle, stats.decode(samples), "explain")
+
+        explanation = explainer.explain_instance(
+            stats.encode(data),
+            predict_fn,
+            num_features=len(CustomData.FEATURE_ORDER),
+            num_samples=num_samples,
+        )
+
+        # as_list() gives the readable condition ("reading_score > 77.00")
+        # for each entry of local_exp, in the same order
+        weights = explanation.local_exp[explanation.dummy_label]
+        features = []
+        for (index, weight), (condition, _) in zip(weights, explanation.as_list()):
+            column = CustomData.FEATURE_ORDER[index]
+            features.append({
+                "feature": column,
+                "value": getattr(data, column),
+                "condition": condition,
+                "contribution": float(weight),
+            })
+
+        return {
+            "method": "lime",
+            "model_output": float(explanation.predicted_value),
+            "base_value": float(explanation.intercept[explanation.dummy_label]),
+            "local_prediction": float(np.asarray(explanation.local_pred).ravel()[0]),
+            "surrogate_r2": float(explanation.score),
+            "num_samples": num_samples,
+            "contributions": features,
+        }
+
+    @classmethod
+    def cache_stats(cls):
+        return cls._cache.stats()
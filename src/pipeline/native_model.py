@@ -0,0 +1,168 @@
+import os
+import sys
+
+import numpy as np
+
+from src.exception import CustomException
+from src.pipeline.tree_engine import FlatTreeEnsemble
+
+# Estimator class -> file name of its library's native model format. The
+# sklearn tree models have none of their own; they are flattened into
+# FlatTreeEnsemble arrays instead.
+NATIVE_FILES = {
+    "XGBRegressor": "model.ubj",
+    "CatBoostRegressor": "model.cbm",
+    "DecisionTreeRegressor": "model.trees.npz",
+    "RandomForestRegressor": "model.trees.npz",
+    "ExtraTreesRegressor": "model.trees.npz",
+    "GradientBoostingRegressor": "model.trees.npz",
+    "AdaBoostRegressor": "model.trees.npz",
+}
+
+# Largest batch (rows) the flattened arrays serve per sklearn model; above
+# it sklearn's own compiled traversal is faster (see benchmarks/tree_engine.py).
+# A single decision tree gains nothing, so it always predicts through sklearn.
+FLAT_MAX_ROWS = {
+    "DecisionTreeRegressor": 0,
+    "RandomForestRegressor": 256,
+    "ExtraTreesRegressor": 256,
+    "GradientBoostingRegressor": 64,
+    "AdaBoostRegressor": 4096,
+}
+
+
+def native_file_name(model):
+    """File name for `model`'s native format, or None if it only pickles."""
+    return NATIVE_FILES.get(type(model).__name__)
+
+
+def export_native_model(model, dir_name):
+    """
+    Save `model` in its library's own format (flattened arrays for the
+    sklearn tree models) into `dir_name` and return the path; returns None
+    for models without one (the linear models, KNN).
+    """
+    try:
+        file_name = native_file_name(model)
+        if file_name is None:
+            return None
+
+        os.makedirs(dir_name, exist_ok=True)
+        path = os.path.join(dir_name, file_name)
+        if file_name.endswith(".ubj"):
+            model.get_booster().save_model(path)
+        elif file_name.endswith(".npz"):
+            FlatTreeEnsemble.from_sklearn(model).save(path)
+        else:
+            model.save_model(path, format="cbm")
+        return path
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+class XGBoostNativeModel:
+    """
+    Raw XGBoost Booster loaded from UBJ/JSON. Predicts with inplace_predict
+    (no DMatrix, no sklearn wrapper checks) over the same tree range
+    XGBRegressor.predict uses, including a best_iteration from early stopping.
+    """
+
+    def __init__(self, booster, n_threads=1):
+        booster.set_param({"nthread": n_threads})
+        self.booster = booster
+        try:
+            self.iteration_range = (0, booster.best_iteration + 1)
+        except AttributeError:
+            self.iteration_range = (0, 0)
+
+    @classmethod
+    def load(cls, path, n_threads=1):
+        import xgboost
+
+        return cls(xgboost.Booster(model_file=path), n_threads)
+
+    def predict(self, X):
+        return self.booster.inplace_predict(X, iteration_range=self.iteration_range, validate_features=False)
+
+    def contributions(self, X):
+        """Exact TreeSHAP values: (bias, contributions) with bias + row sums == predict(X)."""
+        import xgboost
+
+        values = self.booster.predict(xgboost.DMatrix(X), pred_contribs=True, iteration_range=self.iteration_range)
+        return values[:, -1], values[:, :-1]
+
+
+class CatBoostNativeModel:
+    """
+    CatBoost model loaded from .cbm. A single row is passed as a flat
+    feature vector, which takes CatBoost's single-object path and skips
+    building a multi-row Pool.
+    """
+
+    def __init__(self, model, n_threads=1):
+        self.model = model
+        self.n_threads = n_threads
+
+    @classmethod
+    def load(cls, path, n_threads=1):
+        from catboost import CatBoostRegressor
+
+        return cls(CatBoostRegressor().load_model(path, format="cbm"), n_threads)
+
+    def predict(self, X):
+        if hasattr(X, "toarray"):  # scipy sparse
+            X = X.toarray()
+        if X.shape[0] == 1:
+            return np.atleast_1d(self.model.predict(X[0], thread_count=self.n_threads))
+        return self.model.predict(X, thread_count=self.n_threads)
+
+    def contributions(self, X):
+        """Exact SHAP values: (bias, contributions) with bias + row sums == predict(X)."""
+        from catboost import Pool
+
+        if hasattr(X, "toarray"):  # scipy sparse
+            X = X.toarray()
+        values = self.model.get_feature_importance(Pool(X), type="ShapValues", thread_count=self.n_threads)
+        return values[:, -1], values[:, :-1]
+
+
+class FlatTreeModel:
+    """
+    A sklearn tree model that predicts through its FlatTreeEnsemble for
+    batches of up to `max_rows` rows (single requests, micro-batches) and
+    through the estimator itself for larger ones.
+    """
+
+    def __init__(self, flat, model, max_rows=None):
+        self.flat = flat
+        self.model = model
+        self.max_rows = FLAT_MAX_ROWS.get(type(model).__name__, 0) if max_rows is None else max_rows
+
+    def predict(self, X):
+        if X.shape[0] <= self.max_rows:
+            return self.flat.predict(X)
+        return self.model.predict(X)
+
+    def contributions(self, X):
+        return self.flat.contributions(X)
+
+
+def load_native_model(path, n_threads=1, model=None):
+    """
+    Load a file written by export_native_model, choosing the backend by
+    extension. Flattened trees are wrapped in a FlatTreeModel when the
+    fitted sklearn `model` is given.
+    """
+    try:
+        if path.endswith((".ubj", ".json")):
+            return XGBoostNativeModel.load(path, n_threads)
+        if path.endswith(".cbm"):
+            return CatBoostNativeModel.load(path, n_threads)
+        if path.endswith(".npz"):
+            flat = FlatTreeEnsemble.load(path)
+            return flat if model is None else FlatTreeModel(flat, model)
+        raise ValueError(f"Unknown native model format: {path}")
+
+    except Exception as e:
+        raise CustomException(e, sys)
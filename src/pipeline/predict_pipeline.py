@@ -1,43 +1,592 @@
+import math
 import os
 import sys
-import pandas as pd
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+from src.artifact_store import STORE_DIR, ArtifactStore
 from src.exception import CustomException
-from src.utils import load_object
+from src.logger import logging
+from src.metrics import MODEL_INFO, MODEL_LOAD_SECONDS, MODEL_LOADED_AT, PHASE_SECONDS, REGISTRY
+from src.pipeline.batcher import MicroBatcher
+from src.pipeline.compiled_preprocessor import CompiledPreprocessor
+from src.pipeline.native_model import load_native_model
+from src.pipeline.prediction_table import PredictionTable
+from src.utils import file_sha256, load_object
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+def _env_float(name, default):
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _env_flag(name, default=False):
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass
+class PredictPipelineConfig:
+    model_path: str = os.path.join("artifacts", "model.pkl")
+    preprocessor_path: str = os.path.join("artifacts", "preprocessor.pkl")
+    # 0 disables the prediction cache; TTL <= 0 means entries never expire
+    cache_size: int = int(_env_float("PREDICT_CACHE_SIZE", 4096))
+    cache_ttl_seconds: float = _env_float("PREDICT_CACHE_TTL", 0)
+    # Versioned artifacts published by ModelTrainer; the flat paths above
+    # are used when the store has no current version
+    model_store_dir: str = os.getenv("MODEL_STORE_DIR", STORE_DIR)
+    # How often (seconds) the background watcher looks for a new version;
+    # <= 0 disables it
+    artifact_check_interval: float = _env_float("ARTIFACT_CHECK_INTERVAL", 5)
+    # Table mode: answer in-domain inputs from the precomputed prediction table
+    use_prediction_table: bool = _env_flag("PREDICT_TABLE_MODE")
+    # Serve XGBoost/CatBoost winners from their native model file, and sklearn
+    # tree models from their flattened arrays for batches up to
+    # native_model.FLAT_MAX_ROWS (published versions only), instead of the pickle
+    use_native_model: bool = _env_flag("PREDICT_NATIVE_MODEL", True)
+    native_threads: int = int(_env_float("PREDICT_NATIVE_THREADS", 1))
+    # Micro-batching: single-record cache misses from concurrent requests
+    # are coalesced for up to this many ms (0 disables) into one predict
+    # call of at most batch_max_size rows. Only useful with threaded workers.
+    batch_window_ms: float = _env_float("PREDICT_BATCH_WINDOW_MS", 0)
+    batch_max_size: int = int(_env_float("PREDICT_BATCH_MAX_SIZE", 64))
+    # Servers (gunicorn.conf.py, asgi.py) call warm_up() before taking traffic
+    warm_up: bool = _env_flag("MODEL_WARMUP", True)
+    prediction_table_path: str = os.path.join("artifacts", "prediction_table.npz")
+
+
+class PredictionCache:
+    """
+    Thread-safe bounded LRU cache of predictions with an optional TTL.
+    Keys are the normalized feature tuples from CustomData.cache_key().
+    """
+
+    def __init__(self, maxsize=4096, ttl_seconds=None):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds if ttl_seconds and ttl_seconds > 0 else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Return (hit, value); a miss returns (False, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+
+            value, expires_at = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """
+    One loaded model version. Bundles are never mutated: a reload builds a
+    new one and swaps the reference, so a request that already holds a
+    bundle finishes on that version.
+    """
+    version: str
+    source: tuple
+    model: object
+    preprocessor: object
+    compiled: Optional[CompiledPreprocessor]
+    table: Optional[PredictionTable]
+    metadata: dict
+    loaded_at: float
+
+
+# Scored before a new version goes live (first row of the training data)
+SMOKE_RECORD = {
+    "gender": "female",
+    "ethnicity": "group B",
+    "parental_level_of_education": "bachelor's degree",
+    "lunch": "standard",
+    "test_preparation_course": "none",
+    "reading_score": 72,
+    "writing_score": 74,
+}
+
 
 class PredictPipeline:
     """
-    Prediction pipeline that loads model + preprocessor once per process.
+    Prediction pipeline that serves one ModelBundle per process.
+
+    The live version is the artifact store's CURRENT version, or the flat
+    artifacts/model.pkl + preprocessor.pkl when nothing was published.
+    A background watcher checks for a new version every
+    `artifact_check_interval` seconds (<= 0 disables it; `reload()` can
+    still be called directly). New versions are loaded and smoke-tested
+    off the request path and swapped in atomically; a version that fails
+    to load or fails its smoke test is rejected and the old one keeps serving.
     """
-    _model = None
-    _preprocessor = None
+    config = PredictPipelineConfig()
+    store = ArtifactStore(config.model_store_dir)
+
+    _bundle = None
+    _rejected_source = None
+    _reload_lock = threading.Lock()
+    _watcher_pid = None
+    _watcher_stop = threading.Event()
+    _cache = PredictionCache(config.cache_size, config.cache_ttl_seconds)
+    _batcher = None
+
+    @staticmethod
+    def _artifact_signature(*paths):
+        signature = []
+        for path in paths:
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
 
     @classmethod
-    def _load_artifacts(cls):
-        if cls._model is not None and cls._preprocessor is not None:
-            return
+    def _source(cls):
+        """Identify what should be live: ("store", version) or ("files", stat signature)."""
+        version = cls.store.current_version()
+        if version is not None:
+            return ("store", version)
+
+        for path in (cls.config.model_path, cls.config.preprocessor_path):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Model artifact not found at: {path}")
+        return ("files", cls._artifact_signature(cls.config.model_path, cls.config.preprocessor_path))
 
-        model_path = os.path.join("artifacts", "model.pkl")
-        preprocessor_path = os.path.join("artifacts", "preprocessor.pkl")
+    @classmethod
+    def _load_bundle(cls, source):
+        if source[0] == "store":
+            version = source[1]
+            metadata = cls.store.read_manifest(version).get("metadata", {})
+            model_path = cls.store.path(version, "model.pkl")
+            preprocessor_path = cls.store.path(version, "preprocessor.pkl")
+            table_path = cls.store.path(version, "prediction_table.npz")
+        else:
+            model_path = cls.config.model_path
+            preprocessor_path = cls.config.preprocessor_path
+            table_path = cls.config.prediction_table_path
+            version = f"file-{file_sha256(model_path)[:12]}"
+            metadata = {}
+
+        native_file = metadata.get("native_model")
+        if native_file and cls.config.use_native_model:
+            # Flattened sklearn trees hand large batches back to the estimator
+            estimator = load_object(model_path) if native_file.endswith(".npz") else None
+            model = load_native_model(cls.store.path(version, native_file), cls.config.native_threads, estimator)
+        else:
+            model = load_object(model_path)
+        preprocessor = load_object(preprocessor_path)
+        compiled = cls._compile_preprocessor(preprocessor)
+        table = cls._load_table(table_path, model_path, preprocessor_path) if cls.config.use_prediction_table else None
+
+        compiled, table = cls._smoke_test(model, preprocessor, compiled, table, metadata.get("smoke_prediction"))
+
+        return ModelBundle(version, source, model, preprocessor, compiled, table, metadata, time.time())
+
+    @staticmethod
+    def _smoke_test(model, preprocessor, compiled, table, expected=None):
+        """
+        Score SMOKE_RECORD through every path of a candidate version. A
+        non-finite result, or one that differs from the prediction recorded
+        at training time, rejects the version; a fast path that disagrees
+        with the sklearn path is dropped. Returns the (compiled, table) to use.
+
+        When the compiled path reproduces the recorded prediction exactly,
+        the sklearn path is skipped: it needs a DataFrame, and pandas is
+        otherwise never imported by a serving process.
+        """
+        data = CustomData.from_record(SMOKE_RECORD)
+        reference = None
+        if compiled is not None and expected is not None:
+            value = float(model.predict(compiled.transform_record(vars(data)))[0])
+            if math.isclose(value, expected, rel_tol=1e-9, abs_tol=1e-9):
+                reference = value
+
+        if reference is None:
+            reference = float(model.predict(preprocessor.transform(data.get_data_as_data_frame()))[0])
+
+            if not math.isfinite(reference):
+                raise ValueError(f"Smoke prediction is not finite: {reference}")
+            if expected is not None and not math.isclose(reference, expected, rel_tol=1e-6, abs_tol=1e-6):
+                raise ValueError(f"Smoke prediction {reference} does not match {expected} recorded at training time")
+
+            if compiled is not None:
+                value = float(model.predict(compiled.transform_record(vars(data)))[0])
+                if not math.isclose(value, reference, rel_tol=1e-9, abs_tol=1e-9):
+                    logging.warning(f"Compiled preprocessor disagrees with sklearn ({value} vs {reference}); disabled")
+                    compiled = None
 
-        if not os.path.exists(model_path):
-            raise FileNotFoundError(f"Model not found at: {model_path}")
-        if not os.path.exists(preprocessor_path):
-            raise FileNotFoundError(f"Preprocessor not found at: {preprocessor_path}")
+        if table is not None:
+            value = table.lookup(vars(data))
+            if value is None or not math.isclose(value, reference, abs_tol=1e-3):
+                logging.warning(f"Prediction table disagrees with the model ({value} vs {reference}); disabled")
+                table = None
 
-        cls._model = load_object(model_path)
-        cls._preprocessor = load_object(preprocessor_path)
+        return compiled, table
+
+    @classmethod
+    def reload(cls, force=False):
+        """
+        Load the current version if it differs from the live one and swap it
+        in. Returns True when a new bundle went live. A failing candidate is
+        logged and remembered so it is not retried until it changes.
+        """
+        with cls._reload_lock:
+            current = cls._bundle
+            source = cls._source()
+            if not force and (
+                (current is not None and source == current.source) or source == cls._rejected_source
+            ):
+                return False
+
+            start = time.perf_counter()
+            try:
+                bundle = cls._load_bundle(source)
+            except Exception as e:
+                MODEL_LOAD_SECONDS.observe(time.perf_counter() - start, "rejected")
+                cls._rejected_source = source
+                if current is None:
+                    raise CustomException(e, sys)
+                logging.error(f"Rejected model candidate {source}, still serving {current.version}: {e}")
+                return False
+
+            MODEL_LOAD_SECONDS.observe(time.perf_counter() - start, "loaded")
+            cls._bundle = bundle
+            cls._rejected_source = None
+            cls._cache.clear()
+
+            MODEL_INFO.clear()
+            MODEL_INFO.set(1, bundle.version, type(bundle.model).__name__)
+            MODEL_LOADED_AT.set(bundle.loaded_at)
+
+            if current is None:
+                logging.info(f"Loaded model version {bundle.version}")
+            else:
+                logging.info(f"Swapped model version {current.version} -> {bundle.version}")
+            return True
+
+    @classmethod
+    def preload(cls):
+        """
+        Load the live version in a parent process that will fork workers
+        (see gunicorn.conf.py). Unlike a request, this does not start the
+        watcher thread; each worker starts its own on first use.
+        """
+        cls.reload()
+        return cls._bundle
 
-    def predict(self, features: pd.DataFrame):
+    @classmethod
+    def warm_up(cls):
+        """
+        Load the live version and score SMOKE_RECORD through the single-row
+        and multi-row paths (bypassing the cache), so lazy imports and
+        first-call setup in the model libraries happen before traffic.
+        Returns the seconds taken.
+        """
+        start = time.perf_counter()
+        bundle = cls.preload()
+        data = CustomData.from_record(SMOKE_RECORD)
+        cls._predict_many(bundle, [data], "warmup")
+        cls._predict_many(bundle, [data, data], "warmup")
+        return time.perf_counter() - start
+
+    @classmethod
+    def _current_bundle(cls):
+        bundle = cls._bundle
+        if bundle is None:
+            cls.reload()
+            bundle = cls._bundle
+        if cls.config.artifact_check_interval > 0 and cls._watcher_pid != os.getpid():
+            cls.start_watcher()
+        return bundle
+
+    @classmethod
+    def start_watcher(cls):
+        """Start the reload thread for this process (no-op if disabled or running)."""
+        interval = cls.config.artifact_check_interval
+        with cls._reload_lock:
+            if interval <= 0 or cls._watcher_pid == os.getpid():
+                return
+            # A forked worker inherits the flag but not the parent's thread
+            cls._watcher_pid = os.getpid()
+            cls._watcher_stop.clear()
+
+        threading.Thread(target=cls._watch, args=(interval,), name="model-watcher", daemon=True).start()
+
+    @classmethod
+    def stop_watcher(cls):
+        cls._watcher_stop.set()
+        cls._watcher_pid = None
+
+    @classmethod
+    def _watch(cls, interval):
+        while not cls._watcher_stop.wait(interval):
+            try:
+                cls.reload()
+            except Exception as e:
+                logging.error(f"Model watcher failed to check for a new version: {e}")
+
+    @classmethod
+    def model_info(cls):
+        bundle = cls._current_bundle()
+        return {
+            "version": bundle.version,
+            "loaded_at": bundle.loaded_at,
+            "backend": type(bundle.model).__name__,
+            "compiled_preprocessor": bundle.compiled is not None,
+            "prediction_table": bundle.table is not None,
+            "metadata": bundle.metadata,
+        }
+
+    @staticmethod
+    def _load_table(table_path, model_path, preprocessor_path):
+        if not os.path.exists(table_path):
+            logging.warning(f"Table mode enabled but no prediction table at: {table_path}")
+            return None
+
+        table = PredictionTable.load(table_path)
+        if table.model_sha256 != file_sha256(model_path):
+            logging.warning("Prediction table was built for a different model; ignoring it")
+            return None
+        if table.preprocessor_sha256 != file_sha256(preprocessor_path):
+            logging.warning("Prediction table was built with a different preprocessor; ignoring it")
+            return None
+        return table
+
+    @classmethod
+    def cache_stats(cls):
+        return cls._cache.stats()
+
+    @classmethod
+    def batching_stats(cls):
+        if cls._batcher is None:
+            return {"enabled": cls.config.batch_window_ms > 0}
+        return dict(enabled=True, **cls._batcher.stats())
+
+    @classmethod
+    def collect_metrics(cls):
+        """Cache and micro-batching counters for the /metrics endpoint."""
+        cache = cls._cache.stats()
+        snapshot = {
+            f"prediction_cache_{key}_total": _sample("counter", f"Prediction cache {key}.", cache[key])
+            for key in ("hits", "misses", "evictions", "expirations")
+        }
+        snapshot["prediction_cache_entries"] = _sample("gauge", "Entries in the prediction cache.", cache["size"])
+
+        if cls._batcher is not None:
+            batching = cls._batcher.stats()
+            snapshot["prediction_batches_total"] = _sample(
+                "counter", "Micro-batches run by the coalescer.", batching["batches"])
+            snapshot["prediction_batched_items_total"] = _sample(
+                "counter", "Records scored through the coalescer.", batching["items"])
+        return snapshot
+
+    @classmethod
+    def _get_batcher(cls):
+        if cls._batcher is None:
+            with cls._reload_lock:
+                if cls._batcher is None:
+                    cls._batcher = MicroBatcher(
+                        cls._predict_coalesced,
+                        max_batch_size=cls.config.batch_max_size,
+                        max_wait_ms=cls.config.batch_window_ms,
+                    )
+        return cls._batcher
+
+    @classmethod
+    def _predict_coalesced(cls, items):
+        """Score (bundle, CustomData) pairs, one predict call per bundle in the batch."""
+        results = [None] * len(items)
+        groups = {}
+        for i, (bundle, data) in enumerate(items):
+            groups.setdefault(id(bundle), (bundle, []))[1].append(i)
+
+        for bundle, indices in groups.values():
+            preds = cls._predict_many(bundle, [items[i][1] for i in indices], "coalesced")
+            for i, pred in zip(indices, preds):
+                results[i] = float(pred)
+        return results
+
+    @staticmethod
+    def _compile_preprocessor(preprocessor):
+        try:
+            return CompiledPreprocessor.from_column_transformer(preprocessor)
+        except Exception as e:
+            logging.warning(f"Compiled preprocessor unavailable, using sklearn path: {e}")
+            return None
+
+    def predict(self, features: "pd.DataFrame"):
         try:
-            self._load_artifacts()
+            bundle = self._current_bundle()
 
-            data_scaled = self._preprocessor.transform(features)
-            preds = self._model.predict(data_scaled)
+            data_scaled = bundle.preprocessor.transform(features)
+            preds = bundle.model.predict(data_scaled)
             return preds
 
         except Exception as e:
             raise CustomException(e, sys)
 
+    def predict_record(self, data: "CustomData") -> float:
+        """
+        Score a single validated CustomData. Uses the compiled preprocessor
+        (no DataFrame) when available and falls back to the sklearn path.
+        """
+        try:
+            bundle = self._current_bundle()
+
+            start = time.perf_counter()
+            if bundle.table is not None:
+                value = bundle.table.lookup(vars(data))
+                if value is not None:
+                    PHASE_SECONDS.observe(time.perf_counter() - start, "record", "lookup")
+                    return value
+
+            # Keyed by version so a put racing a swap can never serve stale values
+            key = (bundle.version,) + data.cache_key()
+            hit, value = self._cache.get(key)
+            PHASE_SECONDS.observe(time.perf_counter() - start, "record", "lookup")
+            if hit:
+                return value
+
+            if self.config.batch_window_ms > 0:
+                value = self._get_batcher().predict((bundle, data))
+            else:
+                value = float(self._predict_many(bundle, [data], "record")[0])
+
+            self._cache.put(key, value)
+            return value
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def predict_batch(self, records):
+        """
+        Validate and score many raw records with a single preprocessor/model pass.
+
+        Returns (predictions, errors): `predictions` is aligned with `records`
+        (None for rows that failed validation) and `errors` maps the row index
+        to its validation message.
+        """
+        valid_indices = []
+        valid_data = []
+        errors = {}
+
+        start = time.perf_counter()
+        for i, record in enumerate(records):
+            try:
+                valid_data.append(CustomData.from_record(record))
+                valid_indices.append(i)
+            except ValueError as e:
+                errors[i] = str(e)
+        PHASE_SECONDS.observe(time.perf_counter() - start, "batch", "validation")
+
+        predictions = [None] * len(records)
+        pending_indices = []
+        pending_data = []
+        bundle = self._current_bundle()
+
+        start = time.perf_counter()
+        for i, data in zip(valid_indices, valid_data):
+            value = bundle.table.lookup(vars(data)) if bundle.table is not None else None
+            if value is not None:
+                predictions[i] = value
+                continue
+
+            hit, value = self._cache.get((bundle.version,) + data.cache_key())
+            if hit:
+                predictions[i] = value
+            else:
+                pending_indices.append(i)
+                pending_data.append(data)
+        PHASE_SECONDS.observe(time.perf_counter() - start, "batch", "lookup")
+
+        if pending_data:
+            preds = self._predict_many(bundle, pending_data, "batch")
+            for i, data, pred in zip(pending_indices, pending_data, preds):
+                predictions[i] = float(pred)
+                self._cache.put((bundle.version,) + data.cache_key(), predictions[i])
+
+        return predictions, errors
+
+    @staticmethod
+    def _predict_many(bundle, items, operation):
+        """Preprocess and score CustomData items; `operation` labels the phase metrics."""
+        try:
+            start = time.perf_counter()
+            if bundle.compiled is None:
+                frame = CustomData.to_data_frame(items)
+                built = time.perf_counter()
+                PHASE_SECONDS.observe(built - start, operation, "dataframe_build")
+                features = bundle.preprocessor.transform(frame)
+                start = built
+            elif len(items) == 1:
+                features = bundle.compiled.transform_record(vars(items[0]))
+            else:
+                features = bundle.compiled.transform_records([vars(item) for item in items])
+
+            preprocessed = time.perf_counter()
+            PHASE_SECONDS.observe(preprocessed - start, operation, "preprocess")
+            preds = bundle.model.predict(features)
+            PHASE_SECONDS.observe(time.perf_counter() - preprocessed, operation, "model_predict")
+            return preds
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+def _sample(kind, documentation, value):
+    return {"type": kind, "help": documentation, "labelnames": [], "samples": [[[], value]]}
+
+
+REGISTRY.add_collector(PredictPipeline.collect_metrics)
+
 
 class CustomData:
     """
@@ -54,6 +603,18 @@ class CustomData:
         "writing_score",
     ]
 
+    # Input field name -> attribute name. The form posts `ethnicity`;
+    # JSON clients may send either spelling.
+    INPUT_FIELDS = {
+        "gender": "gender",
+        "ethnicity": "race_ethnicity",
+        "parental_level_of_education": "parental_level_of_education",
+        "lunch": "lunch",
+        "test_preparation_course": "test_preparation_course",
+        "reading_score": "reading_score",
+        "writing_score": "writing_score",
+    }
+
     def __init__(
         self,
         gender: str,
@@ -72,7 +633,83 @@ class CustomData:
         self.reading_score = reading_score
         self.writing_score = writing_score
 
+    @classmethod
+    def from_record(cls, record):
+        """
+        Validate a raw mapping (form data or a JSON object) and build a CustomData.
+        Raises ValueError with a user-facing message when the record is invalid.
+        """
+        if not hasattr(record, "get"):
+            raise ValueError("Each record must be an object of field names to values.")
+
+        values = {}
+        missing = []
+        for field, attr in cls.INPUT_FIELDS.items():
+            value = record.get(field)
+            if value is None and attr != field:
+                value = record.get(attr)
+            if value is None or value == "":
+                missing.append(field)
+            values[attr] = value
+
+        if missing:
+            raise ValueError(f"Missing required fields: {', '.join(missing)}")
+
+        for field, attr in cls.INPUT_FIELDS.items():
+            if attr not in ("reading_score", "writing_score") and not isinstance(values[attr], str):
+                raise ValueError(f"{field} must be a string.")
+
+        for attr, label in (("reading_score", "Reading score"), ("writing_score", "Writing score")):
+            try:
+                values[attr] = float(values[attr])
+            except (TypeError, ValueError):
+                raise ValueError(f"{label} must be a number.")
+
+            if not (0 <= values[attr] <= 100):
+                raise ValueError(f"{label} must be between 0 and 100.")
+
+        return cls(**values)
+
+    def cache_key(self):
+        """Normalized feature tuple (FEATURE_ORDER) used as the prediction cache key."""
+        return (
+            self.gender,
+            self.race_ethnicity,
+            self.parental_level_of_education,
+            self.lunch,
+            self.test_preparation_course,
+            self._score_key(self.reading_score),
+            self._score_key(self.writing_score),
+        )
+
+    @staticmethod
+    def _score_key(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return repr(value)
+
+    @classmethod
+    def to_data_frame(cls, items):
+        """Build one DataFrame (in FEATURE_ORDER) from many CustomData objects."""
+        import pandas as pd
+
+        try:
+            data = {
+                col: [getattr(item, col) for item in items]
+                for col in cls.FEATURE_ORDER
+            }
+            data["reading_score"] = pd.to_numeric(data["reading_score"], errors="coerce")
+            data["writing_score"] = pd.to_numeric(data["writing_score"], errors="coerce")
+
+            return pd.DataFrame(data, columns=cls.FEATURE_ORDER)
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
     def get_data_as_data_frame(self):
+        import pandas as pd
+
         try:
             data = {
                 "gender": [self.gender],
@@ -0,0 +1,170 @@
+import itertools
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from src.exception import CustomException
+from src.logger import logging
+
+
+class PredictionTable:
+    """
+    Precomputed predictions for every in-domain input: each combination of
+    the categories the one-hot encoder was fitted on, crossed with integer
+    reading/writing scores in [score_min, score_max].
+
+    The sha256 of the model and preprocessor files it was built from are
+    stored with it, so a table is only used with exactly those artifacts.
+
+    Lookups are O(1) array indexing; `lookup` returns None for anything
+    outside the table (unseen categories, non-integer or missing scores) so
+    the caller can fall back to the live model.
+    """
+
+    SCORE_COLUMNS = ("reading_score", "writing_score")
+
+    def __init__(self, categorical_columns, categories, values, score_min=0, score_max=100, model_sha256="",
+                 preprocessor_sha256=""):
+        self.categorical_columns = list(categorical_columns)
+        self.categories = [list(c) for c in categories]
+        self.values = values
+        self.score_min = int(score_min)
+        self.score_max = int(score_max)
+        self.model_sha256 = model_sha256
+        self.preprocessor_sha256 = preprocessor_sha256
+
+        self._index_maps = [{value: i for i, value in enumerate(c)} for c in self.categories]
+        self._flat = values.reshape(-1)
+
+        # Row-major strides so a lookup is a single flat index computation
+        self._strides = []
+        stride = 1
+        for size in reversed(values.shape):
+            self._strides.insert(0, stride)
+            stride *= size
+
+    @staticmethod
+    def _categorical_domain(preprocessor):
+        for _, transformer, columns in preprocessor.transformers_:
+            steps = [step for _, step in getattr(transformer, "steps", [("", transformer)])]
+            for step in steps:
+                if type(step).__name__ == "OneHotEncoder":
+                    return list(columns), [list(c) for c in step.categories_]
+        raise ValueError("Preprocessor has no fitted OneHotEncoder.")
+
+    @classmethod
+    def build(cls, preprocessor, model, score_min=0, score_max=100, batch_rows=100_000,
+              dtype=np.float32, model_sha256="", preprocessor_sha256=""):
+        """Evaluate the model on the whole discrete input domain with batched predict calls."""
+        try:
+            import pandas as pd
+
+            columns, categories = cls._categorical_domain(preprocessor)
+            scores = np.arange(score_min, score_max + 1, dtype=np.float64)
+            reading, writing = np.meshgrid(scores, scores, indexing="ij")
+            reading, writing = reading.ravel(), writing.ravel()
+            n_grid = reading.size
+
+            combos = list(itertools.product(*categories))
+            combos_per_batch = max(1, batch_rows // n_grid)
+            values = np.empty(len(combos) * n_grid, dtype=dtype)
+
+            for start in range(0, len(combos), combos_per_batch):
+                chunk = combos[start:start + combos_per_batch]
+                frame = {
+                    col: np.repeat([combo[j] for combo in chunk], n_grid)
+                    for j, col in enumerate(columns)
+                }
+                frame["reading_score"] = np.tile(reading, len(chunk))
+                frame["writing_score"] = np.tile(writing, len(chunk))
+
+                preds = model.predict(preprocessor.transform(pd.DataFrame(frame)))
+                values[start * n_grid:(start + len(chunk)) * n_grid] = preds
+
+            shape = tuple(len(c) for c in categories) + (len(scores), len(scores))
+            logging.info(f"Built prediction table with shape {shape} ({values.nbytes / 1e6:.1f} MB)")
+
+            return cls(
+                columns, categories, values.reshape(shape), score_min, score_max, model_sha256, preprocessor_sha256,
+            )
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def save(self, file_path):
+        try:
+            dir_name = os.path.dirname(file_path) or "."
+            os.makedirs(dir_name, exist_ok=True)
+
+            arrays = {
+                "values": self.values,
+                "categorical_columns": np.array(self.categorical_columns),
+                "score_range": np.array([self.score_min, self.score_max]),
+                "model_sha256": np.array(self.model_sha256),
+                "preprocessor_sha256": np.array(self.preprocessor_sha256),
+            }
+            for i, cats in enumerate(self.categories):
+                arrays[f"categories_{i}"] = np.array(cats)
+
+            with tempfile.NamedTemporaryFile(delete=False, dir=dir_name, suffix=".tmp") as tmp:
+                np.savez(tmp, **arrays)
+                temp_path = tmp.name
+
+            os.replace(temp_path, file_path)
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    @classmethod
+    def load(cls, file_path):
+        try:
+            with np.load(file_path, allow_pickle=False) as data:
+                columns = data["categorical_columns"].tolist()
+                categories = [data[f"categories_{i}"].tolist() for i in range(len(columns))]
+                score_min, score_max = data["score_range"].tolist()
+                return cls(
+                    columns,
+                    categories,
+                    data["values"],
+                    score_min,
+                    score_max,
+                    str(data["model_sha256"]),
+                    # Tables saved before the preprocessor was recorded never match
+                    str(data["preprocessor_sha256"]) if "preprocessor_sha256" in data else "",
+                )
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _score_index(self, value):
+        if isinstance(value, str):
+            try:
+                value = float(value)
+            except ValueError:
+                return None
+        if not isinstance(value, (int, float, np.integer, np.floating)):
+            return None
+        if value != value or value != int(value):
+            return None
+        if not (self.score_min <= value <= self.score_max):
+            return None
+        return int(value) - self.score_min
+
+    def lookup(self, record):
+        """Return the precomputed prediction for a mapping of column -> value, or None."""
+        flat = 0
+        for j, column in enumerate(self.categorical_columns):
+            index = self._index_maps[j].get(record.get(column))
+            if index is None:
+                return None
+            flat += index * self._strides[j]
+
+        offset = len(self.categorical_columns)
+        for k, column in enumerate(self.SCORE_COLUMNS):
+            index = self._score_index(record.get(column))
+            if index is None:
+                return None
+            flat += index * self._strides[offset + k]
+
+        return float(self._flat[flat])
@@ -0,0 +1,324 @@
+import sys
+
+import numpy as np
+
+from src.exception import CustomException
+
+FORMAT_VERSION = 1
+# Levels between drops of (row, tree) pairs that already reached a leaf
+COMPACT_EVERY = 4
+
+# How each supported estimator combines its trees' leaf values
+COMBINE = {
+    "DecisionTreeRegressor": "sum",
+    "RandomForestRegressor": "mean",
+    "ExtraTreesRegressor": "mean",
+    "GradientBoostingRegressor": "sum",
+    "AdaBoostRegressor": "weighted_median",
+}
+
+
+def _index_dtype(max_value):
+    """Smallest unsigned integer dtype that holds 0..max_value."""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _float32_floor(thresholds):
+    """
+    Largest float32 <= each float64 threshold. sklearn compares float32
+    features against float64 thresholds, and for any float32 x,
+    x <= t  <=>  x <= floor32(t), so the float32 copy decides every split
+    exactly like the original.
+    """
+    rounded = thresholds.astype(np.float32)
+    above = rounded.astype(np.float64) > thresholds
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+    return rounded
+
+
+def _breadth_first(tree):
+    """
+    Renumber one tree's nodes breadth-first so that every internal node's
+    children are adjacent (right == left + 1). Returns (order, first_child):
+    order[i] is the original id of new node i, first_child[i] the new id of
+    its left child (itself for a leaf).
+    """
+    children_left, children_right = tree.children_left, tree.children_right
+    order = [0]
+    first_child = []
+    for node in order:  # grows while we iterate
+        if children_left[node] == -1:
+            first_child.append(len(first_child))
+        else:
+            first_child.append(len(order))
+            order.extend((children_left[node], children_right[node]))
+    return np.array(order), np.array(first_child)
+
+
+class FlatTreeEnsemble:
+    """
+    Every tree of a fitted sklearn tree model packed into flat arrays and
+    evaluated for a whole batch at once, one tree level per step.
+
+    Nodes are numbered breadth-first per tree and concatenated (tree t
+    starts at `roots[t]`), so a node's children are `child` and
+    `child + 1`: one level is `node = child[node] + (x[feature] > threshold)`.
+    A leaf is its own child with an infinite threshold, so rows that reach
+    a leaf early stay put while deeper trees finish. The prediction is
+    `offset + scale * combine(leaf values)`, combine being the sum (single
+    tree, gradient boosting), the mean (forests) or AdaBoost's weighted
+    median.
+
+    Thresholds are stored as float32 rounded down and compared against
+    float32 features, which reproduces sklearn's splits exactly; leaf
+    values stay float64. Inputs must not contain NaN (the preprocessor
+    imputes them).
+    """
+
+    def __init__(self, feature, threshold, child, value, roots, max_depth, n_features,
+                 combine="sum", scale=1.0, offset=0.0, weights=None, source=""):
+        self.feature = feature
+        self.threshold = threshold
+        self.child = child
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+        self.combine = combine
+        self.scale = float(scale)
+        self.offset = float(offset)
+        self.weights = weights
+        self.source = source
+        # Compact dtypes are for storage; numpy indexes fastest with intp
+        self._feature = feature.astype(np.intp)
+        self._child = child.astype(np.intp)
+        self._roots = roots.astype(np.intp)
+
+    # ------------------------------------------------------------------
+    # Conversion
+    # ------------------------------------------------------------------
+    @staticmethod
+    def supports(model):
+        return type(model).__name__ in COMBINE
+
+    @classmethod
+    def from_sklearn(cls, model):
+        try:
+            name = type(model).__name__
+            if name not in COMBINE:
+                raise ValueError(f"Unsupported model type: {name}")
+
+            scale, offset, weights = 1.0, 0.0, None
+            if name == "DecisionTreeRegressor":
+                trees = [model.tree_]
+            elif name == "GradientBoostingRegressor":
+                trees = [est.tree_ for est in model.estimators_[:, 0]]
+                scale = model.learning_rate
+                if model.init_ != "zero":
+                    init = np.asarray(model.init_.predict(np.zeros((2, model.n_features_in_)))).reshape(-1)
+                    if init[0] != init[1]:
+                        raise ValueError("Only a constant init estimator can be flattened")
+                    offset = float(init[0])
+            elif name == "AdaBoostRegressor":
+                trees = [est.tree_ for est in model.estimators_]
+                weights = np.asarray(model.estimator_weights_[: len(trees)], dtype=np.float64)
+            else:
+                trees = [est.tree_ for est in model.estimators_]
+
+            if any(tree.n_outputs != 1 for tree in trees):
+                raise ValueError("Only single-output trees are supported")
+
+            sizes = np.array([tree.node_count for tree in trees])
+            roots = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+            total = int(sizes.sum())
+
+            feature = np.zeros(total, dtype=_index_dtype(model.n_features_in_ - 1))
+            threshold = np.zeros(total, dtype=np.float32)
+            child = np.zeros(total, dtype=_index_dtype(total - 1))
+            value = np.zeros(total, dtype=np.float64)
+
+            for tree, root in zip(trees, roots):
+                order, first_child = _breadth_first(tree)
+                span = slice(root, root + tree.node_count)
+                is_leaf = tree.children_left[order] == -1
+
+                feature[span] = np.where(is_leaf, 0, tree.feature[order])
+                threshold[span] = np.where(is_leaf, np.inf, _float32_floor(tree.threshold[order]))
+                child[span] = root + first_child
+                value[span] = tree.value[order, 0, 0]
+
+            return cls(
+                feature, threshold, child, value,
+                roots=roots.astype(child.dtype),
+                max_depth=max(tree.max_depth for tree in trees),
+                n_features=model.n_features_in_,
+                combine=COMBINE[name],
+                scale=scale,
+                offset=offset,
+                weights=weights,
+                source=name,
+            )
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def save(self, path):
+        try:
+            arrays = dict(
+                feature=self.feature,
+                threshold=self.threshold,
+                child=self.child,
+                value=self.value,
+                roots=self.roots,
+                meta=np.array([FORMAT_VERSION, self.max_depth, self.n_features, self.scale, self.offset]),
+                combine=np.array(self.combine),
+                source=np.array(self.source),
+            )
+            if self.weights is not None:
+                arrays["weights"] = self.weights
+            with open(path, "wb") as f:
+                np.savez_compressed(f, **arrays)
+            return path
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                version, max_depth, n_features, scale, offset = data["meta"]
+                if int(version) != FORMAT_VERSION:
+                    raise ValueError(f"Unsupported tree ensemble format {int(version)} in {path}")
+                return cls(
+                    data["feature"], data["threshold"], data["child"], data["value"],
+                    roots=data["roots"],
+                    max_depth=max_depth,
+                    n_features=n_features,
+                    combine=str(data["combine"]),
+                    scale=scale,
+                    offset=offset,
+                    weights=data["weights"] if "weights" in data else None,
+                    source=str(data["source"]),
+                )
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    # ------------------------------------------------------------------
+    # Inference
+    # ------------------------------------------------------------------
+    def _as_float32(self, X):
+        if hasattr(X, "toarray"):  # scipy sparse
+            X = X.toarray()
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+        return X
+
+    def leaf_values(self, X):
+        """(n_rows, n_trees) leaf value each tree assigns to each row."""
+        X = self._as_float32(X)
+        n_rows, n_trees = X.shape[0], self.roots.size
+        feature, threshold, child = self._feature, self.threshold, self._child
+
+        # One entry per (row, tree) pair, row-major; `offsets` locates the
+        # row in the flattened X. Every COMPACT_EVERY levels, entries that
+        # reached a leaf are dropped once they are a quarter of the total
+        # (forests are deep but most paths end early).
+        flat = X.reshape(-1)
+        nodes = np.tile(self._roots, n_rows)
+        offsets = np.repeat(np.arange(n_rows, dtype=np.intp) * self.n_features, n_trees)
+        positions = None
+        leaves = nodes
+
+        for level in range(1, self.max_depth + 1):
+            nodes = child[nodes] + (flat[offsets + feature[nodes]] > threshold[nodes])
+            if level % COMPACT_EVERY or level == self.max_depth:
+                continue
+            done = threshold[nodes] == np.inf
+            n_done = np.count_nonzero(done)
+            if n_done * 4 < done.size:
+                continue
+            if positions is None:
+                positions = np.arange(nodes.size)
+                leaves = np.empty(nodes.size, dtype=np.intp)
+            leaves[positions[done]] = nodes[done]
+            active = ~done
+            nodes, offsets, positions = nodes[active], offsets[active], positions[active]
+            if not nodes.size:
+                break
+
+        if positions is None:
+            leaves = nodes
+        else:
+            leaves[positions] = nodes
+        return self.value[leaves].reshape(n_rows, n_trees)
+
+    def predict(self, X):
+        values = self.leaf_values(X)
+
+        if self.combine == "mean":
+            return values.mean(axis=1)
+        if self.combine == "weighted_median":
+            rows = np.arange(values.shape[0])
+            return values[rows, self._median_tree(values)]
+        return self.offset + self.scale * values.sum(axis=1)
+
+    def _median_tree(self, values):
+        """
+        Per row, the tree whose value AdaBoostRegressor predicts: the
+        weighted median of the trees' values.
+        """
+        order = np.argsort(values, axis=1)
+        cdf = np.cumsum(self.weights[order], axis=1)
+        median_idx = (cdf >= 0.5 * cdf[:, -1:]).argmax(axis=1)
+        return order[np.arange(values.shape[0]), median_idx]
+
+    def contributions(self, X):
+        """
+        Exact per-feature decomposition of the prediction along each row's
+        decision paths: every split adds the change in node value it causes
+        to the feature it splits on. Returns (bias, contributions) with
+        shapes (n_rows,) and (n_rows, n_features), and
+        bias + contributions.sum(axis=1) == predict(X).
+        """
+        X = self._as_float32(X)
+        n_rows, n_trees = X.shape[0], self.roots.size
+
+        # How much each (row, tree) pair counts towards the prediction
+        if self.combine == "mean":
+            weights = np.full((n_rows, n_trees), 1.0 / n_trees)
+        elif self.combine == "weighted_median":
+            weights = np.zeros((n_rows, n_trees))
+            weights[np.arange(n_rows), self._median_tree(self.leaf_values(X))] = 1.0
+        else:
+            weights = np.full((n_rows, n_trees), self.scale)
+
+        bias = weights @ self.value[self._roots]
+        if self.combine == "sum":
+            bias += self.offset
+
+        flat = X.reshape(-1)
+        rows = np.repeat(np.arange(n_rows, dtype=np.intp), n_trees)
+        offsets = rows * self.n_features
+        weights = weights.reshape(-1)
+        nodes = np.tile(self._roots, n_rows)
+        contributions = np.zeros((n_rows, self.n_features))
+
+        for _ in range(self.max_depth):
+            feature = self._feature[nodes]
+            next_nodes = self._child[nodes] + (flat[offsets + feature] > self.threshold[nodes])
+            # Leaves are their own child, so they add nothing
+            np.add.at(contributions, (rows, feature), (self.value[next_nodes] - self.value[nodes]) * weights)
+            nodes = next_nodes
+
+        return bias, contributions
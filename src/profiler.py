@@ -0,0 +1,255 @@
+import contextlib
+import cProfile
+import json
+import os
+import platform
+import pstats
+import resource
+import sys
+import threading
+import time
+
+from src.exception import CustomException
+from src.logger import logging
+
+REPORT_DIR = os.path.join("artifacts", "run_reports")
+# Set by profile_run in cProfile mode; spawned model-search workers read it
+PROFILE_DIR_ENV = "TRAINING_PROFILE_DIR"
+
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    """Peak RSS of this process so far (ru_maxrss is bytes on macOS, KB elsewhere)."""
+    # Linux carries ru_maxrss across exec, so a spawned worker would report
+    # its parent's peak; VmHWM starts over with the new address space
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    value = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return value / (1024 * 1024) if sys.platform == "darwin" else value / 1024
+
+
+def profiling_enabled():
+    return os.getenv("PROFILE_TRAINING", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+class RunProfiler:
+    """
+    Structured timing/memory record of one training run.
+
+    `span(name, **attrs)` times a block (wall and process CPU seconds) and
+    tracks the peak RSS seen while it was open; a sampler thread polls RSS
+    every `sample_interval` seconds so short allocation spikes inside long
+    spans are caught. `annotate(**attrs)` adds attributes to the innermost
+    open span. `record(kind, **data)` stores any other structured
+    event (e.g. per-model search results). `finish` writes everything as
+    one JSON report under `report_dir`, plus a .prof file when `cprofile`.
+    """
+
+    def __init__(self, name="training", report_dir=REPORT_DIR, sample_interval=0.05, cprofile=False):
+        self.name = name
+        self.run_id = f"{name}-{time.strftime('%Y%m%d-%H%M%S')}"
+        self.report_dir = report_dir
+        self.sample_interval = sample_interval
+        self.cprofile = cprofile
+
+        self.spans = []
+        self.events = []
+        self._open = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+        self._profile = None
+        self._started = None
+        self._started_cpu = None
+        self.started_at = None
+
+    @property
+    def profile_dir(self):
+        return os.path.join(self.report_dir, self.run_id)
+
+    def start(self):
+        self.started_at = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+        self._started = time.perf_counter()
+        self._started_cpu = time.process_time()
+        self._sampler = threading.Thread(target=self._sample, name="profiler-rss", daemon=True)
+        self._sampler.start()
+
+        if self.cprofile:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            os.environ[PROFILE_DIR_ENV] = os.path.abspath(self.profile_dir)
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(self.sample_interval):
+            rss = current_rss_mb()
+            with self._lock:
+                for span in self._open:
+                    if rss > span["peak_rss_mb"]:
+                        span["peak_rss_mb"] = rss
+
+    @contextlib.contextmanager
+    def span(self, name, **attrs):
+        rss = current_rss_mb()
+        with self._lock:
+            parent = self._open[-1]["path"] if self._open else None
+            record = {
+                "name": name,
+                "path": f"{parent}/{name}" if parent else name,
+                "start_seconds": time.perf_counter() - self._started,
+                "attrs": attrs,
+                "rss_start_mb": rss,
+                "peak_rss_mb": rss,
+            }
+            self._open.append(record)
+
+        start, start_cpu = time.perf_counter(), time.process_time()
+        record["status"] = "ok"
+        try:
+            yield attrs
+        except BaseException:
+            record["status"] = "error"
+            raise
+        finally:
+            rss = current_rss_mb()
+            with self._lock:
+                self._open.remove(record)
+                record["duration_seconds"] = time.perf_counter() - start
+                record["cpu_seconds"] = time.process_time() - start_cpu
+                record["rss_end_mb"] = rss
+                record["peak_rss_mb"] = max(record["peak_rss_mb"], rss)
+                self.spans.append(record)
+            logging.info(f"[profile] {record['path']}: {record['duration_seconds']:.2f}s, "
+                         f"peak RSS {record['peak_rss_mb']:.0f} MB")
+
+    def annotate(self, **attrs):
+        with self._lock:
+            if self._open:
+                self._open[-1]["attrs"].update(attrs)
+
+    def record(self, kind, **data):
+        with self._lock:
+            self.events.append(dict(kind=kind, **data))
+
+    def _write_profile(self):
+        self._profile.disable()
+        os.environ.pop(PROFILE_DIR_ENV, None)
+        path = os.path.join(self.profile_dir, "main.prof")
+        self._profile.dump_stats(path)
+
+        stats = pstats.Stats(path)
+        top = sorted(stats.stats.items(), key=lambda kv: kv[1][3], reverse=True)[:25]
+        return {
+            "files": sorted(os.path.join(self.profile_dir, f) for f in os.listdir(self.profile_dir)),
+            "top_cumulative": [
+                {
+                    "function": f"{func[0]}:{func[1]}({func[2]})",
+                    "calls": nc,
+                    "total_seconds": tt,
+                    "cumulative_seconds": ct,
+                }
+                for func, (cc, nc, tt, ct, callers) in top
+            ],
+        }
+
+    def finish(self, status="ok"):
+        """Stop sampling, write the JSON report and return its path."""
+        try:
+            self._stop.set()
+            profile = self._write_profile() if self._profile is not None else None
+
+            report = {
+                "run_id": self.run_id,
+                "name": self.name,
+                "status": status,
+                "started_at": self.started_at,
+                "duration_seconds": time.perf_counter() - self._started,
+                "cpu_seconds": time.process_time() - self._started_cpu,
+                "peak_rss_mb": peak_rss_mb(),
+                "environment": {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "cpu_count": os.cpu_count(),
+                },
+                "spans": sorted(self.spans, key=lambda s: s["start_seconds"]),
+                "events": self.events,
+                "profile": profile,
+            }
+
+            os.makedirs(self.report_dir, exist_ok=True)
+            path = os.path.join(self.report_dir, f"{self.run_id}.json")
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2, default=str)
+
+            logging.info(f"Run report written to: {path}")
+            return path
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+_active = None
+
+
+@contextlib.contextmanager
+def profile_run(name="training", report_dir=REPORT_DIR, cprofile=None):
+    """
+    Profile everything inside the block as one run. cProfile capture is
+    opt-in (cprofile=True or PROFILE_TRAINING=1); the .prof files can be
+    opened with snakeviz or turned into a flame graph with flameprof.
+    """
+    global _active
+    if cprofile is None:
+        cprofile = profiling_enabled()
+
+    profiler = RunProfiler(name, report_dir, cprofile=cprofile).start()
+    previous, _active = _active, profiler
+    status = "ok"
+    try:
+        yield profiler
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        _active = previous
+        profiler.finish(status)
+
+
+@contextlib.contextmanager
+def span(name, **attrs):
+    """
+    Time a block inside the active run; without one, just log its duration.
+    Also usable as a decorator (`@span("stage")`) to time a whole function.
+    """
+    if _active is not None:
+        with _active.span(name, **attrs) as span_attrs:
+            yield span_attrs
+        return
+
+    start = time.perf_counter()
+    yield attrs
+    logging.info(f"{name} took {time.perf_counter() - start:.2f}s")
+
+
+def annotate(**attrs):
+    """Attach attributes (e.g. cached=True) to the innermost open span."""
+    if _active is not None:
+        _active.annotate(**attrs)
+
+
+def record(kind, **data):
+    if _active is not None:
+        _active.record(kind, **data)
@@ -0,0 +1,205 @@
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from src.exception import CustomException
+from src.logger import logging
+
+# tmpfs: files here live in RAM, so a memory-mapped array is shared memory
+SHARED_MEMORY_DIR = "/dev/shm"
+
+
+def _base_dir(nbytes):
+    """SEARCH_DATA_DIR if set, else /dev/shm when it has room, else the temp dir."""
+    configured = os.getenv("SEARCH_DATA_DIR")
+    if configured:
+        os.makedirs(configured, exist_ok=True)
+        return configured
+    if os.path.isdir(SHARED_MEMORY_DIR) and os.access(SHARED_MEMORY_DIR, os.W_OK):
+        # Leave headroom: a full tmpfs fails writes for every process on the host
+        if shutil.disk_usage(SHARED_MEMORY_DIR).free > 2 * nbytes:
+            return SHARED_MEMORY_DIR
+    return tempfile.gettempdir()
+
+
+def _nbytes(value):
+    if hasattr(value, "nnz"):
+        return value.data.nbytes + value.indices.nbytes + value.indptr.nbytes
+    return np.asarray(value).nbytes
+
+
+class SearchContext:
+    """
+    The data every model search shares, prepared once per evaluate_models call.
+
+    Holds the train/test matrices, the CV fold indices and, for native early
+    stopping, the fit/validation split with its own folds. With shared=True
+    every array is written once to a directory under /dev/shm (or the temp
+    dir) and reopened memory-mapped; pickling the context then sends only
+    the directory, so search processes and joblib workers map the same
+    pages instead of each receiving a copy. Sparse matrices are stored as
+    their CSR parts.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.stats = {}
+        self._arrays = {}
+        # name -> None for a plain array, or the shape of a CSR matrix
+        self._layout = {}
+        self._n_folds = {}
+        self._owner = os.getpid()
+
+    @classmethod
+    def create(cls, X_train, y_train, X_test, y_test, cv=3, early_stopping=None, shared=True):
+        """
+        Compute the folds (and early-stopping split) once and store everything.
+        `cv` is anything GridSearchCV accepts; an int gives the same KFold
+        splits the searches would have made themselves.
+        """
+        try:
+            from sklearn.model_selection import check_cv, train_test_split
+
+            start = time.perf_counter()
+            data = dict(X_train=X_train, y_train=np.asarray(y_train), X_test=X_test, y_test=np.asarray(y_test))
+            nbytes = sum(_nbytes(v) for v in data.values())
+
+            directory = None
+            if shared:
+                directory = tempfile.mkdtemp(prefix="search-", dir=_base_dir(nbytes))
+            context = cls(directory)
+
+            try:
+                for name, value in data.items():
+                    context._put(name, value)
+                context._put_folds("train", check_cv(cv, data["y_train"], classifier=False), data["y_train"])
+
+                if early_stopping:
+                    # Same rows as train_test_split(X_train, y_train, ...) would pick
+                    fit_index, val_index = train_test_split(
+                        np.arange(len(data["y_train"])),
+                        test_size=early_stopping["validation_fraction"],
+                        random_state=early_stopping["random_state"],
+                    )
+                    X, y = data["X_train"], data["y_train"]
+                    context._put("X_fit", X[fit_index])
+                    context._put("y_fit", y[fit_index])
+                    context._put("X_val", X[val_index])
+                    context._put("y_val", y[val_index])
+                    context._put_folds("fit", check_cv(cv, y[fit_index], classifier=False), y[fit_index])
+            except BaseException:
+                context.close()
+                raise
+
+            context.stats = dict(
+                storage=context.storage,
+                directory=directory,
+                data_mb=sum(a.nbytes for a in context._arrays.values()) / 1e6,
+                setup_seconds=time.perf_counter() - start,
+                folds=context._n_folds.get("train", 0),
+            )
+            context.stats.update(context.payload_stats())
+            return context
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    @property
+    def storage(self):
+        if self.directory is None:
+            return "in_memory"
+        if os.path.dirname(self.directory) == SHARED_MEMORY_DIR:
+            return "shared_memory"
+        return "memmap_file"
+
+    def _store(self, key, array):
+        if self.directory is None:
+            self._arrays[key] = array
+            return
+        path = os.path.join(self.directory, f"{key}.npy")
+        np.save(path, np.ascontiguousarray(array), allow_pickle=False)
+        self._arrays[key] = np.load(path, mmap_mode="r")
+
+    def _put(self, name, value):
+        if hasattr(value, "nnz") and self.directory is not None:
+            csr = value.tocsr()
+            for part in ("data", "indices", "indptr"):
+                self._store(f"{name}.{part}", getattr(csr, part))
+            self._layout[name] = csr.shape
+        else:
+            self._store(name, value)
+            self._layout[name] = None
+
+    def _put_folds(self, split, cv, y):
+        n_folds = 0
+        for k, (train, test) in enumerate(cv.split(np.zeros((len(y), 1)), y)):
+            self._store(f"{split}-fold{k}-train", train)
+            self._store(f"{split}-fold{k}-test", test)
+            n_folds += 1
+        self._n_folds[split] = n_folds
+
+    def __getitem__(self, name):
+        shape = self._layout[name]
+        if shape is None:
+            return self._arrays[name]
+
+        from scipy import sparse
+        parts = tuple(self._arrays[f"{name}.{p}"] for p in ("data", "indices", "indptr"))
+        return sparse.csr_matrix(parts, shape=shape, copy=False)
+
+    def folds(self, split="train"):
+        """The precomputed (train_index, test_index) pairs, usable as `cv=`."""
+        return [
+            (self._arrays[f"{split}-fold{k}-train"], self._arrays[f"{split}-fold{k}-test"])
+            for k in range(self._n_folds[split])
+        ]
+
+    def split(self, split="train"):
+        """(X, y, folds) for the full training data ("train") or its early-stopping part ("fit")."""
+        if split == "train":
+            return self["X_train"], self["y_train"], self.folds("train")
+        return self["X_fit"], self["y_fit"], self.folds("fit")
+
+    def payload_stats(self):
+        """Size and round-trip time of pickling the context, as a search process receives it."""
+        start = time.perf_counter()
+        payload = pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.loads(payload)
+        return dict(
+            payload_bytes=len(payload),
+            payload_seconds=time.perf_counter() - start,
+            # What the same data costs when the arrays travel inline
+            inline_payload_bytes=sum(a.nbytes for a in self._arrays.values()),
+        )
+
+    def __getstate__(self):
+        if self.directory is None:
+            return self.__dict__
+        state = dict(self.__dict__)
+        state["_arrays"] = sorted(self._arrays)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.directory is not None:
+            self._arrays = {
+                key: np.load(os.path.join(self.directory, f"{key}.npy"), mmap_mode="r")
+                for key in state["_arrays"]
+            }
+
+    def close(self):
+        """Delete the backing files (only in the process that created them)."""
+        if self.directory is not None and os.getpid() == self._owner:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            logging.info(f"Removed search data {self.directory}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
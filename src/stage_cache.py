@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+from scipy import sparse
+
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import file_sha256, load_object, replace_path, save_object
+
+CACHE_DIR = os.path.join("artifacts", "cache")
+
+
+def path_sha256(path):
+    """sha256 of a file, or of every file (name + content) under a directory."""
+    if not os.path.isdir(path):
+        return file_sha256(path)
+
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            full = os.path.join(root, name)
+            digest.update(os.path.relpath(full, path).encode("utf-8"))
+            digest.update(file_sha256(full).encode("ascii"))
+    return digest.hexdigest()
+
+
+def describe(obj):
+    """
+    JSON-friendly, order-stable description of a stage input. Estimators
+    are described by class and (recursively) their constructor params;
+    arrays by dtype, shape and a digest of their bytes.
+    """
+    if hasattr(obj, "get_params") and not isinstance(obj, type):
+        cls = type(obj)
+        params = obj.get_params(deep=False)
+        return {
+            "class": f"{cls.__module__}.{cls.__qualname__}",
+            "params": {k: describe(v) for k, v in sorted(params.items())},
+        }
+    if isinstance(obj, np.ndarray):
+        if obj.dtype == object:
+            return {"ndarray": "object", "values": describe(obj.tolist())}
+        data = np.ascontiguousarray(obj)
+        return {
+            "ndarray": str(data.dtype),
+            "shape": list(data.shape),
+            "sha256": hashlib.sha256(memoryview(data).cast("B")).hexdigest(),
+        }
+    if sparse.issparse(obj):
+        csr = sparse.csr_matrix(obj)
+        return {
+            "sparse": csr.format,
+            "shape": list(csr.shape),
+            "parts": [describe(csr.data), describe(csr.indices), describe(csr.indptr)],
+        }
+    if isinstance(obj, dict):
+        return {str(k): describe(v) for k, v in sorted(obj.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(obj, (list, tuple)):
+        return [describe(v) for v in obj]
+    if isinstance(obj, (str, int, float, bool)) or obj is None:
+        return obj
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return repr(obj)
+
+
+class StageCache:
+    """
+    Content-addressed cache for pipeline stage outputs.
+
+    Each entry lives under <cache_dir>/<stage>/<key>/, where the key is a
+    sha256 over a description of every input the stage depends on. Entries
+    hold either a pickled value or copies of the stage's output files.
+    Set PIPELINE_CACHE=0 to disable.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, enabled=None):
+        self.cache_dir = cache_dir
+        if enabled is None:
+            enabled = os.getenv("PIPELINE_CACHE", "1").strip().lower() not in ("0", "false", "no", "off")
+        self.enabled = enabled
+
+    @staticmethod
+    def make_key(*parts):
+        payload = json.dumps(describe(list(parts)), sort_keys=True, default=repr)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_dir(self, stage, key):
+        return os.path.join(self.cache_dir, stage, key)
+
+    def get(self, stage, key):
+        """Return the cached value for (stage, key), or None on a miss."""
+        if not self.enabled:
+            return None
+        path = os.path.join(self._entry_dir(stage, key), "value.pkl")
+        if not os.path.exists(path):
+            return None
+        try:
+            value = load_object(path)
+        except CustomException as e:
+            logging.warning(f"Ignoring unreadable cache entry {path}: {e}")
+            return None
+        logging.info(f"Cache hit: {stage} [{key[:12]}]")
+        return value
+
+    def put(self, stage, key, value):
+        if not self.enabled:
+            return
+        save_object(os.path.join(self._entry_dir(stage, key), "value.pkl"), value)
+
+    def store_files(self, stage, key, files):
+        """Copy a stage's output files or directories ({name: path}) into the cache entry."""
+        if not self.enabled:
+            return
+        try:
+            entry = self._entry_dir(stage, key)
+            os.makedirs(entry, exist_ok=True)
+
+            manifest = {}
+            for name, path in files.items():
+                _atomic_copy(path, os.path.join(entry, name))
+                manifest[name] = path_sha256(path)
+
+            with open(os.path.join(entry, "files.json"), "w") as f:
+                json.dump(manifest, f, indent=2)
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def restore_files(self, stage, key, files):
+        """
+        Put the cached outputs for (stage, key) at their destinations
+        ({name: path}). Files already matching the cached content are left
+        untouched. Returns False on a miss.
+        """
+        if not self.enabled:
+            return False
+        try:
+            entry = self._entry_dir(stage, key)
+            manifest_path = os.path.join(entry, "files.json")
+            if not os.path.exists(manifest_path):
+                return False
+
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            if set(files) - set(manifest):
+                return False
+
+            for name, dest in files.items():
+                if os.path.exists(dest) and path_sha256(dest) == manifest[name]:
+                    continue
+                _atomic_copy(os.path.join(entry, name), dest)
+
+            logging.info(f"Cache hit: {stage} [{key[:12]}], outputs restored")
+            return True
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+def _atomic_copy(src, dest):
+    dir_name = os.path.dirname(dest) or "."
+    os.makedirs(dir_name, exist_ok=True)
+
+    if os.path.isdir(src):
+        temp_path = tempfile.mkdtemp(dir=dir_name, suffix=".tmp")
+        shutil.copytree(src, temp_path, dirs_exist_ok=True)
+    else:
+        with tempfile.NamedTemporaryFile(delete=False, dir=dir_name, suffix=".tmp") as tmp:
+            temp_path = tmp.name
+        shutil.copyfile(src, temp_path)
+
+    replace_path(temp_path, dest)
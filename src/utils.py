@@ -1,15 +1,19 @@
 import os
 import sys
+import time
 import pickle
+import cProfile
+import hashlib
+import shutil
 import tempfile
+import multiprocessing
+import multiprocessing.connection
 
 import numpy as np
-from sklearn.base import clone
-from sklearn.metrics import r2_score
-from sklearn.model_selection import GridSearchCV, RandomizedSearchCV
 
 from src.exception import CustomException
 from src.logger import logging
+from src.profiler import PROFILE_DIR_ENV, peak_rss_mb, record, span
 
 
 def save_object(file_path, obj):
@@ -27,6 +31,26 @@ def save_object(file_path, obj):
         raise CustomException(e, sys)
 
 
+def replace_path(src, dest):
+    """Atomically move a file or directory `src` onto `dest`, replacing it."""
+    try:
+        if not os.path.isdir(src) or not os.path.isdir(dest):
+            if os.path.isdir(dest):
+                shutil.rmtree(dest)
+            os.replace(src, dest)
+            return
+
+        # Directories cannot be replaced in one rename: move the old one
+        # aside first so `dest` is only briefly missing, never half-written.
+        old = f"{dest}.old-{os.getpid()}"
+        os.replace(dest, old)
+        os.replace(src, dest)
+        shutil.rmtree(old, ignore_errors=True)
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
 def load_object(file_path):
     try:
         with open(file_path, "rb") as f:
@@ -35,6 +59,17 @@ def load_object(file_path):
         raise CustomException(e, sys)
 
 
+def file_sha256(file_path, chunk_size=1 << 20):
+    try:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
 def _count_grid_combinations(grid):
     if not grid:
         return 1
@@ -45,6 +80,293 @@ def _count_grid_combinations(grid):
     return total
 
 
+def _split_cores(n_models, n_jobs=-1, outer_jobs=None):
+    """
+    Split the available cores between concurrent model searches (outer)
+    and the threads/processes each search may use (inner), so the two
+    levels never multiply past the core count.
+    """
+    total = os.cpu_count() or 1
+    if n_jobs is not None and n_jobs > 0:
+        total = min(total, n_jobs)
+
+    outer = outer_jobs or min(n_models, total)
+    outer = max(1, min(outer, n_models, total))
+    inner = max(1, total // outer)
+    return outer, inner
+
+
+def _set_estimator_threads(estimator, n_threads):
+    params = estimator.get_params()
+    if "n_jobs" in params:
+        estimator.set_params(n_jobs=n_threads)
+    elif "thread_count" in params:
+        estimator.set_params(thread_count=n_threads)
+
+
+def _build_search(estimator, grid, cv, n_jobs, random_state, grid_limit, min_iter, max_iter,
+                  search_strategy="exhaustive", halving_factor=3):
+    # sklearn's search machinery is only needed for training; importing it
+    # here keeps it out of the serving process (which imports this module)
+    from sklearn.model_selection import GridSearchCV, RandomizedSearchCV
+
+    if search_strategy == "halving":
+        return _build_halving_search(
+            estimator, grid, cv, n_jobs, random_state, grid_limit, max_iter, halving_factor,
+        )
+
+    combos = _count_grid_combinations(grid)
+
+    if combos <= grid_limit:
+        return GridSearchCV(
+            estimator=estimator,
+            param_grid=grid,
+            scoring="r2",
+            cv=cv,
+            n_jobs=n_jobs,
+            refit=True,
+        )
+
+    n_iter = int(np.clip(combos, min_iter, max_iter))
+    return RandomizedSearchCV(
+        estimator=estimator,
+        param_distributions=grid,
+        n_iter=n_iter,
+        scoring="r2",
+        cv=cv,
+        n_jobs=n_jobs,
+        random_state=random_state,
+        refit=True,
+    )
+
+
+# Boosting-round parameter per estimator class; used as the halving budget
+# and, for libraries with native early stopping, as the round cap.
+_ROUND_PARAMS = ("n_estimators", "iterations")
+_NATIVE_EARLY_STOPPING = {
+    "XGBRegressor": "n_estimators",
+    "CatBoostRegressor": "iterations",
+}
+
+
+def _build_halving_search(estimator, grid, cv, n_jobs, random_state, grid_limit, max_iter, factor):
+    """
+    Successive halving: every candidate starts on a small budget and only
+    the best 1/factor advance to the next, larger budget. The budget is the
+    number of boosting rounds/trees when the grid tunes it alongside other
+    parameters, otherwise the number of training samples.
+    """
+    from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+    from sklearn.model_selection import HalvingGridSearchCV, HalvingRandomSearchCV
+
+    grid = dict(grid)
+    options = dict(resource="n_samples", min_resources="exhaust")
+
+    for name in _ROUND_PARAMS:
+        if name in grid and len(grid) > 1:
+            options = dict(resource=name, max_resources=max(grid.pop(name)), min_resources="exhaust")
+            break
+
+    common = dict(
+        estimator=estimator,
+        factor=factor,
+        scoring="r2",
+        cv=cv,
+        n_jobs=n_jobs,
+        random_state=random_state,
+        refit=True,
+        **options,
+    )
+
+    if _count_grid_combinations(grid) <= grid_limit:
+        return HalvingGridSearchCV(param_grid=grid, **common)
+    return HalvingRandomSearchCV(param_distributions=grid, n_candidates=max_iter, **common)
+
+
+def _prepare_early_stopping(estimator, grid, context, early_stopping):
+    """
+    For XGBoost/CatBoost: fix the round count at the grid maximum, enable the
+    library's early stopping and evaluate it on the validation split the
+    search context carved off the training data. Returns the adjusted
+    (estimator, grid, split, fit_params), where split names the context's
+    data to fit on.
+    """
+    round_param = _NATIVE_EARLY_STOPPING.get(type(estimator).__name__)
+    if round_param is None:
+        return estimator, grid, "train", {}
+
+    grid = dict(grid)
+    rounds = grid.pop(round_param, None)
+    if rounds:
+        estimator.set_params(**{round_param: max(rounds)})
+    estimator.set_params(early_stopping_rounds=early_stopping["rounds"])
+
+    X_val, y_val = context["X_val"], context["y_val"]
+    if round_param == "iterations":
+        fit_params = {"eval_set": (X_val, y_val)}
+    else:
+        fit_params = {"eval_set": [(X_val, y_val)], "verbose": False}
+
+    return estimator, grid, "fit", fit_params
+
+
+def _stopped_rounds(estimator):
+    """Number of rounds actually kept after early stopping, if any."""
+    if type(estimator).__name__ == "CatBoostRegressor":
+        return {"iterations": estimator.tree_count_}
+    best_iteration = getattr(estimator, "best_iteration", None)
+    if best_iteration is not None:
+        return {"n_estimators": best_iteration + 1}
+    return {}
+
+
+def _search_candidates(search):
+    """Per-candidate timings and per-fold scores from a fitted search's cv_results_."""
+    results = search.cv_results_
+    n_splits = getattr(search, "n_splits_", 0)
+    candidates = []
+
+    for i, params in enumerate(results["params"]):
+        score = float(results["mean_test_score"][i])
+        candidate = {
+            "params": params,
+            "mean_fit_seconds": float(results["mean_fit_time"][i]),
+            "std_fit_seconds": float(results["std_fit_time"][i]),
+            "mean_score_seconds": float(results["mean_score_time"][i]),
+            "mean_test_score": score if score == score else None,
+            "fold_test_scores": [float(results[f"split{k}_test_score"][i]) for k in range(n_splits)],
+        }
+        if "n_resources" in results:
+            candidate["iter"] = int(results["iter"][i])
+            candidate["n_resources"] = int(results["n_resources"][i])
+        candidates.append(candidate)
+
+    return candidates
+
+
+def _fit_model(name, model, grid, context, inner_jobs, search_options, early_stopping=None):
+    """Tune (or plainly fit) one model on a SearchContext and score it on the test split."""
+    from sklearn.base import clone
+    from sklearn.metrics import r2_score
+
+    start = time.perf_counter()
+    estimator = clone(model)
+    candidates = []
+
+    if not grid:
+        _set_estimator_threads(estimator, inner_jobs)
+        estimator.fit(context["X_train"], context["y_train"])
+        best_estimator, best_params = estimator, {}
+    else:
+        # Parallelise over candidates/folds; keep each fit single-threaded
+        _set_estimator_threads(estimator, 1)
+        split, fit_params = "train", {}
+
+        if early_stopping:
+            estimator, grid, split, fit_params = _prepare_early_stopping(
+                estimator, grid, context, early_stopping,
+            )
+        X_fit, y_fit, folds = context.split(split)
+
+        if grid:
+            # The context's precomputed folds replace search_options["cv"]
+            options = dict(search_options, cv=folds)
+            search = _build_search(estimator, grid, n_jobs=inner_jobs, **options)
+            search.fit(X_fit, y_fit, **fit_params)
+            best_estimator, best_params = search.best_estimator_, dict(search.best_params_)
+            candidates = _search_candidates(search)
+        else:
+            estimator.fit(X_fit, y_fit, **fit_params)
+            best_estimator, best_params = estimator, {}
+
+        if early_stopping:
+            best_params.update(_stopped_rounds(best_estimator))
+
+    fit_time = time.perf_counter() - start
+    score = r2_score(context["y_test"], best_estimator.predict(context["X_test"]))
+
+    return {
+        "name": name,
+        "estimator": best_estimator,
+        "params": best_params,
+        "r2_score": score,
+        "fit_time": fit_time,
+        "status": "ok",
+        "candidates": candidates,
+    }
+
+
+def _fit_model_worker(conn, task):
+    profile_dir = os.getenv(PROFILE_DIR_ENV)
+    profile = cProfile.Profile() if profile_dir else None
+    try:
+        if profile is not None:
+            profile.enable()
+        result = _fit_model(**task)
+        result["peak_rss_mb"] = peak_rss_mb()
+        conn.send(result)
+    except Exception as e:
+        conn.send({"name": task["name"], "status": "error", "error": repr(e)})
+    finally:
+        conn.close()
+        if profile is not None:
+            profile.disable()
+            safe_name = "".join(c if c.isalnum() else "_" for c in task["name"])
+            profile.dump_stats(os.path.join(profile_dir, f"search-{safe_name}.prof"))
+
+
+def _run_searches_in_processes(tasks, outer_jobs, time_budget=None, poll_interval=0.1):
+    """
+    Run model searches on a pool of worker processes, at most `outer_jobs`
+    at a time. Any search still running after `time_budget` seconds is
+    terminated and reported with status "timeout".
+    """
+    ctx = multiprocessing.get_context("spawn")
+    pending = list(tasks)
+    running = {}
+    results = {}
+
+    try:
+        while pending or running:
+            while pending and len(running) < outer_jobs:
+                task = pending.pop(0)
+                parent_conn, child_conn = ctx.Pipe(duplex=False)
+                process = ctx.Process(target=_fit_model_worker, args=(child_conn, task), daemon=True)
+                process.start()
+                child_conn.close()
+                running[parent_conn] = (task["name"], process, time.perf_counter())
+
+            ready = multiprocessing.connection.wait(list(running), timeout=poll_interval)
+            for conn in ready:
+                name, process, started = running.pop(conn)
+                try:
+                    results[name] = conn.recv()
+                except EOFError:
+                    results[name] = {"name": name, "status": "error", "error": "worker exited unexpectedly"}
+                conn.close()
+                process.join()
+                results[name].setdefault("fit_time", time.perf_counter() - started)
+
+            if time_budget is None:
+                continue
+
+            now = time.perf_counter()
+            for conn, (name, process, started) in list(running.items()):
+                if now - started > time_budget:
+                    process.terminate()
+                    process.join()
+                    conn.close()
+                    del running[conn]
+                    logging.warning(f"{name} exceeded its {time_budget}s budget and was stopped")
+                    results[name] = {"name": name, "status": "timeout", "fit_time": now - started}
+    finally:
+        for conn, (_, process, _) in running.items():
+            process.terminate()
+            conn.close()
+
+    return results
+
+
 def evaluate_models(
     X_train, y_train, X_test, y_test,
     models, param,
@@ -52,63 +374,161 @@ def evaluate_models(
     random_state=42,
     grid_limit=60,
     min_iter=15,
-    max_iter=60
+    max_iter=60,
+    n_jobs=-1,
+    outer_jobs=None,
+    model_time_budget=None,
+    search_strategy="exhaustive",
+    halving_factor=3,
+    early_stopping_rounds=20,
+    validation_fraction=0.1,
+    cache=None,
+    shared_data=True,
 ):
-    try:
-        report = {}
-        best_params_by_model = {}
-        best_estimators = {}
+    """
+    Tune every model and score it on the test split.
 
-        for name, model in models.items():
-            logging.info(f"Tuning model: {name}")
+    search_strategy="exhaustive" runs the grid (or a random sample of it when
+    it exceeds grid_limit) on all folds. "halving" uses successive halving
+    over boosting rounds or samples, and native early stopping on a
+    validation split for XGBoost/CatBoost.
 
-            estimator = clone(model)
-            grid = param.get(name, {}) or {}
+    Searches run concurrently on worker processes when more than one core
+    is available (or a per-model wall-clock budget is set); cores are split
+    between the concurrent searches and each search's own n_jobs.
 
-            if not grid:
-                estimator.fit(X_train, y_train)
-                score = r2_score(y_test, estimator.predict(X_test))
+    With a StageCache, each model's search result is cached under a key of
+    the data, the model definition, its grid and the search options, so
+    only new or changed models are re-tuned.
 
-                report[name] = score
-                best_params_by_model[name] = {}
-                best_estimators[name] = estimator
-                continue
+    The data and CV folds are prepared once in a SearchContext and reused by
+    every model and candidate. When searches run on other processes and
+    shared_data is set, the arrays are memory-mapped from /dev/shm so that
+    no process or joblib worker receives its own copy.
 
-            combos = _count_grid_combinations(grid)
+    Returns (report, best_model_name, best_estimator, best_params_by_model)
+    where report[name] = {"r2_score", "fit_time", "status"}.
+    """
+    try:
+        search_options = dict(
+            cv=cv,
+            random_state=random_state,
+            grid_limit=grid_limit,
+            min_iter=min_iter,
+            max_iter=max_iter,
+            search_strategy=search_strategy,
+            halving_factor=halving_factor,
+        )
+        if search_strategy not in ("exhaustive", "halving"):
+            raise ValueError(f"Unknown search_strategy: {search_strategy}")
 
-            if combos <= grid_limit:
-                search = GridSearchCV(
-                    estimator=estimator,
-                    param_grid=grid,
-                    scoring="r2",
-                    cv=cv,
-                    n_jobs=-1,
-                    refit=True,
-                )
-            else:
-                n_iter = int(np.clip(combos, min_iter, max_iter))
-                search = RandomizedSearchCV(
-                    estimator=estimator,
-                    param_distributions=grid,
-                    n_iter=n_iter,
-                    scoring="r2",
-                    cv=cv,
-                    n_jobs=-1,
-                    random_state=random_state,
-                    refit=True,
+        early_stopping = None
+        if search_strategy == "halving":
+            early_stopping = dict(
+                rounds=early_stopping_rounds,
+                validation_fraction=validation_fraction,
+                random_state=random_state,
+            )
+
+        outer, inner = _split_cores(len(models), n_jobs, outer_jobs)
+        logging.info(f"Model search: {outer} concurrent searches x {inner} jobs each")
+
+        tasks = [
+            dict(
+                name=name,
+                model=model,
+                grid=param.get(name, {}) or {},
+                inner_jobs=inner,
+                search_options=search_options,
+                early_stopping=early_stopping,
+            )
+            for name, model in models.items()
+        ]
+        # Largest searches first so they do not end up as the long tail
+        tasks.sort(key=lambda t: -_count_grid_combinations(t["grid"]) if t["grid"] else 0)
+
+        results = {}
+        cache_keys = {}
+        if cache is not None:
+            data_key = cache.make_key(X_train, y_train, X_test, y_test)
+            for task in list(tasks):
+                key = cache.make_key(
+                    "model_search", data_key, task["model"], task["grid"], search_options, early_stopping,
                 )
+                cached = cache.get("model_search", key)
+                if cached is not None:
+                    results[task["name"]] = cached
+                    tasks.remove(task)
+                else:
+                    cache_keys[task["name"]] = key
+
+        in_processes = outer > 1 or model_time_budget is not None
+        if tasks:
+            from src.search_context import SearchContext
+
+            # Nothing crosses a process boundary with one core and no budget
+            context = SearchContext.create(
+                X_train, y_train, X_test, y_test,
+                cv=cv,
+                early_stopping=early_stopping,
+                shared=shared_data and (in_processes or inner > 1),
+            )
+            logging.info(
+                f"Search data: {context.stats['data_mb']:.1f} MB {context.storage}, "
+                f"{context.stats['payload_bytes']} bytes per task"
+            )
+            record("search_context", **context.stats)
+
+            try:
+                for task in tasks:
+                    task["context"] = context
+                if in_processes:
+                    with span("model_searches", processes=outer, models=[t["name"] for t in tasks]):
+                        results.update(_run_searches_in_processes(tasks, outer, model_time_budget))
+                else:
+                    for task in tasks:
+                        logging.info(f"Tuning model: {task['name']}")
+                        with span("model_search", model=task["name"]):
+                            results[task["name"]] = _fit_model(**task)
+            finally:
+                context.close()
+
+        for name, key in cache_keys.items():
+            if results[name]["status"] == "ok":
+                cache.put("model_search", key, results[name])
 
-            search.fit(X_train, y_train)
+        report = {}
+        best_params_by_model = {}
+        best_estimators = {}
+
+        for name in models:
+            result = results[name]
+            report[name] = {
+                "r2_score": result.get("r2_score"),
+                "fit_time": result["fit_time"],
+                "status": result["status"],
+            }
+            record(
+                "model_search",
+                model=name,
+                cached=name not in cache_keys and cache is not None,
+                strategy=search_strategy,
+                peak_rss_mb=result.get("peak_rss_mb"),
+                candidates=result.get("candidates", []),
+                **report[name],
+            )
+            if result["status"] != "ok":
+                logging.warning(f"{name}: {result['status']} {result.get('error', '')}")
+                continue
 
-            best_estimator = search.best_estimator_
-            best_params = search.best_params_
-            score = r2_score(y_test, best_estimator.predict(X_test))
+            logging.info(f"{name}: R2={result['r2_score']:.4f} fit_time={result['fit_time']:.2f}s")
+            best_params_by_model[name] = result["params"]
+            best_estimators[name] = result["estimator"]
 
-            report[name] = score
-            best_params_by_model[name] = best_params
-            best_estimators[name] = best_estimator
+        if not best_estimators:
+            raise RuntimeError("No model finished its search")
 
-        best_model_name = max(report, key=report.get)
+        best_model_name = max(best_estimators, key=lambda n: report[n]["r2_score"])
         best_estimator = best_estimators[best_model_name]
 
         return report, best_model_name, best_estimator, best_params_by_model
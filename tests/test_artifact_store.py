@@ -0,0 +1,138 @@
+import dataclasses
+import os
+
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from src.artifact_store import ArtifactStore
+from src.components.data_transformation import DataTransformation
+from src.components.model_trainer import ModelTrainer
+from src.exception import CustomException
+from src.pipeline.predict_pipeline import SMOKE_RECORD, CustomData, PredictionCache, PredictPipeline
+from src.utils import save_object
+
+TRAIN_CSV = os.path.join("artifacts", "train.csv")
+TARGET = "math_score"
+
+
+def _write(path, content):
+    with open(path, "w") as f:
+        f.write(content)
+    return str(path)
+
+
+def test_publish_makes_the_version_current(tmp_path):
+    store = ArtifactStore(str(tmp_path / "store"))
+    version = store.publish({"model.pkl": _write(tmp_path / "a", "one")}, {"r2_score": 0.9})
+
+    assert store.current_version() == version
+    with open(store.path(version, "model.pkl")) as f:
+        assert f.read() == "one"
+    assert store.read_manifest(version)["metadata"] == {"r2_score": 0.9}
+
+
+def test_republishing_the_current_content_is_a_no_op(tmp_path):
+    store = ArtifactStore(str(tmp_path / "store"))
+    first = store.publish({"model.pkl": _write(tmp_path / "a", "one")})
+
+    assert store.publish({"model.pkl": _write(tmp_path / "b", "one")}) == first
+    assert store.versions() == [first]
+
+
+def test_prune_keeps_the_newest_and_the_current(tmp_path):
+    store = ArtifactStore(str(tmp_path / "store"), keep_versions=2)
+    published = [store.publish({"model.pkl": _write(tmp_path / str(i), str(i))}) for i in range(4)]
+
+    assert len(store.versions()) == 2
+    assert store.current_version() == published[-1] in store.versions()
+
+
+def test_rollback(tmp_path):
+    store = ArtifactStore(str(tmp_path / "store"))
+    first = store.publish({"model.pkl": _write(tmp_path / "a", "one")})
+    store.publish({"model.pkl": _write(tmp_path / "b", "two")})
+
+    store.rollback(first)
+
+    assert store.current_version() == first
+    with pytest.raises(CustomException):
+        store.rollback("no-such-version")
+
+
+@pytest.fixture
+def serving(tmp_path, monkeypatch):
+    """A ModelTrainer publishing into an empty store that PredictPipeline serves from."""
+    store_dir = str(tmp_path / "store")
+    trainer = ModelTrainer()
+    trainer.model_trainer_config.trained_model_file_path = str(tmp_path / "model.pkl")
+    trainer.model_trainer_config.build_prediction_table = False
+    trainer.model_trainer_config.model_store_dir = store_dir
+
+    config = dataclasses.replace(PredictPipeline.config, artifact_check_interval=0, use_prediction_table=False)
+    monkeypatch.setattr(PredictPipeline, "config", config)
+    monkeypatch.setattr(PredictPipeline, "store", ArtifactStore(store_dir))
+    monkeypatch.setattr(PredictPipeline, "_bundle", None)
+    monkeypatch.setattr(PredictPipeline, "_rejected_source", None)
+    monkeypatch.setattr(PredictPipeline, "_cache", PredictionCache(16))
+
+    train = pd.read_csv(TRAIN_CSV)
+    X = train.drop(columns=[TARGET])
+    preprocessor = DataTransformation().get_data_transformer_object().fit(X)
+    preprocessor_path = str(tmp_path / "preprocessor.pkl")
+    save_object(preprocessor_path, preprocessor)
+    features = preprocessor.transform(X)
+
+    def publish(offset):
+        """Publish a linear model shifted by `offset` points."""
+        save_object(trainer.model_trainer_config.trained_model_file_path,
+                    LinearRegression().fit(features, train[TARGET] + offset))
+        return trainer.publish_model_version(preprocessor_path, 0.9, "Linear Regression", {})
+
+    return publish
+
+
+def _predict():
+    return PredictPipeline().predict_record(CustomData.from_record(SMOKE_RECORD))
+
+
+def test_reload_swaps_in_a_new_version(serving):
+    first = serving(0)
+    assert PredictPipeline.reload()
+    before = _predict()
+
+    second = serving(10)
+    assert PredictPipeline.reload()
+
+    assert PredictPipeline._bundle.version == second != first
+    assert _predict() == pytest.approx(before + 10)
+    assert not PredictPipeline.reload()  # nothing new
+
+
+def test_reload_rejects_a_version_failing_its_smoke_test(serving):
+    good = serving(0)
+    PredictPipeline.reload()
+    store = PredictPipeline.store
+    manifest = store.read_manifest(good)
+    files = {name: store.path(good, name) for name in manifest["files"]}
+    # An extra file so the content differs and publish() makes a new version
+    files["extra"] = store.path(good, "model.pkl")
+    bad = store.publish(files, dict(manifest["metadata"], smoke_prediction=-1.0))
+
+    assert not PredictPipeline.reload()
+
+    assert store.current_version() == bad
+    assert PredictPipeline._bundle.version == good
+    assert PredictPipeline._rejected_source == ("store", bad)
+    assert not PredictPipeline.reload()  # not retried until CURRENT changes
+
+
+def test_rollback_is_served_on_reload(serving):
+    first = serving(0)
+    serving(10)
+    PredictPipeline.reload()
+
+    PredictPipeline.store.rollback(first)
+
+    assert PredictPipeline.reload()
+    assert PredictPipeline._bundle.version == first
@@ -0,0 +1,30 @@
+import asyncio
+import json
+
+from asgi import PredictionApp
+from src.pipeline.predict_pipeline import SMOKE_RECORD
+
+
+def _request(app, method, path, payload=None):
+    """Send one HTTP request straight to the app; no lifespan events are sent."""
+    messages = [{"type": "http.request", "body": json.dumps(payload).encode() if payload is not None else b""}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app({"type": "http", "method": method, "path": path}, receive, send))
+    return sent[0]["status"], json.loads(sent[1]["body"])
+
+
+def test_predicts_without_lifespan_events():
+    app = PredictionApp(max_workers=1)
+
+    status, body = _request(app, "POST", "/api/predict/batch", [SMOKE_RECORD])
+
+    assert status == 200
+    assert body["error_count"] == 0 and isinstance(body["results"][0]["prediction"], float)
+    app.executor.shutdown()
@@ -0,0 +1,91 @@
+import threading
+import time
+from concurrent.futures import TimeoutError
+
+import pytest
+
+from src.pipeline.batcher import MicroBatcher
+
+
+class Recorder:
+    """predict_many that doubles each item and records the batch sizes it saw."""
+
+    def __init__(self, delay=0.0):
+        self.sizes = []
+        self.delay = delay
+
+    def __call__(self, items):
+        time.sleep(self.delay)
+        self.sizes.append(len(items))
+        return [item * 2 for item in items]
+
+
+def test_coalesces_items_queued_within_the_window():
+    predict_many = Recorder()
+    batcher = MicroBatcher(predict_many, max_batch_size=64, max_wait_ms=500)
+
+    futures = [batcher.submit(i) for i in range(10)]
+
+    assert [f.result(5) for f in futures] == [i * 2 for i in range(10)]
+    assert predict_many.sizes == [10]
+    stats = batcher.stats()
+    assert (stats["batches"], stats["items"], stats["mean_batch_size"]) == (1, 10, 10.0)
+    assert stats["batch_size_histogram"] == {"9-16": 1}
+
+
+def test_batches_are_capped_at_max_batch_size():
+    predict_many = Recorder()
+    batcher = MicroBatcher(predict_many, max_batch_size=4, max_wait_ms=500)
+
+    futures = [batcher.submit(i) for i in range(10)]
+
+    assert [f.result(5) for f in futures] == [i * 2 for i in range(10)]
+    assert predict_many.sizes == [4, 4, 2]
+
+
+def test_a_lone_item_waits_no_longer_than_the_window():
+    batcher = MicroBatcher(Recorder(), max_batch_size=64, max_wait_ms=50)
+
+    start = time.monotonic()
+    assert batcher.predict(21, timeout=5) == 42
+    assert 0.04 <= time.monotonic() - start < 1
+
+
+def test_predict_times_out_on_a_slow_batch():
+    batcher = MicroBatcher(Recorder(delay=0.5), max_batch_size=1, max_wait_ms=0)
+
+    with pytest.raises(TimeoutError):
+        batcher.predict(1, timeout=0.05)
+
+
+def test_a_failed_batch_fails_every_item():
+    def predict_many(items):
+        raise ValueError("model exploded")
+
+    batcher = MicroBatcher(predict_many, max_batch_size=64, max_wait_ms=200)
+    futures = [batcher.submit(i) for i in range(3)]
+
+    for future in futures:
+        with pytest.raises(ValueError, match="model exploded"):
+            future.result(5)
+    assert batcher.stats()["errors"] == 1
+
+
+def test_concurrent_callers_share_batches():
+    predict_many = Recorder()
+    batcher = MicroBatcher(predict_many, max_batch_size=64, max_wait_ms=100)
+    results = {}
+    barrier = threading.Barrier(16)
+
+    def call(i):
+        barrier.wait()
+        results[i] = batcher.predict(i, timeout=5)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {i: i * 2 for i in range(16)}
+    assert sum(predict_many.sizes) == 16 and len(predict_many.sizes) < 16
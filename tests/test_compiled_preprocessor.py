@@ -0,0 +1,84 @@
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.components.data_transformation import DataTransformation
+from src.pipeline.compiled_preprocessor import CompiledPreprocessor
+
+TRAIN_CSV = os.path.join("artifacts", "train.csv")
+TARGET = "math_score"
+
+
+@pytest.fixture(scope="module")
+def train_df():
+    return pd.read_csv(TRAIN_CSV)
+
+
+@pytest.fixture(scope="module")
+def category_grid(train_df):
+    """Every combination of the categories in train.csv, with present and missing scores."""
+    categorical = [c for c in train_df.columns if train_df[c].dtype == object]
+    combos = list(itertools.product(*(sorted(train_df[c].unique()) for c in categorical)))
+    grid = pd.DataFrame(combos, columns=categorical)
+    grid["reading_score"] = np.resize([0.0, 55.5, 100.0, np.nan], len(grid))
+    grid["writing_score"] = np.resize([100.0, np.nan, 0.0, 42.0], len(grid))
+    return grid
+
+
+def _fitted(train_df, sparse_threshold):
+    transformation = DataTransformation()
+    transformation.data_transformation_config.sparse_threshold = sparse_threshold
+    return transformation.get_data_transformer_object().fit(train_df.drop(columns=[TARGET]))
+
+
+def _dense(X):
+    return X.toarray() if hasattr(X, "toarray") else X
+
+
+@pytest.mark.parametrize("sparse_threshold", [0.0, 1.0], ids=["dense", "csr"])
+@pytest.mark.parametrize("frame", ["train", "grid"])
+def test_transform_records_matches_column_transformer(train_df, category_grid, sparse_threshold, frame):
+    preprocessor = _fitted(train_df, sparse_threshold)
+    compiled = CompiledPreprocessor.from_column_transformer(preprocessor)
+    rows = train_df.drop(columns=[TARGET]) if frame == "train" else category_grid
+
+    expected = preprocessor.transform(rows)
+    actual = compiled.transform_records(rows.to_dict(orient="records"))
+
+    assert hasattr(actual, "toarray") == hasattr(expected, "toarray")
+    np.testing.assert_array_equal(_dense(actual), _dense(expected))
+
+
+def test_transform_record_matches_column_transformer(train_df, category_grid):
+    preprocessor = _fitted(train_df, 0.0)
+    compiled = CompiledPreprocessor.from_column_transformer(preprocessor)
+
+    expected = preprocessor.transform(category_grid)
+    for i, record in enumerate(category_grid.to_dict(orient="records")):
+        np.testing.assert_array_equal(compiled.transform_record(record)[0], expected[i])
+
+
+def test_unknown_category_is_ignored_like_the_encoder(train_df, category_grid):
+    preprocessor = _fitted(train_df, 0.0)
+    compiled = CompiledPreprocessor.from_column_transformer(preprocessor)
+    rows = category_grid.head(3).assign(gender="unknown")
+
+    np.testing.assert_array_equal(
+        compiled.transform_records(rows.to_dict(orient="records")),
+        preprocessor.transform(rows),
+    )
+
+
+@pytest.mark.skipif(not os.path.exists(os.path.join("artifacts", "preprocessor.pkl")), reason="no trained artifacts")
+def test_saved_artifacts_parity(train_df, category_grid):
+    from src.pipeline.compiled_preprocessor import verify_parity
+    from src.utils import load_object
+
+    preprocessor = load_object(os.path.join("artifacts", "preprocessor.pkl"))
+    model = load_object(os.path.join("artifacts", "model.pkl"))
+
+    assert verify_parity(preprocessor, train_df, model=model) == len(train_df)
+    assert verify_parity(preprocessor, category_grid, model=model) == len(category_grid)
@@ -0,0 +1,75 @@
+import pytest
+
+from application import MAX_BATCH_RECORDS, app
+from src.pipeline.predict_pipeline import SMOKE_RECORD, CustomData
+
+
+def test_from_record_builds_custom_data():
+    data = CustomData.from_record(dict(SMOKE_RECORD, reading_score="72.5"))
+
+    assert data.race_ethnicity == "group B"
+    assert data.reading_score == 72.5 and data.writing_score == 74.0
+
+
+def test_from_record_accepts_the_attribute_spelling():
+    record = dict(SMOKE_RECORD)
+    record["race_ethnicity"] = record.pop("ethnicity")
+
+    assert CustomData.from_record(record).race_ethnicity == "group B"
+
+
+@pytest.mark.parametrize(
+    "change, message",
+    [
+        ({"gender": ""}, "Missing required fields: gender"),
+        ({"reading_score": None, "writing_score": None}, "Missing required fields: reading_score, writing_score"),
+        ({"lunch": 1}, "lunch must be a string."),
+        ({"reading_score": "high"}, "Reading score must be a number."),
+        ({"writing_score": 101}, "Writing score must be between 0 and 100."),
+        ({"reading_score": -1}, "Reading score must be between 0 and 100."),
+    ],
+)
+def test_from_record_rejects_invalid_records(change, message):
+    with pytest.raises(ValueError, match=f"^{message}$"):
+        CustomData.from_record(dict(SMOKE_RECORD, **change))
+
+
+def test_from_record_rejects_non_mappings():
+    with pytest.raises(ValueError, match="must be an object"):
+        CustomData.from_record(["female"])
+
+
+@pytest.fixture(scope="module")
+def client():
+    return app.test_client()
+
+
+def test_batch_reports_errors_per_row(client):
+    records = [SMOKE_RECORD, dict(SMOKE_RECORD, reading_score=200), "not a record", dict(SMOKE_RECORD, lunch="")]
+
+    response = client.post("/api/predict/batch", json={"records": records})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["count"] == 4 and body["error_count"] == 3
+    results = body["results"]
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert 0 <= results[0]["prediction"] <= 100
+    assert results[1]["error"] == "Reading score must be between 0 and 100."
+    assert "must be an object" in results[2]["error"]
+    assert results[3]["error"] == "Missing required fields: lunch"
+
+
+def test_batch_prediction_matches_single_record(client):
+    body = client.post("/api/predict/batch", json=[SMOKE_RECORD, SMOKE_RECORD]).get_json()
+
+    predictions = [r["prediction"] for r in body["results"]]
+    assert predictions[0] == predictions[1]
+
+
+@pytest.mark.parametrize(
+    "payload, status",
+    [({"records": "x"}, 400), ({"rows": []}, 400), ([SMOKE_RECORD] * (MAX_BATCH_RECORDS + 1), 413)],
+)
+def test_batch_rejects_bad_payloads(client, payload, status):
+    assert client.post("/api/predict/batch", json=payload).status_code == status
@@ -0,0 +1,159 @@
+import copy
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from catboost import CatBoostRegressor
+from sklearn.ensemble import RandomForestRegressor
+from xgboost import XGBRegressor
+
+from src.columnar import write_frame
+from src.components.data_transformation import DataTransformation
+from src.components.incremental_trainer import IncrementalTrainer, IncrementalTrainerConfig
+from src.utils import file_sha256, save_object
+
+SOURCE_CSV = os.path.join("notebook", "data", "stud.csv")
+TARGET = "math_score"
+
+MODELS = {
+    "sklearn": lambda: RandomForestRegressor(n_estimators=20, random_state=42, n_jobs=1),
+    "xgboost": lambda: XGBRegressor(n_estimators=20, tree_method="hist", random_state=42, n_jobs=1),
+    "catboost": lambda: CatBoostRegressor(iterations=20, random_seed=42, verbose=False, allow_writing_files=False),
+}
+
+
+@pytest.fixture(scope="module")
+def data():
+    return pd.read_csv(SOURCE_CSV)
+
+
+def _preprocessor(frame):
+    return DataTransformation().get_data_transformer_object().fit(frame.drop(columns=[TARGET]))
+
+
+@pytest.fixture(scope="module")
+def shifted_data(data):
+    """Training rows under the preprocessor fitted on 600 rows and the one refitted on 800."""
+    train = data.iloc[:800]
+    old, new = _preprocessor(train.iloc[:600]), _preprocessor(train)
+    trainer = IncrementalTrainer()
+    X_old, y = trainer._features_target(train, old)
+    X_new, _ = trainer._features_target(train, new)
+    shift = trainer._feature_shift(old, new)
+    assert shift is not None
+    return trainer, X_old, X_new, y, shift
+
+
+@pytest.mark.parametrize("kind", list(MODELS))
+def test_moved_splits_reproduce_the_predictions(shifted_data, kind):
+    trainer, X_old, X_new, y, shift = shifted_data
+    model = MODELS[kind]().fit(X_old, y)
+    expected = model.predict(X_old)
+
+    pairs = trainer._value_pairs(X_old, X_new, shift[0])
+    shifted = trainer._shift_splits(copy.deepcopy(model), shift, pairs)
+
+    np.testing.assert_allclose(shifted.predict(X_new), expected, rtol=0, atol=1e-9)
+    # The unshifted model does not, so the moves are doing the work
+    assert not np.allclose(model.predict(X_new), expected, rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize("kind", list(MODELS))
+def test_continue_training_leaves_the_loaded_model_intact(shifted_data, kind):
+    trainer, X_old, X_new, y, shift = shifted_data
+    model = MODELS[kind]().fit(X_old, y)
+    expected = model.predict(X_old)
+
+    grown, method = trainer._continue_training(model, X_new, y, X_old, shift)
+
+    assert method != "refit"
+    assert grown is not model
+    np.testing.assert_array_equal(model.predict(X_old), expected)
+
+
+@pytest.mark.parametrize(
+    "shift_splits",
+    [lambda model, shift, pairs: model, lambda model, shift, pairs: 1 / 0],
+    ids=["not_reproduced", "raises"],
+)
+def test_failed_check_refits(shifted_data, monkeypatch, shift_splits):
+    trainer, X_old, X_new, y, shift = shifted_data
+    model = MODELS["sklearn"]().fit(X_old, y)
+    monkeypatch.setattr(IncrementalTrainer, "_shift_splits", staticmethod(shift_splits))
+
+    refitted, method = trainer._continue_training(model, X_new, y, X_old, shift)
+
+    assert method == "refit"
+    assert len(refitted.estimators_) == len(model.estimators_)
+
+
+def test_unpaired_values_refit(shifted_data, monkeypatch):
+    trainer, X_old, X_new, y, shift = shifted_data
+    model = MODELS["sklearn"]().fit(X_old, y)
+    monkeypatch.setattr(IncrementalTrainer, "_value_pairs", staticmethod(lambda X_old, X_new, columns: None))
+
+    assert trainer._continue_training(model, X_new, y, X_old, shift)[1] == "refit"
+
+
+@pytest.fixture
+def artifacts(tmp_path, data):
+    """A trained model, preprocessor and splits of the first 800 rows; rows 800+ are new."""
+    config = IncrementalTrainerConfig(
+        train_data_path=str(tmp_path / "train.cols"),
+        test_data_path=str(tmp_path / "test.cols"),
+        raw_data_path=str(tmp_path / "data.cols"),
+        source_data_path=str(tmp_path / "stud.csv"),
+        preprocessor_obj_file_path=str(tmp_path / "preprocessor.pkl"),
+        trained_model_file_path=str(tmp_path / "model.pkl"),
+    )
+    train, test = data.iloc[:640], data.iloc[640:800]
+    preprocessor = _preprocessor(train)
+    X, y = IncrementalTrainer()._features_target(train, preprocessor)
+
+    write_frame(train, config.train_data_path)
+    write_frame(test, config.test_data_path)
+    data.iloc[:800].to_csv(config.source_data_path, index=False)
+    save_object(config.preprocessor_obj_file_path, preprocessor)
+    save_object(config.trained_model_file_path, MODELS["sklearn"]().fit(X, y))
+
+    new_rows_path = str(tmp_path / "new.csv")
+    data.iloc[800:].to_csv(new_rows_path, index=False)
+    return config, new_rows_path
+
+
+def _trainer(config, monkeypatch):
+    trainer = IncrementalTrainer(config)
+    trainer.model_trainer.model_trainer_config.build_prediction_table = False
+    calls = {"published": [], "full_search": []}
+    monkeypatch.setattr(
+        trainer.model_trainer, "publish_model_version", lambda *args: calls["published"].append(args),
+    )
+    monkeypatch.setattr(
+        trainer, "_full_search", lambda *args: calls["full_search"].append(args) or dict(mode="full"),
+    )
+    return trainer, calls
+
+
+def test_update_publishes_when_r2_holds(artifacts, monkeypatch):
+    config, new_rows_path = artifacts
+    trainer, calls = _trainer(config, monkeypatch)
+    source_sha256 = file_sha256(config.source_data_path)
+
+    result = trainer.update(new_rows_path)
+
+    assert result["mode"] == "incremental"
+    assert result["r2_score"] >= result["reference_r2"] - config.max_r2_drop
+    assert len(calls["published"]) == 1 and not calls["full_search"]
+    # The next full ingestion run sees the new rows
+    assert file_sha256(config.source_data_path) != source_sha256
+    assert len(pd.read_csv(config.source_data_path)) == 1000
+
+
+def test_update_does_not_publish_a_regression(artifacts, monkeypatch):
+    config, new_rows_path = artifacts
+    config.max_r2_drop = -1.0  # any update counts as a regression
+    trainer, calls = _trainer(config, monkeypatch)
+
+    assert trainer.update(new_rows_path)["mode"] == "full"
+    assert len(calls["full_search"]) == 1 and not calls["published"]
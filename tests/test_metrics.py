@@ -0,0 +1,92 @@
+import multiprocessing
+import os
+import threading
+
+import pytest
+
+from src.metrics import ARCHIVE_FILE, METRICS_DIR_ENV, Registry, _Metric, render_text
+
+
+def _samples(snapshot):
+    return {tuple(labels): value for labels, value in snapshot["samples"]}
+
+
+def test_metric_subclasses_must_merge():
+    class Incomplete(_Metric):
+        kind = "counter"
+
+    with pytest.raises(TypeError):
+        Incomplete("x", "x")
+
+
+def test_thread_shards_are_summed():
+    registry = Registry()
+    counter = registry.counter("requests_total", "Requests.", ("route",))
+    histogram = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(1000):
+            counter.inc("/a")
+            histogram.observe(0.5, "/a")
+        counter.inc("/b", amount=2)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    snap = registry.snapshot()
+    assert _samples(snap["requests_total"]) == {("/a",): 4000, ("/b",): 8}
+    # Per-bucket counts (<= 0.1, <= 1.0, +Inf) and the sum
+    assert _samples(snap["latency_seconds"]) == {("/a",): [0, 4000, 0, 2000.0]}
+
+
+def test_render_text_is_cumulative():
+    registry = Registry()
+    histogram = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value)
+
+    text = render_text(registry.snapshot())
+
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text and "latency_seconds_sum 5.55" in text
+
+
+def _worker(registry, counter, gauge):
+    # What os.register_at_fork does for the module's REGISTRY
+    registry._after_fork()
+    counter.inc("/a", amount=2)
+    gauge.set(7)
+    registry.write_snapshot()
+
+
+def test_processes_are_merged_and_archived(tmp_path, monkeypatch):
+    monkeypatch.setenv(METRICS_DIR_ENV, str(tmp_path))
+    registry = Registry()
+    counter = registry.counter("requests_total", "Requests.", ("route",))
+    gauge = registry.gauge("loaded", "Loaded.")
+    counter.inc("/a")
+    gauge.set(1)
+
+    child = multiprocessing.get_context("fork").Process(target=_worker, args=(registry, counter, gauge))
+    child.start()
+    child.join()
+    assert child.exitcode == 0
+
+    merged = registry.collect()
+    # The child does not report the parent's count inherited at fork
+    assert _samples(merged["requests_total"]) == {("/a",): 3}
+    assert merged["loaded"]["labelnames"] == ["pid"]
+    assert _samples(merged["loaded"]) == {(str(os.getpid()),): 1, (str(child.pid),): 7}
+
+    Registry.archive_process(child.pid)
+
+    assert not (tmp_path / f"metrics-{child.pid}.json").exists()
+    assert (tmp_path / ARCHIVE_FILE).exists()
+    merged = registry.collect()
+    assert _samples(merged["requests_total"]) == {("/a",): 3}
+    assert _samples(merged["loaded"]) == {(str(os.getpid()),): 1}
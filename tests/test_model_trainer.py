@@ -0,0 +1,66 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from src.artifact_store import ArtifactStore
+from src.components.data_transformation import DataTransformation
+from src.components.model_trainer import ModelTrainer
+from src.stage_cache import StageCache
+from src.utils import save_object
+
+TRAIN_CSV = os.path.join("artifacts", "train.csv")
+TEST_CSV = os.path.join("artifacts", "test.csv")
+TARGET = "math_score"
+
+
+@pytest.fixture
+def trainer(tmp_path, monkeypatch):
+    """A ModelTrainer with a one-model search, its own stage cache and store, and the (X, y) splits."""
+    train, test = pd.read_csv(TRAIN_CSV), pd.read_csv(TEST_CSV)
+    preprocessor = DataTransformation().get_data_transformer_object().fit(train.drop(columns=[TARGET]))
+    save_object(str(tmp_path / "preprocessor.pkl"), preprocessor)
+
+    trainer = ModelTrainer()
+    trainer.cache = StageCache(str(tmp_path / "cache"), enabled=True)
+    config = trainer.model_trainer_config
+    config.trained_model_file_path = str(tmp_path / "model.pkl")
+    config.preprocessor_obj_file_path = str(tmp_path / "preprocessor.pkl")
+    config.build_prediction_table = False
+    config.model_store_dir = str(tmp_path / "store")
+    config.n_jobs = 1
+    config.shared_search_data = False
+    monkeypatch.setattr(trainer, "get_models_and_params", lambda: ({"Linear Regression": LinearRegression()}, {}))
+
+    published = []
+    publish = trainer.publish_model_version
+    monkeypatch.setattr(trainer, "publish_model_version", lambda *args: published.append(publish(*args)))
+
+    splits = [
+        (preprocessor.transform(frame.drop(columns=[TARGET])), frame[TARGET].to_numpy()) for frame in (train, test)
+    ]
+    return trainer, published, splits
+
+
+def test_cache_hit_does_not_republish_the_current_version(trainer):
+    trainer, published, (train_set, test_set) = trainer
+
+    first = trainer.initiate_model_trainer(train_set, test_set)
+    second = trainer.initiate_model_trainer(train_set, test_set)
+
+    assert second == first
+    assert len(published) == 1
+
+
+def test_cache_hit_publishes_when_the_store_lacks_the_model(trainer):
+    trainer, published, (train_set, test_set) = trainer
+    trainer.initiate_model_trainer(train_set, test_set)
+    shutil.rmtree(trainer.model_trainer_config.model_store_dir)
+
+    trainer.initiate_model_trainer(train_set, test_set)
+
+    assert len(published) == 2
+    store = ArtifactStore(trainer.model_trainer_config.model_store_dir)
+    assert store.current_version() == published[-1]
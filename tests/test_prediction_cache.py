@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from src.pipeline.predict_pipeline import PredictionCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_evicts_the_least_recently_used_entry():
+    cache = PredictionCache(maxsize=2)
+    cache.put("a", 1.0)
+    cache.put("b", 2.0)
+    assert cache.get("a") == (True, 1.0)  # "b" is now the oldest
+
+    cache.put("c", 3.0)
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1.0) and cache.get("c") == (True, 3.0)
+    stats = cache.stats()
+    assert stats["size"] == 2 and stats["evictions"] == 1
+    assert (stats["hits"], stats["misses"]) == (3, 1)
+
+
+def test_put_refreshes_an_existing_key():
+    cache = PredictionCache(maxsize=2)
+    cache.put("a", 1.0)
+    cache.put("b", 2.0)
+    cache.put("a", 1.5)
+
+    cache.put("c", 3.0)
+
+    assert cache.get("a") == (True, 1.5)
+    assert cache.get("b") == (False, None)
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = PredictionCache(maxsize=10, ttl_seconds=30)
+    cache.put("a", 1.0)
+
+    clock[0] += 29.9
+    assert cache.get("a") == (True, 1.0)
+    clock[0] += 0.1
+    assert cache.get("a") == (False, None)
+
+    stats = cache.stats()
+    assert stats["expirations"] == 1 and stats["size"] == 0
+
+
+@pytest.mark.parametrize("ttl_seconds", [None, 0, -5])
+def test_no_ttl_never_expires(clock, ttl_seconds):
+    cache = PredictionCache(maxsize=10, ttl_seconds=ttl_seconds)
+    cache.put("a", 1.0)
+
+    clock[0] += 10 ** 9
+
+    assert cache.get("a") == (True, 1.0)
+    assert cache.stats()["ttl_seconds"] is None
+
+
+def test_zero_size_disables_the_cache():
+    cache = PredictionCache(maxsize=0)
+    cache.put("a", 1.0)
+
+    assert cache.get("a") == (False, None)
+    assert cache.stats()["size"] == 0
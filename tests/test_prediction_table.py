@@ -0,0 +1,89 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from src.components.data_transformation import DataTransformation
+from src.pipeline.predict_pipeline import SMOKE_RECORD, CustomData, PredictPipeline
+from src.pipeline.prediction_table import PredictionTable
+from src.utils import file_sha256, save_object
+
+TRAIN_CSV = os.path.join("artifacts", "train.csv")
+TARGET = "math_score"
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    train = pd.read_csv(TRAIN_CSV)
+    preprocessor = DataTransformation().get_data_transformer_object().fit(train.drop(columns=[TARGET]))
+    model = LinearRegression().fit(preprocessor.transform(train.drop(columns=[TARGET])), train[TARGET])
+    return preprocessor, model
+
+
+@pytest.fixture(scope="module")
+def built(tmp_path_factory, fitted):
+    """Model, preprocessor and the table built from them (building takes a while, so once)."""
+    preprocessor, model = fitted
+    tmp_dir = tmp_path_factory.mktemp("table")
+    paths = {name: str(tmp_dir / name) for name in ("model.pkl", "preprocessor.pkl", "table.npz")}
+    save_object(paths["model.pkl"], model)
+    save_object(paths["preprocessor.pkl"], preprocessor)
+    PredictionTable.build(
+        preprocessor, model,
+        model_sha256=file_sha256(paths["model.pkl"]),
+        preprocessor_sha256=file_sha256(paths["preprocessor.pkl"]),
+    ).save(paths["table.npz"])
+    return paths
+
+
+@pytest.fixture
+def artifacts(tmp_path, built):
+    paths = {}
+    for name, path in built.items():
+        paths[name] = str(tmp_path / name)
+        shutil.copyfile(path, paths[name])
+    return paths
+
+
+def _load(paths):
+    return PredictPipeline._load_table(paths["table.npz"], paths["model.pkl"], paths["preprocessor.pkl"])
+
+
+def test_lookup_matches_the_model(artifacts, fitted):
+    preprocessor, model = fitted
+    table = _load(artifacts)
+    data = CustomData.from_record(SMOKE_RECORD)
+
+    expected = model.predict(preprocessor.transform(data.get_data_as_data_frame()))[0]
+    assert table.lookup(vars(data)) == pytest.approx(expected, abs=1e-3)
+    # Outside the table: the caller falls back to the model
+    assert table.lookup(dict(vars(data), reading_score=72.5)) is None
+    assert table.lookup(dict(vars(data), gender="unknown")) is None
+
+
+def test_rejected_for_a_different_model(artifacts, fitted):
+    _, model = fitted
+    other = LinearRegression()
+    other.coef_, other.intercept_ = model.coef_ * 2, model.intercept_
+    save_object(artifacts["model.pkl"], other)
+
+    assert _load(artifacts) is None
+
+
+def test_rejected_for_a_different_preprocessor(artifacts):
+    train = pd.read_csv(TRAIN_CSV)
+    refitted = DataTransformation().get_data_transformer_object().fit(train.drop(columns=[TARGET]).iloc[:100])
+    save_object(artifacts["preprocessor.pkl"], refitted)
+
+    assert _load(artifacts) is None
+
+
+def test_hashes_survive_save_and_load(artifacts):
+    table = PredictionTable.load(artifacts["table.npz"])
+
+    assert table.model_sha256 == file_sha256(artifacts["model.pkl"])
+    assert table.preprocessor_sha256 == file_sha256(artifacts["preprocessor.pkl"])
+    assert np.isfinite(table.values).all()
@@ -0,0 +1,24 @@
+import os
+import threading
+
+from src.pipeline.predict_pipeline import PredictPipeline
+
+
+def _watchers():
+    return [t for t in threading.enumerate() if t.name == "model-watcher"]
+
+
+def test_preload_and_warm_up_do_not_start_the_watcher():
+    # gunicorn's when_ready runs both in the master, which then forks workers
+    PredictPipeline.stop_watcher()
+    for thread in _watchers():
+        thread.join(timeout=5)
+    assert PredictPipeline.config.artifact_check_interval > 0
+
+    import application
+
+    PredictPipeline.preload()
+    application.warm_up()
+
+    assert _watchers() == []
+    assert PredictPipeline._watcher_pid != os.getpid()